@@ -0,0 +1,8 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in ('src', 'site-packages', 'tests'):
+    path = os.path.join(ROOT, path)
+    if path not in sys.path:
+        sys.path.insert(0, path)
@@ -0,0 +1,142 @@
+""" Benchmark of Get Table against fake table counting UI accesses.
+
+Every Rows, Cells and Text access of a real table is a call into the
+tested application, so their count decides the time of the keyword.
+Fake backend serves a table of --rows x --columns cells and counts
+accesses. The previous Get Table (text of every cell) is compared with
+the current keyword with paging, column selection and filter. Estimated
+UI time assumes --call-ms per access, python time is measured.
+
+    python benchmarks/get_table.py --rows 10000 --columns 10
+"""
+import os
+import sys
+import time
+from argparse import ArgumentParser
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in ('src', 'site-packages'):
+    sys.path.insert(0, os.path.join(ROOT, path))
+
+from rxconnector import RanorexLibrary, UIBackend
+
+TABLE = "/form/table[@name='orders']"
+
+
+class Counter(defaultdict):
+    def __init__(self):
+        defaultdict.__init__(self, int)
+
+    def total(self):
+        return sum(self.values())
+
+
+class FakeCell(object):
+    def __init__(self, counter, text):
+        self._counter = counter
+        self._text = text
+
+    @property
+    def Text(self):
+        self._counter['text'] += 1
+        return self._text
+
+
+class FakeRow(object):
+    def __init__(self, counter, index, columns):
+        self._counter = counter
+        self._cells = [FakeCell(counter, 'r%dc%d' % (index, column))
+                       for column in range(columns)]
+
+    @property
+    def Cells(self):
+        self._counter['cells'] += 1
+        return self._cells
+
+
+class FakeTable(object):
+    def __init__(self, counter, rows, columns):
+        self._counter = counter
+        self._rows = [FakeRow(counter, index, columns)
+                      for index in range(rows)]
+        self._columns = [FakeCell(counter, 'c%d' % column)
+                         for column in range(columns)]
+
+    @property
+    def Rows(self):
+        self._counter['rows'] += 1
+        return self._rows
+
+    @property
+    def Columns(self):
+        self._counter['columns'] += 1
+        return self._columns
+
+
+class FakeBackend(UIBackend):
+    """ Every locator finds the same table """
+    def __init__(self, table):
+        self.table = table
+
+    def load(self):
+        pass
+
+    def adapter(self, element_type, parent=None):
+        return lambda locator: self.table
+
+    def is_element_not_found(self, error):
+        return False
+
+
+def old_get_table(element):
+    """ get_table before paging and column selection """
+    table = [[cell.Text for cell in row.Cells] for row in element.Rows]
+    return table
+
+
+def scenarios(rows):
+    return [
+        ('previous, whole table', None),
+        ('whole table', {}),
+        ('page of 100 rows', {'start': rows // 2, 'count': 100}),
+        ('2 columns', {'columns': '0,3'}),
+        ('page of 100 rows, 2 columns', {'start': rows // 2, 'count': 100,
+                                         'columns': '0,3'}),
+        ('filter 1% of rows', {'filter_column': 0,
+                               'filter_value': r'^r\d*00c0$'}),
+        ('header and first 10 rows', {'header': True, 'count': 10}),
+    ]
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--columns', type=int, default=10)
+    parser.add_argument('--call-ms', type=float, default=0.1,
+                        help='assumed time of one access in application')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='python time is the best of repeated calls')
+    args = parser.parse_args()
+    counter = Counter()
+    backend = FakeBackend(FakeTable(counter, args.rows, args.columns))
+    library = RanorexLibrary(backend)
+    print('%-30s %8s %10s %10s %12s' % ('call', 'cells', 'accesses',
+                                        'python ms', 'est. UI ms'))
+    for name, options in scenarios(args.rows):
+        elapsed = []
+        for _ in range(args.repeat):
+            counter.clear()
+            started = time.time()
+            if options is None:
+                result = old_get_table(backend.table)
+            else:
+                result = library.get_table(TABLE, **options)
+            elapsed.append((time.time() - started) * 1000)
+        cells = sum(len(row) for row in result)
+        print('%-30s %8d %10d %10.1f %12.0f' % (
+            name, cells, counter.total(), min(elapsed),
+            counter.total() * args.call_ms))
+
+if __name__ == '__main__':
+    main()
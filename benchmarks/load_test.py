@@ -0,0 +1,158 @@
+""" Load test of RobotRemoteServer with a fake library.
+
+Server with FakeLibrary is started in separate process. Clients call
+concurrent keyword check_if_process_is_running in a loop, optional UI
+clients call slow ui_keyword (serialized by server) and optional idle
+clients keep their keep-alive connection open without requests.
+Requests per second and latency percentiles of concurrent calls are
+printed.
+
+    python benchmarks/load_test.py --threaded --workers 4 --clients 8 --idle 4
+"""
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import xmlrpclib
+from argparse import ArgumentParser, SUPPRESS as SUPPRESS_HELP
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'site-packages'))
+
+
+class FakeLibrary(object):
+    """ Library answering without UI, ui_keyword takes delay ms """
+    ROBOT_CONCURRENT_KEYWORDS = ('check_if_process_is_running',)
+
+    def check_if_process_is_running(self, process_name):
+        return True
+
+    def ui_keyword(self, delay=100):
+        time.sleep(int(delay) / 1000.0)
+        return True
+
+
+def serve(port, threaded, workers):
+    from robotremoteserver import RobotRemoteServer
+    RobotRemoteServer(FakeLibrary(), '127.0.0.1', port, threaded=threaded,
+                      workers=workers)
+
+
+def free_port():
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def percentile(values, percent):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100.0))]
+
+
+def start_server(args):
+    port = free_port()
+    command = [sys.executable, os.path.abspath(__file__), '--serve',
+               str(port), '--workers', str(args.workers)]
+    if args.threaded:
+        command.append('--threaded')
+    with open(os.devnull, 'w') as devnull:
+        process = subprocess.Popen(command, stdout=devnull,
+                                   stderr=subprocess.STDOUT)
+    deadline = time.time() + 15
+    while True:
+        try:
+            socket.create_connection(('127.0.0.1', port), 1).close()
+            return process, port
+        except socket.error:
+            if time.time() > deadline:
+                process.kill()
+                raise RuntimeError("Server did not start")
+            time.sleep(0.05)
+
+
+def run(args):
+    process, port = start_server(args)
+    url = 'http://127.0.0.1:%d' % port
+    stop = threading.Event()
+    latencies = []
+    lock = threading.Lock()
+
+    def client():
+        proxy = xmlrpclib.ServerProxy(url)
+        measured = []
+        while not stop.is_set():
+            started = time.time()
+            proxy.run_keyword('check_if_process_is_running', ['app'])
+            measured.append((time.time() - started) * 1000)
+        with lock:
+            latencies.extend(measured)
+
+    def ui_client():
+        proxy = xmlrpclib.ServerProxy(url)
+        while not stop.is_set():
+            proxy.run_keyword('ui_keyword', [args.ui_delay])
+
+    # idle clients make one call and keep the connection open
+    idle = [xmlrpclib.ServerProxy(url) for _ in range(args.idle)]
+    for proxy in idle:
+        proxy.run_keyword('check_if_process_is_running', ['app'])
+    threads = [threading.Thread(target=client) for _ in range(args.clients)]
+    threads += [threading.Thread(target=ui_client)
+                for _ in range(args.ui_clients)]
+    try:
+        started = time.time()
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        time.sleep(args.duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.time() - started
+    finally:
+        try:
+            xmlrpclib.ServerProxy(url).stop_remote_server()
+        except Exception:
+            pass
+        time.sleep(0.5)
+        if process.poll() is None:
+            process.kill()
+    return {'requests': len(latencies),
+            'requests_per_second': len(latencies) / elapsed,
+            'p50': percentile(latencies, 50),
+            'p99': percentile(latencies, 99),
+            'max': max(latencies) if latencies else 0.0}
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--serve', type=int, help=SUPPRESS_HELP)
+    parser.add_argument('--threaded', action='store_true')
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--clients', type=int, default=4,
+                        help='clients calling concurrent keyword')
+    parser.add_argument('--ui-clients', type=int, default=0,
+                        help='clients calling slow UI keyword')
+    parser.add_argument('--ui-delay', type=int, default=100,
+                        help='duration of UI keyword in ms')
+    parser.add_argument('--idle', type=int, default=0,
+                        help='idle keep-alive connections')
+    parser.add_argument('--duration', type=float, default=5,
+                        help='seconds of measurement')
+    args = parser.parse_args()
+    if args.serve:
+        serve(args.serve, args.threaded, args.workers)
+        return
+    result = run(args)
+    print('%(requests)d requests, %(requests_per_second).0f req/s, '
+          'p50 %(p50).2f ms, p99 %(p99).2f ms, max %(max).2f ms' % result)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+""" Microbenchmark of locator type resolution, linear scan vs index.
+
+Resolves locators by the previous __return_type (list of supported
+types rebuilt and scanned with lower() on every call, global ranorex
+settings assigned every call) and by the current index with memoized
+locators. Both unique locators and locators repeated like in a test
+suite are measured.
+
+    python benchmarks/locator_types.py --count 100000
+"""
+import os
+import sys
+import time
+from argparse import ArgumentParser
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in ('src', 'site-packages'):
+    sys.path.insert(0, os.path.join(ROOT, path))
+
+import rxconnector
+from rxconnector import RanorexLibrary, SUPPORTED_TYPES
+
+resolve = RanorexLibrary._RanorexLibrary__return_type
+
+
+class Settings(object):
+    """ Stands for Ranorex.Validate and Ranorex.Adapter """
+    pass
+
+
+class Ranorex(object):
+    Validate = Settings()
+    Adapter = Settings()
+
+
+def old_return_type(locator):
+    """ __return_type before the index, settings go to Ranorex stub """
+    Ranorex.Validate.EnableReport = False
+    Ranorex.Adapter.DefaultUseEnsureVisible = True
+    supported_types = ['AbbrTag', 'AcronymTag', 'AddressTag', 'AreaTag',
+                       'ArticleTag', 'AsideTag', 'ATag', 'AudioTag',
+                       'BaseFontTag', 'BaseTag', 'BdoTag', 'BigTag',
+                       'BodyTag', 'BrTag', 'BTag', 'Button',
+                       'ButtonTag', 'CanvasTag', 'Cell', 'CenterTag',
+                       'CheckBox', 'CiteTag', 'CodeTag', 'ColGroupTag',
+                       'ColTag', 'Column', 'ComboBox', 'CommandTag',
+                       'Container', 'ContextMenu', 'DataListTag',
+                       'DdTag', 'DelTag', 'DetailsTag', 'DfnTag',
+                       'DirTag', 'DivTag', 'DlTag', 'EmbedTag', 'EmTag',
+                       'FieldSetTag', 'FigureTag', 'FontTag', 'Form', 'FormTag',
+                       'Link', 'List', 'ListItem', 'MenuBar',
+                       'MenuItem', 'Picture', 'ProgressBar',
+                       'RadioButton', 'Row', 'ScrollBar', 'Slider',
+                       'StatusBar', 'Table', 'Text', 'TitleBar', 'ToggleButton',
+                       'Tree', 'TreeItem', 'Unknown']
+    splitted_locator = locator.split('/')
+    if "[" in splitted_locator[-1]:
+        ele = splitted_locator[-1].split('[')[0]
+    else:
+        ele = splitted_locator[-1]
+    for item in supported_types:
+        if ele.lower() == item.lower():
+            return item
+        elif ele.lower() == '':
+            raise AssertionError("No element entered")
+    raise AssertionError("Element is not supported. Entered element: %s" %
+                         ele)
+
+
+def new_return_type(locator):
+    return resolve(locator)
+
+
+def locators(count, distinct):
+    """ count locators cycling over distinct ones, every type is used """
+    types = sorted(SUPPORTED_TYPES.values())
+    result = []
+    for index in range(count):
+        number = index % distinct
+        element_type = types[number % len(types)]
+        result.append("/form[@title='Main %d']/container[@name='c']/%s"
+                      "[@automationid='id%d']" % (number, element_type,
+                                                  number))
+    return result
+
+
+def measure(function, locators):
+    started = time.time()
+    for locator in locators:
+        function(locator)
+    return time.time() - started
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=100000)
+    parser.add_argument('--distinct', type=int, default=1000,
+                        help='distinct locators of repeated run')
+    args = parser.parse_args()
+    runs = [('unique', locators(args.count, args.count)),
+            ('repeated', locators(args.count, args.distinct))]
+    print('%-10s %12s %12s %9s' % ('locators', 'old us/call', 'new us/call',
+                                   'speed-up'))
+    for name, run in runs:
+        rxconnector._LOCATOR_TYPES.clear()
+        old = measure(old_return_type, run)
+        new = measure(new_return_type, run)
+        print('%-10s %12.2f %12.2f %8.1fx' % (
+            name, old / len(run) * 1e6, new / len(run) * 1e6, old / new))
+    # previous scan split predicates on "/" and picked wrong step
+    locator = "/form/button[@text='a/b']"
+    try:
+        old_result = old_return_type(locator)
+    except AssertionError as error:
+        old_result = 'error: %s' % error
+    print('%s -> old: %s, new: %s' % (locator, old_result,
+                                      new_return_type(locator)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+""" Benchmark of Make Diff on generated log files.
+
+Log files of given sizes (MB) are generated into a temporary directory
+with variants: identical copy, 10 lines changed in the last 1% of the
+file and 10 lines changed in the middle. Every diff runs in its own
+process, time and peak memory (max rss) of that process are printed.
+The previous keyword (readlines and string concatenation) runs only
+up to --old-limit MB, it needs memory of several times the file size.
+Current keyword streams files bigger than its memory_limit and diffs
+them in windows, the last case shows it with 16MB limit.
+
+    python benchmarks/make_diff.py --sizes 1,100,1000
+"""
+import difflib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser, SUPPRESS as SUPPRESS_HELP
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in ('src', 'site-packages'):
+    sys.path.insert(0, os.path.join(ROOT, path))
+
+MB = 1024 * 1024
+LINE = ('2026-10-18 12:%02d:%02d.%03d %s [worker-%d] request %d served '
+        'in %d ms\n')
+LEVELS = ('INFO', 'DEBUG', 'INFO', 'WARN')
+
+
+def old_make_diff(file_a, file_b):
+    """ make_diff before streaming """
+    ff = open(file_a, "r").readlines()
+    sf = open(file_b, "r").readlines()
+    output = ""
+    for line in difflib.unified_diff(ff, sf):
+        output += line
+    return output
+
+
+def log_lines(size):
+    """ Yields chunks of log lines of about size bytes together """
+    written = 0
+    number = 0
+    while written < size:
+        chunk = ''.join(LINE % (number // 60000 % 60, number // 1000 % 60,
+                                number % 1000, LEVELS[number % 4],
+                                number % 8, number, number % 97)
+                        for number in xrange(number, number + 10000))
+        number += 10000
+        written += len(chunk)
+        yield chunk
+
+
+def generate(directory, size):
+    """ Writes original file and its variants, returns their paths """
+    original = os.path.join(directory, '%d.log' % size)
+    with open(original, 'wb') as f:
+        for chunk in log_lines(size * MB):
+            f.write(chunk)
+    paths = {'original': original}
+    paths['identical'] = original + '.identical'
+    shutil.copyfile(original, paths['identical'])
+    total = os.path.getsize(original)
+    for variant, offset in (('tail', total - total // 100),
+                            ('middle', total // 2)):
+        paths[variant] = '%s.%s' % (original, variant)
+        with open(original, 'rb') as source:
+            with open(paths[variant], 'wb') as target:
+                copy(source, target, offset)
+                # 10 lines, one in every 10 is changed
+                for index in range(100):
+                    line = source.readline()
+                    if index % 10 == 0:
+                        line = line.replace('served', 'failed')
+                    target.write(line)
+                copy(source, target)
+    return paths
+
+
+def copy(source, target, size=None):
+    while size is None or size > 0:
+        chunk = source.read(MB if size is None else min(MB, size))
+        if not chunk:
+            break
+        target.write(chunk)
+        if size is not None:
+            size -= len(chunk)
+
+
+def run(implementation, file_a, file_b, options):
+    """ Runs diff in this process, prints result as json """
+    started = time.time()
+    try:
+        if implementation == 'old':
+            result = old_make_diff(file_a, file_b)
+        else:
+            from rxconnector import RanorexLibrary
+            result = RanorexLibrary().make_diff(file_a, file_b, **options)
+    except (AssertionError, MemoryError) as error:
+        result = {'error': str(error) or type(error).__name__}
+    print(json.dumps({'elapsed': time.time() - started,
+                      'result': len(result) if isinstance(result, str)
+                      else result}))
+
+
+def measure(implementation, file_a, file_b, options, timeout):
+    """ Returns (seconds, max rss in MB, result) of diff in new process """
+    process = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), '--run', implementation,
+         file_a, file_b, json.dumps(options)], stdout=subprocess.PIPE)
+    deadline = time.time() + timeout
+    while True:
+        pid, status, usage = os.wait4(process.pid, os.WNOHANG)
+        if pid:
+            break
+        if time.time() > deadline:
+            process.kill()
+            os.wait4(process.pid, 0)
+            return None, None, 'timeout'
+        time.sleep(0.05)
+    output = process.stdout.read()
+    if status:
+        return None, usage.ru_maxrss / 1024.0, 'exit status %d' % status
+    measured = json.loads(output)
+    return measured['elapsed'], usage.ru_maxrss / 1024.0, measured['result']
+
+
+def describe(result):
+    if isinstance(result, dict) and 'error' in result:
+        return 'error: %s' % result['error']
+    if isinstance(result, dict):
+        return 'summary %s' % json.dumps(result, sort_keys=True)
+    if isinstance(result, int):
+        return '%d characters' % result
+    return result
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='1,100',
+                        help='comma separated sizes of files in MB')
+    parser.add_argument('--old-limit', type=int, default=100,
+                        help='largest size in MB diffed by previous keyword')
+    parser.add_argument('--timeout', type=int, default=600,
+                        help='seconds one diff may take')
+    parser.add_argument('--run', nargs=4, help=SUPPRESS_HELP)
+    args = parser.parse_args()
+    if args.run:
+        implementation, file_a, file_b, options = args.run
+        run(implementation, file_a, file_b, json.loads(options))
+        return
+    directory = tempfile.mkdtemp()
+    try:
+        print('%6s %-10s %-28s %9s %9s  %s' % ('MB', 'variant', 'keyword',
+                                               'seconds', 'rss MB',
+                                               'result'))
+        for size in [int(size) for size in args.sizes.split(',')]:
+            paths = generate(directory, size)
+            cases = [('identical', 'current', {}),
+                     ('tail', 'current', {}),
+                     ('tail', 'current, summary', {'summary': True}),
+                     ('tail', 'current, ignore DEBUG',
+                      {'ignore': ' DEBUG '}),
+                     ('middle', 'current', {}),
+                     ('middle', 'current, 16MB memory limit',
+                      {'memory_limit': 16 * MB})]
+            if size <= args.old_limit:
+                cases = [(variant, 'previous', None) for variant
+                         in ('identical', 'tail', 'middle')] + cases
+            for variant, name, options in cases:
+                elapsed, rss, result = measure(
+                    'old' if options is None else 'new', paths['original'],
+                    paths[variant], options or {}, args.timeout)
+                print('%6d %-10s %-28s %9s %9s  %s' % (
+                    size, variant, name,
+                    '-' if elapsed is None else '%.2f' % elapsed,
+                    '-' if rss is None else '%.0f' % rss, describe(result)))
+                sys.stdout.flush()
+            for path in paths.values():
+                os.remove(path)
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
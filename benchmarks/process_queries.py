@@ -0,0 +1,154 @@
+""" Benchmark of process queries, tasklist subprocess vs in-process.
+
+Runs on any platform: tasklist is replaced by a fake script put first
+on PATH that prints a process list of --processes entries, psutil by
+a fake module enumerating the same list. Measured per call are the
+previous keyword (whole tasklist output searched for substring), the
+current TasklistProcessTable fallback and PsutilProcessTable. Delay
+of Wait For Process To Start noticing a process started after
+--start-after ms is measured for the previous 5 s polling loop and
+the current keyword.
+
+    python benchmarks/process_queries.py --processes 300 --calls 100
+"""
+import os
+import shutil
+import stat
+import subprocess
+import sys
+import tempfile
+import time
+import types
+from argparse import ArgumentParser
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in ('src', 'site-packages'):
+    sys.path.insert(0, os.path.join(ROOT, path))
+
+from rxconnector import (RanorexLibrary, ProcessTable, PsutilProcessTable,
+                         TasklistProcessTable)
+
+FAKE_TASKLIST = '''#!%(python)s
+import sys
+names = ['svchost.exe'] * %(count)d + ['app.exe']
+arguments = sys.argv[1:]
+if '/fi' in arguments:
+    name = arguments[arguments.index('/fi') + 1].split(' eq ')[1].lower()
+    for pid, image in enumerate(names):
+        if image.lower() == name:
+            print('"%%s","%%d","Console","1","10,000 K"' %% (image, pid))
+else:
+    print('Image Name                     PID Session Name        Session#'
+          '    Mem Usage')
+    print('=' * 76)
+    for pid, image in enumerate(names):
+        print('%%-25s %%8d Console                    1     10,000 K' %%
+              (image, pid))
+'''
+
+
+class FakeProcess(object):
+    def __init__(self, name):
+        self._name = name
+
+    def name(self):
+        return self._name
+
+    def kill(self):
+        pass
+
+
+def fake_psutil(count):
+    module = types.ModuleType('psutil')
+    processes = [FakeProcess('svchost.exe') for _ in range(count)] + \
+        [FakeProcess('app.exe')]
+    module.process_iter = lambda: iter(processes)
+    module.Error = module.NoSuchProcess = EnvironmentError
+    return module
+
+
+def old_check_if_process_is_running(process_name):
+    """ check_if_process_is_running before the process tables """
+    proc = subprocess.Popen(['tasklist'], stdout=subprocess.PIPE)
+    out = proc.communicate()[0]
+    return out.find(process_name) != -1 if out else False
+
+
+def old_wait_for_process_to_start(process_name, timeout, is_running):
+    """ polling of previous wait_for_process_to_start """
+    curr_time = 0
+    timeout = int(timeout)/1000
+    while curr_time <= timeout:
+        if is_running(process_name):
+            return True
+        else:
+            curr_time += 5
+            time.sleep(5)
+    raise AssertionError("Process %s not found within %ss" % (process_name,
+                                                              timeout))
+
+
+class DelayedTable(ProcessTable):
+    """ Process app.exe is running delay ms after start """
+    def __init__(self, delay):
+        self.started = time.time() + delay / 1000.0
+
+    def is_running(self, process_name):
+        return process_name == 'app.exe' and time.time() >= self.started
+
+
+def per_call(function, calls):
+    started = time.time()
+    for _ in range(calls):
+        assert function('app.exe')
+    return (time.time() - started) / calls * 1000
+
+
+def detection(wait, delay):
+    table = DelayedTable(delay)
+    wait(table)
+    return (time.time() - table.started) * 1000
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--processes', type=int, default=300)
+    parser.add_argument('--calls', type=int, default=100)
+    parser.add_argument('--start-after', type=int, default=300,
+                        help='ms after which process starts in wait test')
+    args = parser.parse_args()
+    directory = tempfile.mkdtemp()
+    try:
+        tasklist = os.path.join(directory, 'tasklist')
+        with open(tasklist, 'w') as f:
+            f.write(FAKE_TASKLIST % {'python': sys.executable,
+                                     'count': args.processes})
+        os.chmod(tasklist, stat.S_IRWXU)
+        os.environ['PATH'] = directory + os.pathsep + os.environ['PATH']
+        sys.modules['psutil'] = fake_psutil(args.processes)
+        print('%-32s %10s' % ('query', 'ms/call'))
+        for name, function in [
+                ('tasklist, substring (previous)',
+                 old_check_if_process_is_running),
+                ('tasklist, filtered (fallback)',
+                 TasklistProcessTable().is_running),
+                ('in-process (psutil)', PsutilProcessTable().is_running)]:
+            print('%-32s %10.3f' % (name, per_call(function, args.calls)))
+    finally:
+        shutil.rmtree(directory)
+
+    library = RanorexLibrary()
+
+    def wait(table):
+        library.processes = table
+        library.wait_for_process_to_start('app.exe', 10000)
+    print('process started after %d ms noticed after' % args.start_after)
+    print('  previous 5 s polling: %8.1f ms' % detection(
+        lambda table: old_wait_for_process_to_start(
+            'app.exe', 10000, table.is_running), args.start_after))
+    print('  current keyword:      %8.1f ms' % detection(
+        wait, args.start_after))
+
+
+if __name__ == '__main__':
+    main()
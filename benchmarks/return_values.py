@@ -0,0 +1,124 @@
+""" Benchmark of return value conversion of RobotRemoteServer.
+
+Tables of 1k, 100k and 1M cells (rows of 10 strings, like Get Table
+returns) and a Run Script like dictionary with output of the same size
+are converted by the previous _handle_return_value (copy of every
+container, two regex scans per string) and by the current one. Time of
+conversion and of XML-RPC marshalling of the result are printed.
+
+    python benchmarks/return_values.py --cells 1000,100000,1000000
+"""
+import os
+import re
+import sys
+import time
+import types
+import xmlrpclib
+from argparse import ArgumentParser
+from collections import Mapping
+from xmlrpclib import Binary
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'site-packages'))
+
+from robotremoteserver import RobotRemoteServer
+
+BINARY = re.compile('[\x00-\x08\x0B\x0C\x0E-\x1F]')
+NON_ASCII = re.compile('[\x80-\xff]')
+COLUMNS = 10
+
+
+class OldConversion(object):
+    """ Conversion of RobotRemoteServer before in place handling """
+    def _handle_return_value(self, ret):
+        if isinstance(ret, Binary):
+            return ret
+        if isinstance(ret, basestring):
+            return self._handle_binary_result(ret)
+        if isinstance(ret, (int, long, float)):
+            return ret
+        if isinstance(ret, Mapping):
+            return dict([(self._str(key), self._handle_return_value(value))
+                         for key, value in ret.items()])
+        try:
+            return [self._handle_return_value(item) for item in ret]
+        except TypeError:
+            return self._str(ret)
+
+    def _handle_binary_result(self, result):
+        if not self._contains_binary(result):
+            return result
+        try:
+            result = str(result)
+        except UnicodeError:
+            raise ValueError("Cannot represent %r as binary." % result)
+        return Binary(result)
+
+    def _contains_binary(self, result):
+        return (BINARY.search(result) or isinstance(result, str) and
+                sys.platform != 'cli' and NON_ASCII.search(result))
+
+    def _str(self, item, handle_binary=True):
+        if item is None:
+            return ''
+        if not isinstance(item, basestring):
+            item = unicode(item)
+        if handle_binary:
+            return self._handle_binary_result(item)
+        return item
+
+
+def current(binary_threshold=None):
+    # server serves in constructor, only conversion is needed here
+    server = types.InstanceType(RobotRemoteServer)
+    server._binary_threshold = server._check_binary_threshold(
+        binary_threshold)
+    return server
+
+
+def table(cells):
+    return [['row %d column %d' % (row, column)
+             for column in range(COLUMNS)]
+            for row in range(max(1, cells // COLUMNS))]
+
+
+def script_output(cells):
+    lines = ''.join('line %d of output\n' % line for line in range(cells))
+    return {'stdout': lines, 'stderr': ''}
+
+
+def measure(converter, value):
+    started = time.time()
+    result = converter._handle_return_value(value)
+    converted = time.time() - started
+    started = time.time()
+    xmlrpclib.dumps(({'status': 'PASS', 'return': result},),
+                    methodresponse=True)
+    return converted * 1000, (time.time() - started) * 1000
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cells', default='1000,100000,1000000',
+                        help='comma separated numbers of cells')
+    parser.add_argument('--binary-threshold', type=int, default=1024,
+                        help='threshold of the third converter')
+    args = parser.parse_args()
+    converters = [('previous', OldConversion()), ('current', current()),
+                  ('current, threshold %d' % args.binary_threshold,
+                   current(args.binary_threshold))]
+    print('%-9s %-8s %-24s %13s %12s' % ('cells', 'value', 'conversion',
+                                          'convert ms', 'marshal ms'))
+    for cells in [int(cells) for cells in args.cells.split(',')]:
+        for name, create in (('table', table),
+                             ('script', script_output)):
+            for converter_name, converter in converters:
+                # current conversion changes value in place
+                converted, marshalled = measure(converter, create(cells))
+                print('%-9d %-8s %-24s %13.1f %12.1f' % (
+                    cells, name, converter_name, converted, marshalled))
+                sys.stdout.flush()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+""" Benchmark of Take Screenshot options over XML-RPC.
+
+rxconnector is started with --simulate on a tree with a form of given
+size and a panel covering its middle quarter. Simulated encoder returns width * height bytes of synthetic data
+(scaled by jpeg quality), so payload grows with the captured area like
+real uncompressed captures do. Size of XML-RPC response and time of
+the call are printed for the default base64 string and every option.
+
+    python benchmarks/screenshots.py --width 1920 --height 1080
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+import xmlrpclib
+from argparse import ArgumentParser
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'tests'))
+
+from remote import RemoteServer
+
+TREE = """
+<desktop>
+  <form title="Main" x="0" y="0" width="%(width)d" height="%(height)d">
+    <container name="panel" x="%(panel_x)d" y="%(panel_y)d"
+               width="%(panel_width)d" height="%(panel_height)d"/>
+  </form>
+</desktop>
+"""
+FORM = "/form[@title='Main']"
+PANEL = "/form/container[@name='panel']"
+
+
+class CountingTransport(xmlrpclib.Transport):
+    """ Remembers size of last response body. Gzip is not accepted,
+    synthetic data compresses far better than real images do.
+    """
+    accept_gzip_encoding = False
+    received = 0
+
+    def parse_response(self, response):
+        self.received = int(response.getheader('content-length', 0))
+        return xmlrpclib.Transport.parse_response(self, response)
+
+
+def tree(width, height):
+    """ Returns tree of form of given size with panel in its middle """
+    return TREE % {'width': width, 'height': height,
+                   'panel_x': width // 4, 'panel_y': height // 4,
+                   'panel_width': max(1, width // 2),
+                   'panel_height': max(1, height // 2)}
+
+
+def variants(directory):
+    path = os.path.join(directory, 'screenshot.png')
+    return [('base64 string (default)', {}),
+            ('binary', {'output': 'binary'}),
+            ('binary jpeg quality 50', {'output': 'binary',
+                                        'image_format': 'jpeg',
+                                        'quality': '50'}),
+            ('binary scale 0.5', {'output': 'binary', 'scale': '0.5'}),
+            ('binary crop to panel', {'output': 'binary', 'crop_to': PANEL}),
+            ('path on connector host', {'path': path})]
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--width', type=int, default=1920)
+    parser.add_argument('--height', type=int, default=1080)
+    parser.add_argument('--rounds', type=int, default=10)
+    args = parser.parse_args()
+    if args.width < 1 or args.height < 1:
+        parser.error('width and height must be positive')
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'tree.xml')
+    with open(path, 'w') as f:
+        f.write(tree(args.width, args.height))
+    server = RemoteServer(path)
+    try:
+        transport = CountingTransport()
+        proxy = xmlrpclib.ServerProxy('http://127.0.0.1:%d' % server.port,
+                                      transport=transport)
+        print('%-26s %12s %10s' % ('output', 'bytes', 'ms/call'))
+        for name, options in variants(directory):
+            started = time.time()
+            for _ in range(args.rounds):
+                result = proxy.run_keyword('take_screenshot', [FORM], options)
+                if result['status'] != 'PASS':
+                    raise AssertionError(result['error'])
+            elapsed = (time.time() - started) / args.rounds * 1000
+            print('%-26s %12d %10.1f' % (name, transport.received, elapsed))
+    finally:
+        server.stop()
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
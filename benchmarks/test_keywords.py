@@ -0,0 +1,185 @@
+""" pytest-benchmark suite of keywords called over XML-RPC on localhost.
+
+rxconnector is started in separate process with --simulate, so every
+round covers XML-RPC serialization, the remote server and the library
+against the in-memory UI tree. Process keywords (Check If Process Is
+Running, Kill Process, Wait For Process To Start, Check Event Viewer)
+need tasklist or powershell of windows and are not measured.
+
+    python -m pytest benchmarks/test_keywords.py --benchmark-sort=mean
+"""
+import os
+import stat
+import sys
+
+import pytest
+
+from remote import RemoteServer
+
+ROWS = 200
+COLUMNS = 5
+
+TREE = """
+<desktop>
+  <form title="Main" processname="app">
+    <button text="OK" automationid="ok"/>
+    <checkbox text="Remember" checked="False"/>
+    <text name="status">ready</text>
+    <text name="input" text=""/>
+    <combobox name="color">
+      %s
+    </combobox>
+    <table name="orders">
+      %s
+      %s
+    </table>
+  </form>
+</desktop>
+""" % (''.join('<listitem text="item%d" value="v%d"/>' % (i, i)
+               for i in range(50)),
+       ''.join('<column text="c%d"/>' % c for c in range(COLUMNS)),
+       ''.join('<row>%s</row>' % ''.join('<cell text="r%dc%d"/>' % (r, c)
+                                         for c in range(COLUMNS))
+               for r in range(ROWS)))
+
+BUTTON = "/form[@title='Main']/button[@text='OK']"
+CHECKBOX = "/form/checkbox"
+INPUT = "/form/text[@name='input']"
+COMBOBOX = "/form/combobox[@name='color']"
+TABLE = "/form/table[@name='orders']"
+
+
+@pytest.fixture(scope='module')
+def files(tmpdir_factory):
+    directory = tmpdir_factory.mktemp('files')
+    tree = directory.join('tree.xml')
+    tree.write(TREE)
+    xml = directory.join('data.xml')
+    xml.write('<root>%s</root>' % ''.join('<item id="%d" name="n%d"/>' %
+                                          (i, i) for i in range(1000)))
+    lines = ['line %d\n' % i for i in range(10000)]
+    diff_a = directory.join('a.txt')
+    diff_a.write(''.join(lines))
+    lines[5000] = 'changed\n'
+    diff_b = directory.join('b.txt')
+    diff_b.write(''.join(lines))
+    script = directory.join('script.py')
+    script.write('#!%s\nimport sys\nprint(" ".join(sys.argv[1:]))\n' %
+                 sys.executable)
+    os.chmod(str(script), stat.S_IRWXU)
+    return {'tree': str(tree), 'xml': str(xml), 'diff_a': str(diff_a),
+            'diff_b': str(diff_b), 'script': str(script),
+            'index': str(directory.join('index.json'))}
+
+
+@pytest.fixture(scope='module')
+def server(files, tmpdir_factory):
+    log_path = str(tmpdir_factory.mktemp('log').join('connector.log'))
+    server = RemoteServer(files['tree'], ['--threaded'], log_path)
+    yield server
+    server.stop()
+
+
+def run_keyword(server, name, *args):
+    return server.proxy().run_keyword(name, list(args))
+
+
+KEYWORDS = [
+    ('get_element_attribute', (BUTTON, 'text')),
+    ('get_element_attributes', (BUTTON, 'text', 'automationid')),
+    ('get_attributes_of_elements', ([BUTTON, CHECKBOX], 'text')),
+    ('click_element', (BUTTON,)),
+    ('click_element', (BUTTON, '5,5')),
+    ('double_click_element', (BUTTON,)),
+    ('right_click_element', (BUTTON,)),
+    ('check', (CHECKBOX,)),
+    ('uncheck', (CHECKBOX,)),
+    ('set_focus', (BUTTON,)),
+    ('input_text', (INPUT, 'text')),
+    ('clear_text', (INPUT,)),
+    ('send_keys', (INPUT, 'abc')),
+    ('move_mouse_to', ('10', '10')),
+    ('scroll', (TABLE, '3')),
+    ('select_by_index', (COMBOBOX, '40')),
+    ('select_by_text', (COMBOBOX, 'item40')),
+    ('select_by_value', (COMBOBOX, 'v40')),
+    ('get_table', (TABLE,)),
+    ('get_table', (TABLE, '100', '10', '0,2')),
+    ('get_table_row_count', (TABLE,)),
+    ('take_screenshot', (BUTTON,)),
+    ('take_screenshot', (TABLE, 'binary', 'jpeg', '50', '0.5')),
+    ('wait_for_element', (BUTTON, '1000')),
+    ('wait_for_element_attribute', (BUTTON, 'text', 'OK', '1000')),
+    ('set_key_delay', ('default',)),
+    ('run_application', ('app.exe',)),
+    ('run_application_with_parameters', ('app.exe', '--fast')),
+    ('get_retry_statistics', ()),
+    ('get_locator_profile', ()),
+    ('get_wait_report', ()),
+]
+
+
+@pytest.mark.parametrize('name, args', KEYWORDS,
+                         ids=['%s-%d' % (name, len(args))
+                              for name, args in KEYWORDS])
+def test_ui_keyword(benchmark, server, name, args):
+    result = benchmark(run_keyword, server, name, *args)
+    assert result['status'] == 'PASS', result.get('error')
+
+
+@pytest.mark.parametrize('name, args', [
+    ('get_xml_attribute', ('xml', "item[@id='900']", 'name')),
+    ('get_xml_attribute', ('xml', "item[@id='900']", 'name', True)),
+    ('get_xml_attributes', ('xml', "item[@id='1']", 'name',
+                            "item[@id='900']", 'name')),
+    ('make_diff', ('diff_a', 'diff_b')),
+    ('make_diff', ('diff_a', 'diff_b', None, None, True)),
+    ('run_script', ('script',)),
+    ('run_script_with_parameters', ('script', 'a', 'b')),
+], ids=['xml', 'xml-stream', 'xml-attributes', 'diff', 'diff-summary',
+        'script', 'script-parameters'])
+def test_file_keyword(benchmark, server, files, name, args):
+    args = [files.get(arg, arg) if isinstance(arg, str) else arg
+            for arg in args]
+    args = ['' if arg is None else arg for arg in args]
+    result = benchmark(run_keyword, server, name, *args)
+    assert result['status'] == 'PASS', result.get('error')
+
+
+def test_element_cache(benchmark, server):
+    run_keyword(server, 'enable_element_cache', '50')
+    try:
+        result = benchmark(run_keyword, server, 'get_element_attribute',
+                           BUTTON, 'text')
+    finally:
+        run_keyword(server, 'disable_element_cache')
+    assert result['status'] == 'PASS'
+
+
+def test_locator_index(benchmark, server, files):
+    run_keyword(server, 'enable_locator_index', files['index'], 'app', '1')
+    try:
+        result = benchmark(run_keyword, server, 'get_element_attribute',
+                           BUTTON, 'text')
+    finally:
+        run_keyword(server, 'disable_locator_index')
+    assert result['status'] == 'PASS'
+
+
+def test_search_context(benchmark, server):
+    run_keyword(server, 'set_search_context', "/form[@title='Main']")
+    try:
+        result = benchmark(run_keyword, server, 'get_element_attribute',
+                           'button', 'text')
+    finally:
+        run_keyword(server, 'clear_search_context')
+    assert result['status'] == 'PASS'
+
+
+def test_start_and_wait_for_all(benchmark, server):
+    def wait():
+        waits = [run_keyword(server, 'start_wait', locator, '1000')['return']
+                 for locator in (BUTTON, CHECKBOX, TABLE)]
+        return run_keyword(server, 'wait_for_all', *waits)
+    result = benchmark(wait)
+    assert result['status'] == 'PASS', result.get('error')
@@ -14,14 +14,23 @@
 
 __version__ = 'devel'
 
+import base64
 import errno
+import math
 import re
 import select
+import socket
 import sys
+import time
 import inspect
+import logging
+import threading
 import traceback
-from StringIO import StringIO
-from SimpleXMLRPCServer import SimpleXMLRPCServer
+import Queue
+import itertools
+from bisect import bisect_left
+from SimpleXMLRPCServer import SimpleXMLRPCServer, SimpleXMLRPCRequestHandler
+import xmlrpclib
 from xmlrpclib import Binary
 try:
     import signal
@@ -35,6 +44,418 @@ except ImportError:
 
 BINARY = re.compile('[\x00-\x08\x0B\x0C\x0E-\x1F]')
 NON_ASCII = re.compile('[\x80-\xff]')
+# byte strings containing either of above are sent as binary
+BINARY_OR_NON_ASCII = re.compile('[\x00-\x08\x0B\x0C\x0E-\x1F\x80-\xff]')
+# values returned as they are, bool is subclass of int
+SAFE_TYPES = (int, long, float)
+NUMBER_TYPES = frozenset([int, long, float, bool])
+
+# seconds keep-alive connection is kept open without requests
+KEEP_ALIVE_TIMEOUT = 30
+# seconds worker waits for next request before connection becomes idle
+KEEP_ALIVE_LINGER = 0.002
+
+if sys.platform in ('win32', 'cli'):
+    _timer = time.clock
+else:
+    _timer = time.time
+
+
+class _CompactBinary(Binary):
+    """Binary marshalled as base64 without line breaks.
+
+    xmlrpclib breaks base64 into 76 character lines, which is slow to
+    encode and slow to parse on client side for big data.
+    """
+
+    def encode(self, out):
+        out.write('<value><base64>')
+        out.write(base64.b64encode(self.data))
+        out.write('</base64></value>\n')
+
+
+# marshaller encodes only registered classes by their encode method
+xmlrpclib.WRAPPERS += (_CompactBinary,)
+
+
+def _socket_pair():
+    # socket.socketpair is not available on windows
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    try:
+        listener.bind(('127.0.0.1', 0))
+        listener.listen(1)
+        writer = socket.create_connection(listener.getsockname())
+        # wake-ups are single bytes, they must not wait for delayed ack
+        writer.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        reader = listener.accept()[0]
+    finally:
+        listener.close()
+    return reader, writer
+
+
+class _Connection(object):
+    """Keep-alive connection, its files are kept between requests."""
+
+    def __init__(self, sock, client_address, timeout=None):
+        self.socket = sock
+        self.client_address = client_address
+        if timeout is not None:
+            sock.settimeout(timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.rfile = sock.makefile('rb', -1)
+        self.wfile = sock.makefile('wb', 0)
+        self.keep_alive = True
+        self.last_used = _timer()
+
+    def fileno(self):
+        return self.socket.fileno()
+
+    def buffered(self):
+        """True if next request was already read into buffer."""
+        buffer = getattr(self.rfile, '_rbuf', None)
+        return buffer is not None and buffer.tell() > 0
+
+    def close(self):
+        for stream in self.wfile, self.rfile:
+            try:
+                stream.close()
+            except socket.error:
+                pass
+
+
+class KeepAliveRequestHandler(SimpleXMLRPCRequestHandler):
+    """Serves one request of HTTP/1.1 keep-alive connection.
+
+    Server keeps connection open and hands its next request to a worker
+    again, so idle connections do not occupy workers.
+    """
+    protocol_version = 'HTTP/1.1'
+    # seconds to wait for rest of request that started to arrive
+    timeout = 30
+
+    def setup(self):
+        self.connection = self.request.socket
+        self.rfile = self.request.rfile
+        self.wfile = self.request.wfile
+
+    def handle(self):
+        self.close_connection = 1
+        self.handle_one_request()
+        self.request.keep_alive = not self.close_connection
+
+    def finish(self):
+        # files are used by next request of connection
+        try:
+            self.wfile.flush()
+        except socket.error:
+            self.request.keep_alive = False
+
+
+class SessionRequestHandler(SimpleXMLRPCRequestHandler):
+    """Accepts any path, ``/session/<id>`` selects session."""
+    rpc_paths = ()
+
+
+class KeepAliveSessionRequestHandler(KeepAliveRequestHandler):
+    rpc_paths = ()
+
+
+class ThreadLocalStream(object):
+    """Stream that writes to a buffer of the current thread while that
+    thread is capturing and to the wrapped stream otherwise.
+
+    Buffer is a list of written chunks, so capturing costs almost nothing
+    when keyword writes nothing. Output over ``max_size`` characters is
+    dropped and a note about it is added when the buffer is released."""
+
+    def __init__(self, stream, max_size=None):
+        self._stream = stream
+        self._max_size = max_size
+        self._local = threading.local()
+
+    @property
+    def capturing(self):
+        return getattr(self._local, 'chunks', None) is not None
+
+    def capture(self):
+        local = self._local
+        local.chunks = []
+        local.size = 0
+        local.dropped = 0
+
+    def release(self):
+        local = self._local
+        chunks = getattr(local, 'chunks', None)
+        local.chunks = None
+        if not chunks and not getattr(local, 'dropped', 0):
+            return ''
+        value = ''.join(chunks)
+        if local.dropped:
+            value += '\n*INFO* Output truncated, %d characters dropped.\n' \
+                     % local.dropped
+        return value
+
+    def write(self, data):
+        local = self._local
+        chunks = getattr(local, 'chunks', None)
+        if chunks is None:
+            self._stream.write(data)
+            return
+        if self._max_size is not None \
+                and local.size + len(data) > self._max_size:
+            room = max(self._max_size - local.size, 0)
+            local.dropped += len(data) - room
+            data = data[:room]
+            if not data:
+                return
+        local.size += len(data)
+        chunks.append(data)
+
+    def writelines(self, lines):
+        for line in lines:
+            self.write(line)
+
+    def flush(self):
+        if not self.capturing:
+            self._stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+class OutputLogHandler(logging.Handler):
+    """Writes log records into output of the keyword running in the
+    current thread. Records logged outside of keywords are ignored."""
+
+    def __init__(self, stream, level=logging.INFO):
+        logging.Handler.__init__(self, level)
+        self._stream = stream
+
+    def emit(self, record):
+        if not self._stream.capturing:
+            return
+        try:
+            message = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+        self._stream.write('*%s* %s\n' % (self._robot_level(record.levelno),
+                                          message))
+
+    def _robot_level(self, levelno):
+        if levelno >= logging.WARNING:
+            return 'WARN'
+        if levelno >= logging.INFO:
+            return 'INFO'
+        return 'DEBUG'
+
+
+class KeywordRegistry(object):
+    """Names, arguments, documentation and methods of library keywords
+    collected once when the server starts."""
+
+    def __init__(self, names, keywords, arguments, documentation):
+        self.names = tuple(names)
+        self._keywords = dict(keywords)
+        self._arguments = dict((n, tuple(a)) for n, a in arguments.items())
+        self._documentation = dict(documentation)
+
+    def __contains__(self, name):
+        return name in self._keywords
+
+    def keyword(self, name):
+        return self._keywords.get(name)
+
+    def arguments(self, name):
+        return list(self._arguments.get(name, ()))
+
+    def documentation(self, name):
+        return self._documentation.get(name, '')
+
+    def rebind(self, old, new):
+        """Returns registry with methods of ``old`` library instance
+        replaced by same methods of ``new`` instance."""
+        keywords = {}
+        for name, kw in self._keywords.items():
+            if getattr(kw, 'im_self', None) is old:
+                kw = getattr(new, kw.__name__)
+            keywords[name] = kw
+        registry = KeywordRegistry(self.names, {}, {}, {})
+        registry._keywords = keywords
+        registry._arguments = self._arguments
+        registry._documentation = self._documentation
+        return registry
+
+    def information(self):
+        info = dict((name, {'args': self.arguments(name),
+                            'doc': self.documentation(name)})
+                    for name in self.names)
+        for name in '__intro__', '__init__':
+            info[name] = {'doc': self.documentation(name)}
+        return info
+
+
+class LatencyHistogram(object):
+    """Latencies in milliseconds counted in buckets growing by 10%.
+
+    Adding a value is one bisect, percentiles are precise to bucket width.
+    """
+    _bounds = [0.01 * 1.1 ** i for i in range(250)]
+
+    def __init__(self):
+        self._counts = [0] * (len(self._bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value):
+        self._counts[bisect_left(self._bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, percent):
+        if not self.count:
+            return 0.0
+        rank = max(1, int(math.ceil(self.count * percent / 100.0)))
+        seen = 0
+        for index, count in enumerate(self._counts):
+            seen += count
+            if seen >= rank:
+                break
+        if index == len(self._bounds):
+            return self.max
+        return min(self._bounds[index], self.max)
+
+
+class KeywordMetrics(object):
+    """Call counts, failures and latency histograms of keywords.
+
+    Numeric counters returned by library's ``_metrics_counters`` method,
+    i.e. time spent in element resolution, are summed per keyword from
+    their difference before and after each call. If library reports
+    ``resolution_time`` in milliseconds, ``action_time`` is the rest of
+    keyword time.
+    """
+    _fields = ('count', 'failures', 'total', 'mean', 'p50', 'p95', 'p99',
+               'max')
+
+    def __init__(self):
+        self._keywords = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds, passed, before=None, after=None):
+        with self._lock:
+            metrics = self._keywords.get(name)
+            if metrics is None:
+                metrics = self._keywords[name] = \
+                    {'histogram': LatencyHistogram(), 'failures': 0,
+                     'counters': {}}
+            metrics['histogram'].add(seconds * 1000)
+            if not passed:
+                metrics['failures'] += 1
+            if after:
+                counters = metrics['counters']
+                for key, value in after.items():
+                    counters[key] = (counters.get(key, 0) + value -
+                                     (before or {}).get(key, 0))
+
+    def reset(self):
+        with self._lock:
+            self._keywords.clear()
+
+    def snapshot(self):
+        with self._lock:
+            return dict((name, self._summary(metrics))
+                        for name, metrics in self._keywords.items())
+
+    def _summary(self, metrics):
+        histogram = metrics['histogram']
+        summary = {'count': histogram.count,
+                   'failures': metrics['failures'],
+                   'total': round(histogram.total, 3),
+                   'mean': round(histogram.total / histogram.count, 3),
+                   'p50': round(histogram.percentile(50), 3),
+                   'p95': round(histogram.percentile(95), 3),
+                   'p99': round(histogram.percentile(99), 3),
+                   'max': round(histogram.max, 3)}
+        for key, value in metrics['counters'].items():
+            if isinstance(value, float):
+                value = round(value, 3)
+            summary[key] = value
+        if 'resolution_time' in summary:
+            summary['action_time'] = round(histogram.total -
+                                           summary['resolution_time'], 3)
+        return summary
+
+    def to_json(self):
+        import json
+        return json.dumps(self.snapshot(), indent=2, sort_keys=True)
+
+    def to_csv(self):
+        snapshot = self.snapshot()
+        extra = sorted(set(key for summary in snapshot.values()
+                           for key in summary) - set(self._fields))
+        columns = list(self._fields) + extra
+        lines = [','.join(['keyword'] + columns)]
+        for name in sorted(snapshot):
+            lines.append(','.join([name] + [str(snapshot[name].get(c, ''))
+                                            for c in columns]))
+        return '\n'.join(lines) + '\n'
+
+
+class _Job(object):
+    """Call executed in another thread, caller waits for its result."""
+
+    def __init__(self, function, args):
+        self._function = function
+        self._args = args
+        self._done = threading.Event()
+        self._result = None
+        self._error = None
+
+    def run(self):
+        try:
+            self._result = self._function(*self._args)
+        except:
+            self._error = sys.exc_info()
+        self._done.set()
+
+    def cancel(self, message):
+        try:
+            raise RuntimeError(message)
+        except RuntimeError:
+            self._error = sys.exc_info()
+        self._done.set()
+
+    def wait(self):
+        self._done.wait()
+        if self._error:
+            raise self._error[0], self._error[1], self._error[2]
+        return self._result
+
+
+class _Session(object):
+    """Library instance with its own keywords, metrics and queue of
+    keywords serialized in thread of the session."""
+
+    def __init__(self, session_id, library, metrics, registry=None):
+        self.id = session_id
+        self.library = library
+        self.registry = registry
+        self.metrics = metrics and KeywordMetrics() or None
+        self.counters = getattr(library, '_metrics_counters', None)
+        self.jobs = None
+        self.thread = None
+        self.active = 0
+        self.calls = 0
+        self.last_used = _timer()
+        self.closed = False
+
+    def information(self):
+        return {'id': self.id, 'calls': self.calls, 'active': self.active,
+                'idle': round(_timer() - self.last_used, 3)}
 
 
 class RobotRemoteServer(SimpleXMLRPCServer):
@@ -43,7 +464,10 @@ class RobotRemoteServer(SimpleXMLRPCServer):
     _fatal_exceptions = (SystemExit, KeyboardInterrupt)
 
     def __init__(self, library, host='127.0.0.1', port=8270, port_file=None,
-                 allow_stop=True):
+                 allow_stop=True, threaded=False, workers=16, metrics=True,
+                 binary_threshold=None, max_output=None, output_loggers=(),
+                 output_log_level='INFO', sessions=None,
+                 session_timeout=None):
         """Configure and start-up remote server.
 
         :param library:     Test library instance or module to host.
@@ -56,11 +480,65 @@ class RobotRemoteServer(SimpleXMLRPCServer):
                             no such file is written.
         :param allow_stop:  Allow/disallow stopping the server using
                             ``Stop Remote Server`` keyword.
+        :param threaded:    Serve HTTP/1.1 keep-alive connections by a pool
+                            of worker threads. Keywords listed in library's
+                            ``ROBOT_CONCURRENT_KEYWORDS`` run directly in
+                            the workers, all other keywords are serialized
+                            in the thread that started the server.
+        :param workers:     Number of worker threads in threaded mode.
+        :param metrics:     Record call counts and latencies of keywords,
+                            available through ``get_metrics``.
+        :param binary_threshold: Byte strings longer than this are returned
+                            as binary without being scanned for binary
+                            content. ``None`` means all strings are scanned.
+                            Not used on IronPython, where strings are text.
+        :param max_output:  Maximal number of characters of stdout and of
+                            stderr captured from one keyword call. ``None``
+                            means no limit.
+        :param output_loggers: Names of loggers whose records written during
+                            keyword call are added to keyword output.
+        :param output_log_level: Minimal level of records added to output.
+        :param sessions:    Callable creating new library instance. Enables
+                            sessions: requests to path ``/session/<id>``
+                            are served by library instance of that session,
+                            session is opened by first request or by
+                            ``open_session``. Requests to ``/`` are served
+                            by ``library``. In threaded mode UI keywords of
+                            each session are serialized in its own thread.
+        :param session_timeout: Seconds after which idle session is closed.
+                            ``None`` means sessions are closed only by
+                            ``close_session``.
         """
-        SimpleXMLRPCServer.__init__(self, (host, int(port)), logRequests=False)
-        self._library = library
+        if sessions:
+            handler = threaded and KeepAliveSessionRequestHandler \
+                      or SessionRequestHandler
+        else:
+            handler = threaded and KeepAliveRequestHandler \
+                      or SimpleXMLRPCRequestHandler
+        SimpleXMLRPCServer.__init__(self, (host, int(port)),
+                                    requestHandler=handler, logRequests=False)
         self._allow_stop = allow_stop
         self._shutdown = False
+        self._threaded = threaded
+        self._workers = int(workers)
+        self._connections = None
+        self._with_metrics = metrics
+        self._binary_threshold = self._check_binary_threshold(
+            binary_threshold)
+        self._max_output = max_output
+        self._output_loggers = tuple(output_loggers)
+        self._output_log_level = output_log_level
+        self._concurrent_keywords = frozenset(
+            list(getattr(library, 'ROBOT_CONCURRENT_KEYWORDS', ())) +
+            ['dump_keyword_metrics', 'stop_remote_server'])
+        self._local = threading.local()
+        self._default = _Session('', library, metrics)
+        self._default.registry = self._create_registry()
+        self._session_factory = sessions
+        self._session_timeout = session_timeout
+        self._sessions = {}
+        self._session_ids = itertools.count(1)
+        self._sessions_lock = threading.Lock()
         self._register_functions()
         self._register_signal_handlers()
         self._announce_start(port_file)
@@ -69,9 +547,208 @@ class RobotRemoteServer(SimpleXMLRPCServer):
     def _register_functions(self):
         self.register_function(self.get_keyword_names)
         self.register_function(self.run_keyword)
+        self.register_function(self.run_keywords)
         self.register_function(self.get_keyword_arguments)
         self.register_function(self.get_keyword_documentation)
+        self.register_function(self.get_library_information)
+        self.register_function(self.get_metrics)
         self.register_function(self.stop_remote_server)
+        if self._session_factory:
+            self.register_function(self.open_session)
+            self.register_function(self.close_session)
+            self.register_function(self.list_sessions)
+            self.register_function(self.get_session_metrics)
+
+    @property
+    def _session(self):
+        return getattr(self._local, 'session', None) or self._default
+
+    @property
+    def _library(self):
+        return self._session.library
+
+    @property
+    def _registry(self):
+        return self._session.registry
+
+    @property
+    def _metrics(self):
+        return self._session.metrics
+
+    @property
+    def _library_counters(self):
+        return self._session.counters
+
+    def _marshaled_dispatch(self, data, dispatch_method=None, path=None):
+        session = self._session_for_path(path)
+        self._local.session = session
+        try:
+            return SimpleXMLRPCServer._marshaled_dispatch(
+                self, data, dispatch_method, path)
+        finally:
+            self._local.session = None
+            if session is not None:
+                with self._sessions_lock:
+                    session.active -= 1
+                    session.last_used = _timer()
+
+    def _session_for_path(self, path):
+        if not self._session_factory or not path or \
+                not path.startswith('/session/'):
+            return None
+        session_id = path[len('/session/'):].strip('/')
+        with self._sessions_lock:
+            session = self._sessions.get(session_id)
+        if session is None:
+            session = self._open_session(session_id)
+        with self._sessions_lock:
+            session.active += 1
+            session.calls += 1
+        return session
+
+    def open_session(self, session_id=''):
+        """Open new session and return its id.
+
+        Keywords of the session are then called through path
+        ``/session/<id>``. Id is generated if it is not given.
+        """
+        if not self._session_factory:
+            raise RuntimeError('Sessions are not enabled.')
+        session_id = self._session_key(session_id)
+        if session_id and session_id in self._sessions:
+            raise RuntimeError("Session '%s' already exists." % session_id)
+        return self._open_session(session_id).id
+
+    def _session_key(self, session_id):
+        # ids from paths are strings, XML-RPC clients may send integers
+        if isinstance(session_id, basestring):
+            return session_id
+        return str(session_id)
+
+    def _open_session(self, session_id):
+        session_id = self._session_key(session_id)
+        library = self._session_factory()
+        registry = self._default.registry.rebind(self._default.library,
+                                                 library)
+        with self._sessions_lock:
+            if not session_id:
+                session_id = str(next(self._session_ids))
+                while session_id in self._sessions:
+                    session_id = str(next(self._session_ids))
+            if session_id in self._sessions:
+                return self._sessions[session_id]
+            session = _Session(session_id, library, self._with_metrics,
+                               registry)
+            self._sessions[session_id] = session
+        if self._threaded and self._connections is not None:
+            self._start_session_thread(session)
+        self._log("Session '%s' opened." % session_id)
+        return session
+
+    def close_session(self, session_id):
+        """Close session, its library instance is dropped.
+
+        Keywords of the session called before are finished first.
+        """
+        session_id = self._session_key(session_id)
+        with self._sessions_lock:
+            session = self._sessions.pop(session_id, None)
+            if session is not None:
+                job = self._end_session(session, self._close_session)
+        if session is None:
+            raise RuntimeError("Session '%s' does not exist." % session_id)
+        if job is None:
+            self._close_session(session)
+        else:
+            job.wait()
+        return True
+
+    def _end_session(self, session, close):
+        # Called with sessions lock held. Session thread runs close after
+        # jobs queued before, no job is queued after session is closed.
+        job = None
+        if session.jobs is not None:
+            job = _Job(close, (session,))
+            session.jobs.put(job)
+        session.closed = True
+        return job
+
+    def _close_session(self, session):
+        close = getattr(session.library, '_close', None)
+        if close:
+            try:
+                close()
+            except (AssertionError, RuntimeError, EnvironmentError), err:
+                self._log("Closing session '%s' failed: %s"
+                          % (session.id, err), 'WARN')
+        self._log("Session '%s' closed." % session.id)
+
+    def _close_idle_session(self, session):
+        # nobody waits for result, unexpected errors are only logged
+        try:
+            self._close_session(session)
+        except self._fatal_exceptions:
+            raise
+        except Exception:
+            self._log("Closing session '%s' failed:\n%s"
+                      % (session.id, traceback.format_exc()), 'ERROR')
+
+    def list_sessions(self):
+        """Return id, count of calls, count of running calls and idle
+        time in seconds of every open session."""
+        with self._sessions_lock:
+            sessions = list(self._sessions.values())
+        return [session.information() for session in sessions]
+
+    def get_session_metrics(self, reset=False):
+        """Return keyword metrics of every open session by session id."""
+        with self._sessions_lock:
+            sessions = list(self._sessions.values())
+        result = {}
+        for session in sessions:
+            if session.metrics is not None:
+                result[session.id] = session.metrics.snapshot()
+                if self._to_bool(reset):
+                    session.metrics.reset()
+        return result
+
+    def _reap_sessions(self):
+        if not self._session_timeout:
+            return
+        limit = _timer() - self._session_timeout
+        with self._sessions_lock:
+            idle = [session for session in self._sessions.values()
+                    if not session.active and session.last_used < limit]
+            for session in idle:
+                del self._sessions[session.id]
+            jobs = [self._end_session(session, self._close_idle_session)
+                    for session in idle]
+        for session, job in zip(idle, jobs):
+            if job is None:
+                self._close_idle_session(session)
+
+    def _start_session_thread(self, session):
+        session.jobs = Queue.Queue()
+        session.thread = threading.Thread(target=self._serve_session,
+                                          args=(session,))
+        session.thread.daemon = True
+        session.thread.start()
+
+    def _serve_session(self, session):
+        self._local.session = session
+        try:
+            # job closing the session is the last one queued
+            while not self._shutdown and not (session.closed and
+                                              session.jobs.empty()):
+                try:
+                    job = session.jobs.get(timeout=0.5)
+                except Queue.Empty:
+                    continue
+                job.run()
+        finally:
+            while not session.jobs.empty():
+                session.jobs.get().cancel("Session '%s' is closed."
+                                          % session.id)
 
     def _register_signal_handlers(self):
         def stop_with_signal(signum, frame):
@@ -97,12 +774,144 @@ class RobotRemoteServer(SimpleXMLRPCServer):
             self.timeout = 0.5
         elif sys.platform.startswith('java'):
             self.socket.settimeout(0.5)
+        # streams are replaced once, keyword calls only start capturing
+        sys.stdout = ThreadLocalStream(sys.__stdout__, self._max_output)
+        sys.stderr = ThreadLocalStream(sys.__stderr__, self._max_output)
+        handler = None
+        if self._output_loggers:
+            handler = OutputLogHandler(sys.stdout, self._output_log_level)
+            for name in self._output_loggers:
+                logging.getLogger(name).addHandler(handler)
+        try:
+            if self._threaded:
+                self._serve_threaded()
+            else:
+                self._handle_requests()
+        finally:
+            if handler is not None:
+                for name in self._output_loggers:
+                    logging.getLogger(name).removeHandler(handler)
+            sys.stdout = sys.__stdout__
+            sys.stderr = sys.__stderr__
+
+    def _handle_requests(self):
         while not self._shutdown:
             try:
                 self.handle_request()
             except (OSError, select.error), err:
                 if err.args[0] != errno.EINTR:
                     raise
+            if not self._threaded:
+                self._reap_sessions()
+
+    def _serve_threaded(self):
+        self._default.thread = threading.current_thread()
+        self._default.jobs = Queue.Queue()
+        self._idle = []
+        self._idle_lock = threading.Lock()
+        self._wake_reader, self._wake_writer = _socket_pair()
+        self._connections = Queue.Queue()
+        with self._sessions_lock:
+            opened = list(self._sessions.values())
+        for session in opened:
+            self._start_session_thread(session)
+        threads = [threading.Thread(target=self._handle_requests),
+                   threading.Thread(target=self._watch_idle)]
+        threads += [threading.Thread(target=self._handle_connections)
+                    for _ in range(self._workers)]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        try:
+            while not self._shutdown:
+                try:
+                    job = self._default.jobs.get(timeout=0.5)
+                except Queue.Empty:
+                    self._reap_sessions()
+                    continue
+                job.run()
+                self._reap_sessions()
+        finally:
+            while not self._default.jobs.empty():
+                self._default.jobs.get().cancel('Remote server is stopping.')
+
+    def process_request(self, request, client_address):
+        if self._connections is None:
+            SimpleXMLRPCServer.process_request(self, request, client_address)
+        else:
+            timeout = self.RequestHandlerClass.timeout
+            self._add_idle(_Connection(request, client_address, timeout))
+
+    def _add_idle(self, connection):
+        connection.last_used = _timer()
+        with self._idle_lock:
+            self._idle.append(connection)
+        self._wake_writer.send('x')
+
+    def _watch_idle(self):
+        # connections waiting for next request are watched here, readable
+        # ones are queued for workers, idle ones are closed after timeout
+        while not self._shutdown:
+            with self._idle_lock:
+                idle = list(self._idle)
+            try:
+                readable = select.select([self._wake_reader] + idle, [], [],
+                                         0.5)[0]
+            except (OSError, select.error), err:
+                if err.args[0] != errno.EINTR:
+                    raise
+                continue
+            if self._wake_reader in readable:
+                self._wake_reader.recv(4096)
+            limit = _timer() - KEEP_ALIVE_TIMEOUT
+            expired = []
+            with self._idle_lock:
+                for connection in idle:
+                    if connection in readable:
+                        self._idle.remove(connection)
+                        self._connections.put(connection)
+                    elif connection.last_used < limit:
+                        self._idle.remove(connection)
+                        expired.append(connection)
+            for connection in expired:
+                self._close_connection(connection)
+
+    def _handle_connections(self):
+        while True:
+            connection = self._connections.get()
+            try:
+                self.finish_request(connection, connection.client_address)
+            except:
+                connection.keep_alive = False
+                self.handle_error(connection.socket,
+                                  connection.client_address)
+            if not connection.keep_alive or self._shutdown:
+                self._close_connection(connection)
+            elif connection.buffered() or select.select(
+                    [connection], [], [], KEEP_ALIVE_LINGER)[0]:
+                self._connections.put(connection)
+            else:
+                self._add_idle(connection)
+
+    def _close_connection(self, connection):
+        connection.close()
+        self.shutdown_request(connection.socket)
+
+    def _needs_ui_thread(self, name):
+        session = self._session
+        return (session.jobs is not None and
+                threading.current_thread() is not session.thread and
+                name not in self._concurrent_keywords)
+
+    def _run_in_ui_thread(self, function, *args):
+        session = self._session
+        job = _Job(function, args)
+        # session thread cancels jobs queued before session was closed
+        with self._sessions_lock:
+            if session.closed:
+                raise RuntimeError("Session '%s' is closed." % session.id)
+            session.jobs.put(job)
+        return job.wait()
 
     def stop_remote_server(self):
         prefix = 'Robot Framework remote server at %s:%s ' % self.server_address
@@ -113,7 +922,27 @@ class RobotRemoteServer(SimpleXMLRPCServer):
             self._log(prefix + 'does not allow stopping.', 'WARN')
         return self._shutdown
 
+    def _create_registry(self):
+        names = self._find_keyword_names()
+        keywords = [(name, self._find_keyword(name)) for name in names]
+        keywords = [(name, kw) for name, kw in keywords if kw]
+        arguments = dict((name, self._arguments_from_kw(kw))
+                         for name, kw in keywords)
+        documentation = dict((name, inspect.getdoc(kw) or '')
+                             for name, kw in keywords)
+        documentation['__intro__'] = inspect.getdoc(self._library) or ''
+        if inspect.ismodule(self._library):
+            documentation['__init__'] = ''
+        else:
+            documentation['__init__'] = \
+                inspect.getdoc(self._find_keyword('__init__')) or ''
+        return KeywordRegistry(names, dict(keywords), arguments,
+                               documentation)
+
     def get_keyword_names(self):
+        return list(self._registry.names)
+
+    def _find_keyword_names(self):
         get_kw_names = getattr(self._library, 'get_keyword_names', None) or \
                        getattr(self._library, 'getKeywordNames', None)
         if self._is_function_or_method(get_kw_names):
@@ -121,7 +950,22 @@ class RobotRemoteServer(SimpleXMLRPCServer):
         else:
             names = [attr for attr in dir(self._library) if attr[0] != '_' and
                      self._is_function_or_method(getattr(self._library, attr))]
-        return names + ['stop_remote_server']
+        return names + sorted(self._server_keywords)
+
+    @property
+    def _server_keywords(self):
+        return {'dump_keyword_metrics': self.dump_keyword_metrics,
+                'run_keyword_batch': self.run_keyword_batch,
+                'stop_remote_server': self.stop_remote_server}
+
+    def get_library_information(self):
+        """Return arguments and documentation of all keywords at once.
+
+        Returns dictionary with keyword names as keys and dictionaries with
+        ``args`` and ``doc`` as values. ``__intro__`` and ``__init__`` contain
+        library documentation.
+        """
+        return self._registry.information()
 
     def _is_function_or_method(self, item):
         # Cannot use inspect.isroutine because it returns True for
@@ -129,11 +973,154 @@ class RobotRemoteServer(SimpleXMLRPCServer):
         return inspect.isfunction(item) or inspect.ismethod(item)
 
     def run_keyword(self, name, args, kwargs=None):
-        args, kwargs = self._handle_binary_args(args, kwargs or {})
-        result = {'status': 'FAIL'}
+        if self._needs_ui_thread(name):
+            return self._run_in_ui_thread(self.run_keyword, name, args, kwargs)
+        self._intercept_std_streams()
+        result = self._run_keyword(name, args, kwargs)
+        self._add_to_result(result, 'output', self._restore_std_streams())
+        return result
+
+    def run_keywords(self, steps, continue_on_failure=False):
+        """Run several keywords within one request.
+
+        Every step is ``[name, args]``, ``[name, args, kwargs]`` or
+        a dictionary with these keys. Returns dictionary with overall
+        ``status``, ``results`` of executed steps in the same form as
+        ``run_keyword`` returns and combined ``output``.
+        """
+        if self._needs_ui_thread(None):
+            return self._run_in_ui_thread(self.run_keywords, steps,
+                                          continue_on_failure)
+        continue_on_failure = self._to_bool(continue_on_failure)
+        batch = {'status': 'PASS', 'results': []}
         self._intercept_std_streams()
+        for step in steps:
+            try:
+                name, args, kwargs = self._parse_step(step)
+            except ValueError:
+                exc_type, exc_value, _ = sys.exc_info()
+                result = {'status': 'FAIL',
+                          'error': self._get_error_message(exc_type, exc_value)}
+            else:
+                result = self._run_keyword(name, args, kwargs)
+            batch['results'].append(result)
+            if result['status'] == 'FAIL':
+                batch['status'] = 'FAIL'
+                if not continue_on_failure:
+                    break
+        self._add_to_result(batch, 'output', self._restore_std_streams())
+        return batch
+
+    def run_keyword_batch(self, steps, continue_on_failure=False):
+        """Runs several keywords of the library within one call.
+
+        Every step is a list ``[name, args]`` or ``[name, args, kwargs]``,
+        or a dictionary with these keys. Keyword names can be given in
+        Robot Framework form, i.e. ``Input Text``. Returns list with return
+        values of all steps. Failure stops the batch unless
+        ``continue_on_failure`` is true, all failures are then reported
+        together.
+        """
+        continue_on_failure = self._to_bool(continue_on_failure)
+        returns = []
+        failures = []
+        for index, step in enumerate(steps):
+            name, args, kwargs = self._parse_step(step)
+            try:
+                returns.append(self._call_keyword(name, args, kwargs))
+            except self._fatal_exceptions:
+                raise
+            except:
+                exc_type, exc_value, _ = sys.exc_info()
+                failures.append('Step %d (%s) failed: %s'
+                                % (index + 1, name,
+                                   self._get_error_message(exc_type, exc_value)))
+                returns.append(None)
+                if not continue_on_failure:
+                    break
+        if failures:
+            raise AssertionError('\n'.join(failures))
+        return returns
+
+    def _parse_step(self, step):
+        if isinstance(step, Mapping):
+            name = step.get('name')
+            args = step.get('args') or []
+            kwargs = step.get('kwargs') or {}
+        elif isinstance(step, (list, tuple)) and 1 <= len(step) <= 3:
+            name = step[0]
+            args = len(step) > 1 and step[1] or []
+            kwargs = len(step) > 2 and step[2] or {}
+        else:
+            raise ValueError('Invalid step %r.' % (step,))
+        if not isinstance(name, basestring) or \
+                not isinstance(args, (list, tuple)) or \
+                not isinstance(kwargs, Mapping):
+            raise ValueError('Invalid step %r.' % (step,))
+        return name.strip().lower().replace(' ', '_'), args, kwargs
+
+    def _to_bool(self, value):
+        if isinstance(value, basestring):
+            return value.strip().upper() not in ('', 'FALSE', 'NO', '0')
+        return bool(value)
+
+    def _call_keyword(self, name, args, kwargs):
+        args, kwargs = self._handle_binary_args(args, kwargs)
+        kw = self._get_keyword(name)
+        if kw is None:
+            raise RuntimeError("No keyword with name '%s' found." % name)
+        if self._metrics is None:
+            return kw(*args, **kwargs)
+        before = self._library_counters and self._library_counters()
+        started = _timer()
+        passed = False
         try:
-            return_value = self._get_keyword(name)(*args, **kwargs)
+            result = kw(*args, **kwargs)
+            passed = True
+            return result
+        finally:
+            self._metrics.record(name, _timer() - started, passed, before,
+                                 self._library_counters and
+                                 self._library_counters())
+
+    def get_metrics(self, reset=False):
+        """Return call metrics of every called keyword.
+
+        Times are in milliseconds: ``total``, ``mean``, ``p50``, ``p95``,
+        ``p99`` and ``max`` together with ``count`` and ``failures``
+        of calls and counters reported by the library.
+        """
+        if self._metrics is None:
+            return {}
+        snapshot = self._metrics.snapshot()
+        if self._to_bool(reset):
+            self._metrics.reset()
+        return snapshot
+
+    def dump_keyword_metrics(self, format='json', path=None):
+        """Returns call metrics of keywords as JSON or CSV text.
+
+        Times are in milliseconds. If ``path`` is given, metrics are also
+        written to that file on the machine running the remote server.
+        """
+        if self._metrics is None:
+            raise RuntimeError('Metrics are disabled.')
+        if format.lower() not in ('json', 'csv'):
+            raise ValueError("Format must be 'json' or 'csv'.")
+        text = format.lower() == 'json' and self._metrics.to_json() \
+               or self._metrics.to_csv()
+        if path:
+            output = open(path, 'w')
+            try:
+                output.write(text)
+            finally:
+                output.close()
+        return text
+
+    def _run_keyword(self, name, args, kwargs=None):
+        result = {'status': 'FAIL'}
+        try:
+            return_value = self._call_keyword(name, args, kwargs or {})
         except:
             exc_type, exc_value, exc_tb = sys.exc_info()
             self._add_to_result(result, 'error',
@@ -156,7 +1143,6 @@ class RobotRemoteServer(SimpleXMLRPCServer):
                                     self._get_error_message(exc_type, exc_value))
             else:
                 result['status'] = 'PASS'
-        self._add_to_result(result, 'output', self._restore_std_streams())
         return result
 
     def _handle_binary_args(self, args, kwargs):
@@ -174,6 +1160,8 @@ class RobotRemoteServer(SimpleXMLRPCServer):
             result[key] = value
 
     def get_keyword_arguments(self, name):
+        if name in self._registry:
+            return self._registry.arguments(name)
         kw = self._get_keyword(name)
         if not kw:
             return []
@@ -193,15 +1181,16 @@ class RobotRemoteServer(SimpleXMLRPCServer):
         return args
 
     def get_keyword_documentation(self, name):
-        if name == '__intro__':
-            return inspect.getdoc(self._library) or ''
-        if name == '__init__' and inspect.ismodule(self._library):
-            return ''
+        if name in self._registry or name in ('__intro__', '__init__'):
+            return self._registry.documentation(name)
         return inspect.getdoc(self._get_keyword(name)) or ''
 
     def _get_keyword(self, name):
-        if name == 'stop_remote_server':
-            return self.stop_remote_server
+        return self._registry.keyword(name) or self._find_keyword(name)
+
+    def _find_keyword(self, name):
+        if name in self._server_keywords:
+            return self._server_keywords[name]
         kw = getattr(self._library, name, None)
         if not self._is_function_or_method(kw):
             return None
@@ -229,8 +1218,8 @@ class RobotRemoteServer(SimpleXMLRPCServer):
         return self._handle_binary_result(msg)
 
     def _get_error_traceback(self, exc_tb):
-        # Latest entry originates from this class so it can be removed
-        entries = traceback.extract_tb(exc_tb)[1:]
+        # Latest entries originate from this class so they can be removed
+        entries = traceback.extract_tb(exc_tb)[2:]
         trace = ''.join(traceback.format_list(entries))
         return 'Traceback (most recent call last):\n' + trace
 
@@ -238,10 +1227,29 @@ class RobotRemoteServer(SimpleXMLRPCServer):
         return bool(getattr(exc_value, 'ROBOT_%s_ON_FAILURE' % name, False))
 
     def _handle_return_value(self, ret):
+        # Lists and dicts with string keys are returned as they are when no
+        # item needs conversion, otherwise converted copy is returned, they
+        # may be structures still owned by library.
+        if isinstance(ret, SAFE_TYPES):
+            return ret
         if isinstance(ret, basestring):
             return self._handle_binary_result(ret)
-        if isinstance(ret, (int, long, float)):
-            return ret
+        if isinstance(ret, Binary):
+            return _CompactBinary(ret.data)
+        if ret is None:
+            return ''
+        if isinstance(ret, list):
+            return self._handle_list(ret)
+        if isinstance(ret, dict) and self._plain_keys(ret):
+            converted = None
+            for key, value in ret.iteritems():
+                if not isinstance(value, SAFE_TYPES):
+                    handled = self._handle_return_value(value)
+                    if handled is not value:
+                        if converted is None:
+                            converted = dict(ret)
+                        converted[key] = handled
+            return ret if converted is None else converted
         if isinstance(ret, Mapping):
             return dict([(self._str(key), self._handle_return_value(value))
                          for key, value in ret.items()])
@@ -250,18 +1258,59 @@ class RobotRemoteServer(SimpleXMLRPCServer):
         except TypeError:
             return self._str(ret)
 
+    def _handle_list(self, ret):
+        types = set(map(type, ret))
+        if types <= NUMBER_TYPES:
+            return ret
+        # rows of strings of one type are checked by one scan
+        if len(types) == 1 and types <= set([str, unicode]):
+            joined = ret[0][:0].join(ret)
+            if (self._binary_threshold is None or
+                    len(joined) <= self._binary_threshold) and \
+                    not self._contains_binary(joined):
+                return ret
+        handle = self._handle_return_value
+        converted = None
+        for index, item in enumerate(ret):
+            if not isinstance(item, SAFE_TYPES):
+                handled = handle(item)
+                if handled is not item:
+                    if converted is None:
+                        converted = list(ret)
+                    converted[index] = handled
+        return ret if converted is None else converted
+
+    def _plain_keys(self, ret):
+        for key in ret:
+            if not isinstance(key, basestring) or self._contains_binary(key):
+                return False
+        return True
+
+    def _check_binary_threshold(self, threshold):
+        # strings are text on IronPython, returning them as binary would
+        # change their type in Robot Framework
+        if threshold is not None and sys.platform == 'cli':
+            self._log('Binary threshold is not supported on IronPython, '
+                      'all strings are scanned.', 'WARN')
+            return None
+        return threshold
+
     def _handle_binary_result(self, result):
+        if self._binary_threshold is not None and isinstance(result, str) \
+                and len(result) > self._binary_threshold:
+            return _CompactBinary(result)
         if not self._contains_binary(result):
             return result
         try:
             result = str(result)
         except UnicodeError:
             raise ValueError("Cannot represent %r as binary." % result)
-        return Binary(result)
+        return _CompactBinary(result)
 
     def _contains_binary(self, result):
-        return (BINARY.search(result) or isinstance(result, str) and
-                sys.platform != 'cli' and NON_ASCII.search(result))
+        if isinstance(result, str) and sys.platform != 'cli':
+            return BINARY_OR_NON_ASCII.search(result)
+        return BINARY.search(result)
 
     def _str(self, item, handle_binary=True):
         if item is None:
@@ -273,17 +1322,19 @@ class RobotRemoteServer(SimpleXMLRPCServer):
         return item
 
     def _intercept_std_streams(self):
-        sys.stdout = StringIO()
-        sys.stderr = StringIO()
+        # streams are not replaced yet when server is not serving
+        if not isinstance(sys.stdout, ThreadLocalStream):
+            sys.stdout = ThreadLocalStream(sys.stdout, self._max_output)
+        if not isinstance(sys.stderr, ThreadLocalStream):
+            sys.stderr = ThreadLocalStream(sys.stderr, self._max_output)
+        sys.stdout.capture()
+        sys.stderr.capture()
 
     def _restore_std_streams(self):
-        stdout = sys.stdout.getvalue()
-        stderr = sys.stderr.getvalue()
-        close = [sys.stdout, sys.stderr]
-        sys.stdout = sys.__stdout__
-        sys.stderr = sys.__stderr__
-        for stream in close:
-            stream.close()
+        stdout = sys.stdout.release()
+        stderr = sys.stderr.release()
+        if not stdout and not stderr:
+            return ''
         if stdout and stderr:
             if not stderr.startswith(('*TRACE*', '*DEBUG*', '*INFO*', '*HTML*',
                                       '*WARN*')):
@@ -296,7 +1347,8 @@ class RobotRemoteServer(SimpleXMLRPCServer):
         if level:
             msg = '*%s* %s' % (level.upper(), msg)
         self._write_to_stream(msg, sys.stdout)
-        if sys.__stdout__ is not sys.stdout:
+        if sys.__stdout__ is not sys.stdout and \
+                getattr(sys.stdout, 'capturing', True):
             self._write_to_stream(msg, sys.__stdout__)
 
     def _write_to_stream(self, msg, stream):
@@ -305,8 +1357,6 @@ class RobotRemoteServer(SimpleXMLRPCServer):
 
 
 if __name__ == '__main__':
-    import xmlrpclib
-
     def stop(uri):
         server = test(uri, log_success=False)
         if server is not None:
@@ -2,12 +2,6 @@
     Remote ranorex library for robot framework
     All commands return True if they are executed correctly
 """
-#iron python ]%imports
-import clr
-clr.AddReference('Ranorex.Core')
-clr.AddReference('System.Windows.Forms')
-import System.Windows.Forms
-import Ranorex
 #python imports
 from argparse import ArgumentParser
 from robotremoteserver import RobotRemoteServer
@@ -16,20 +10,1438 @@ import logging
 import time
 import sys
 import os
+import re
+import threading
+import tempfile
 import xml.etree.ElementTree as ET
 import difflib
+import base64
+import csv
+import hashlib
+import json
+from xmlrpclib import Binary
+from StringIO import StringIO
+from collections import OrderedDict, deque
+from itertools import izip_longest, count
 
 
 log = logging.getLogger("RXCONNECTOR")
 
+# used to report start-up time of connector
+_IMPORTED = time.time()
+
+DEFAULT_CACHE_SIZE = 50
+XML_CACHE_BYTES = 64 * 1024 * 1024
+XML_STREAM_BATCH = 500
+DIFF_CONTEXT = 3
+DIFF_MEMORY_LIMIT = 64 * 1024 * 1024
+# lines held by difflib take about this many times their size in memory
+DIFF_MEMORY_FACTOR = 4
+SCRIPT_MEMORY_LIMIT = 1024 * 1024
+SCRIPT_READ_SIZE = 8192
+COMPARE_CHUNK = 1024 * 1024
+DEFAULT_RETRY_DEADLINE = 2000
+DEFAULT_POLL_INTERVAL = 100
+MAX_POLL_INTERVAL = 1000
+POLL_BACKOFF = 1.5
+WAIT_REPORT_SIZE = 1000
+PROCESS_POLL_INTERVAL = 250
+LOCATOR_TYPES_SIZE = 10000
+ITEM_INDEX_SIZE = 100
+LOCATOR_INDEX_FORMAT = 1
+LOCATOR_INDEX_SIZE = 5000
+LOCATOR_PROFILE_SIZE = 1000
+
+# monotonic clock; time.clock does not jump with system time on windows
+if hasattr(time, 'monotonic'):
+    _now = time.monotonic
+elif sys.platform in ('win32', 'cli'):
+    _now = time.clock
+else:
+    _now = time.time
+
+# lower case name -> ranorex adapter type
+SUPPORTED_TYPES = dict((name.lower(), name) for name in (
+    'AbbrTag', 'AcronymTag', 'AddressTag', 'AreaTag',
+    'ArticleTag', 'AsideTag', 'ATag', 'AudioTag',
+    'BaseFontTag', 'BaseTag', 'BdoTag', 'BigTag',
+    'BodyTag', 'BrTag', 'BTag', 'Button',
+    'ButtonTag', 'CanvasTag', 'Cell', 'CenterTag',
+    'CheckBox', 'CiteTag', 'CodeTag', 'ColGroupTag',
+    'ColTag', 'Column', 'ComboBox', 'CommandTag',
+    'Container', 'ContextMenu', 'DataListTag',
+    'DdTag', 'DelTag', 'DetailsTag', 'DfnTag',
+    'DirTag', 'DivTag', 'DlTag', 'EmbedTag', 'EmTag',
+    'FieldSetTag', 'FigureTag', 'FontTag', 'Form', 'FormTag',
+    'Link', 'List', 'ListItem', 'MenuBar',
+    'MenuItem', 'Picture', 'ProgressBar',
+    'RadioButton', 'Row', 'ScrollBar', 'Slider',
+    'StatusBar', 'Table', 'Text', 'TitleBar', 'ToggleButton',
+    'Tree', 'TreeItem', 'Unknown'))
+
+# locator -> resolved adapter type, cleared when it grows over limit
+_LOCATOR_TYPES = {}
+
+# characters that start or end a step, predicate or quoted string
+_STEP_CHARS = re.compile(r"""[/\[\]'"]""")
+# [n], [last()] or [last()-n] predicate of ElementTree xpath
+_XPATH_POSITION = re.compile(r"\[\s*(?:\d+|last\(\)[^\]]*)\s*\]")
+
+
+def _last_step(locator):
+    """ Returns last step of locator. Slashes inside of predicates
+    or quoted strings are not treated as step separators.
+    """
+    # part after the last slash is the last step when it is well formed,
+    # otherwise the slash is inside of predicate and locator is scanned
+    start = locator.rfind('/') + 1
+    step_start = _step_start(locator, start)
+    if step_start != start:
+        step_start = _step_start(locator, 0)
+    return locator[step_start:]
+
+
+def _step_start(locator, start):
+    """ Returns index where last step starts when locator is scanned
+    from start, -1 when the scanned part is not well formed
+    """
+    depth = 0
+    quote = None
+    for match in _STEP_CHARS.finditer(locator, start):
+        index, char = match.start(), match.group()
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in '\'"':
+            quote = char
+        elif char == '[':
+            depth += 1
+        elif char == ']':
+            depth -= 1
+            if depth < 0:
+                return -1
+        elif char == '/' and depth == 0:
+            start = index + 1
+    if quote or depth:
+        return -1
+    return start
+
+
+def _locator_steps(locator):
+    """ Returns steps of locator with their leading slashes, i.e.
+    ['/form', "//button[@text='a/b']"] for /form//button[@text='a/b']
+    """
+    pieces = []
+    depth = 0
+    quote = None
+    start = 0
+    for index, char in enumerate(locator):
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in '\'"':
+            quote = char
+        elif char == '[':
+            depth += 1
+        elif char == ']':
+            depth -= 1
+        elif char == '/' and depth == 0:
+            pieces.append(locator[start:index])
+            start = index + 1
+    pieces.append(locator[start:])
+    steps = []
+    prefix = ''
+    for index, piece in enumerate(pieces):
+        if index > 0:
+            prefix += '/'
+        if piece:
+            steps.append(prefix + piece)
+            prefix = ''
+    return steps
+
+
+def _adapter_is_valid(element):
+    """ Returns True if adapter still points to existing UI element """
+    try:
+        return bool(element.Element.Valid)
+    except Exception:
+        return False
+
+
+class RetryPolicy(object):
+    """ Describes how long and how often element creation is retried
+    when element is not found. All times are in milliseconds.
+    """
+    def __init__(self, deadline=DEFAULT_RETRY_DEADLINE, initial_delay=100,
+                 backoff=2.0, max_delay=1000):
+        self.deadline = int(deadline)
+        self.initial_delay = int(initial_delay)
+        self.backoff = float(backoff)
+        self.max_delay = int(max_delay)
+        if self.deadline < 0 or self.initial_delay < 0 or self.max_delay < 0:
+            raise AssertionError("Retry times must not be negative")
+        if self.backoff < 1:
+            raise AssertionError("Backoff factor must be at least 1")
+
+    def as_dict(self):
+        return {'deadline': self.deadline,
+                'initial_delay': self.initial_delay,
+                'backoff': self.backoff,
+                'max_delay': self.max_delay}
+
+
+class OutputBuffer(object):
+    """ Output of script. Kept in memory up to memory_limit bytes,
+    whole output is moved into temporary file when it grows over it.
+    """
+    def __init__(self, memory_limit=SCRIPT_MEMORY_LIMIT):
+        self.memory_limit = memory_limit
+        self.size = 0
+        self._chunks = []
+        self._file = None
+        self._lock = threading.Lock()
+
+    def write(self, data):
+        with self._lock:
+            if self._file is None and \
+                    self.size + len(data) > self.memory_limit:
+                self._file = tempfile.TemporaryFile()
+                self._file.write(''.join(self._chunks))
+                self._chunks = None
+            if self._file is None:
+                self._chunks.append(data)
+            else:
+                self._file.seek(0, os.SEEK_END)
+                self._file.write(data)
+            self.size += len(data)
+
+    def read(self, offset=0, size=-1):
+        """ Returns at most size bytes starting at offset """
+        with self._lock:
+            if self._file is not None:
+                self._file.seek(offset)
+                return self._file.read(size)
+            data = ''.join(self._chunks)
+            self._chunks = [data]
+            if size < 0:
+                return data[offset:]
+            return data[offset:offset + size]
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+            self._chunks = []
+
+
+class AsyncWait(object):
+    """ Condition checked in background until it is met or until
+    timeout. Conditions: exists, not_exists, attribute_equals and
+    attribute_matches (regular expression).
+    """
+    CONDITIONS = ('exists', 'not_exists', 'attribute_equals',
+                  'attribute_matches')
+
+    def __init__(self, wait_id, locator, timeout, condition='exists',
+                 attribute=None, expected=None):
+        if condition not in self.CONDITIONS:
+            raise AssertionError("Condition must be one of %s" %
+                                 ', '.join(self.CONDITIONS))
+        if condition.startswith('attribute') and \
+                (attribute is None or expected is None):
+            raise AssertionError("Condition %s needs attribute and "
+                                 "expected value" % condition)
+        self.id = wait_id
+        self.locator = locator
+        self.condition = condition
+        self.attribute = attribute
+        self.expected = expected
+        if condition == 'attribute_matches':
+            self.pattern = re.compile(expected)
+        self.started = _now()
+        self.deadline = self.started + int(timeout) / 1000.0
+        self.state = 'pending'
+        self.finished = None
+        self.value = None
+        self.polls = 0
+        self.done = threading.Event()
+
+    def met(self, element):
+        """ Returns True if condition is met, element is None if it
+        was not found
+        """
+        if self.condition == 'exists':
+            return element is not None
+        if self.condition == 'not_exists':
+            return element is None
+        if element is None:
+            return False
+        self.value = element.Element.GetAttributeValue(self.attribute)
+        if self.condition == 'attribute_equals':
+            return str(self.value) == str(self.expected)
+        return self.pattern.search(unicode(self.value)) is not None
+
+    def finish(self, state):
+        self.state = state
+        self.finished = _now()
+        self.done.set()
+
+    def status(self):
+        end = self.finished if self.finished is not None else _now()
+        return {'id': self.id, 'locator': self.locator,
+                'condition': self.condition, 'state': self.state,
+                'elapsed': int((end - self.started) * 1000),
+                'value': self.value}
+
+
+class ScriptJob(object):
+    """ Script running in background. Its output is collected by reader
+    threads so it can be read while script is still running.
+    """
+    def __init__(self, job_id, command, cwd=None):
+        self.id = job_id
+        self.command = command
+        self.killed = False
+        self.stdout = OutputBuffer()
+        self.stderr = OutputBuffer()
+        self._started = _now()
+        self._finished = None
+        self._process = subprocess.Popen(command, stdout=subprocess.PIPE,
+                                         stderr=subprocess.PIPE, cwd=cwd)
+        self._readers = [threading.Thread(target=self._collect,
+                                          args=(pipe, buffer))
+                         for pipe, buffer in
+                         ((self._process.stdout, self.stdout),
+                          (self._process.stderr, self.stderr))]
+        for reader in self._readers:
+            reader.daemon = True
+            reader.start()
+
+    @staticmethod
+    def _collect(pipe, buffer):
+        for data in iter(lambda: pipe.readline(SCRIPT_READ_SIZE), ''):
+            buffer.write(data)
+        pipe.close()
+
+    @property
+    def running(self):
+        return self._process.poll() is None
+
+    def wait(self, timeout=None):
+        """ Waits until script ends, returns False on timeout """
+        deadline = None if timeout is None else _now() + timeout / 1000.0
+        delay = 0.01
+        while self.running:
+            if deadline is not None:
+                remaining = deadline - _now()
+                if remaining <= 0:
+                    return False
+                delay = min(delay, remaining)
+            time.sleep(delay)
+            delay = min(delay * 2, 0.5)
+        for reader in self._readers:
+            reader.join()
+        if self._finished is None:
+            self._finished = _now()
+        return True
+
+    def kill(self):
+        if self.running:
+            self._process.kill()
+            self.killed = True
+        self.wait()
+
+    def status(self):
+        returncode = self._process.poll()
+        end = self._finished or _now()
+        return {'id': self.id, 'running': returncode is None,
+                'returncode': returncode, 'killed': self.killed,
+                'elapsed': int((end - self._started) * 1000),
+                'stdout_size': self.stdout.size,
+                'stderr_size': self.stderr.size}
+
+    def close(self):
+        self.stdout.close()
+        self.stderr.close()
+
+
+class XmlCache(object):
+    """ Parsed xml documents keyed by path. Document is parsed again when
+    modification time or size of file changes. Least recently used
+    documents are dropped when sum of file sizes exceeds max_bytes.
+    """
+    def __init__(self, max_bytes=XML_CACHE_BYTES):
+        self.max_bytes = int(max_bytes)
+        self._documents = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, xml_path):
+        """ Returns root element of parsed xml file """
+        key = os.path.abspath(xml_path)
+        stat = os.stat(key)
+        with self._lock:
+            cached = self._documents.pop(key, None)
+            if cached is not None:
+                self._bytes -= cached[1]
+                if cached[0] == (stat.st_mtime, stat.st_size):
+                    self.__store(key, cached)
+                    return cached[2]
+        root = _read_xml(key)
+        with self._lock:
+            self.__store(key, ((stat.st_mtime, stat.st_size),
+                               stat.st_size, root))
+        return root
+
+    def __store(self, key, cached):
+        if cached[1] > self.max_bytes:
+            return
+        old = self._documents.pop(key, None)
+        if old is not None:
+            self._bytes -= old[1]
+        self._documents[key] = cached
+        self._bytes += cached[1]
+        while self._bytes > self.max_bytes:
+            self._bytes -= self._documents.popitem(last=False)[1][1]
+
+    def flush(self):
+        """ Removes all parsed documents """
+        with self._lock:
+            self._documents.clear()
+            self._bytes = 0
+
+
+class ElementCache(object):
+    """ Bounded cache of already created adapters keyed by locator.
+    Least recently used adapter is dropped when cache is full.
+    Adapters that are no longer valid are dropped on lookup.
+    """
+    def __init__(self, size=DEFAULT_CACHE_SIZE, is_valid=_adapter_is_valid):
+        if int(size) < 1:
+            raise AssertionError("Cache size must be positive number")
+        self.size = int(size)
+        self.is_valid = is_valid
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self._elements = OrderedDict()
+
+    def __len__(self):
+        return len(self._elements)
+
+    def get(self, locator):
+        """ Returns cached adapter for locator or None """
+        element = self._elements.pop(locator, None)
+        if element is None:
+            self.misses += 1
+            return None
+        if not self.is_valid(element):
+            self.stale += 1
+            self.misses += 1
+            return None
+        self._elements[locator] = element
+        self.hits += 1
+        return element
+
+    def put(self, locator, element):
+        """ Stores adapter and evicts least recently used ones """
+        self._elements.pop(locator, None)
+        self._elements[locator] = element
+        while len(self._elements) > self.size:
+            self._elements.popitem(last=False)
+
+    def discard(self, locator):
+        """ Removes adapter for locator if it is cached """
+        self._elements.pop(locator, None)
+
+    def flush(self):
+        """ Removes all cached adapters """
+        self._elements.clear()
+
+    def statistics(self):
+        """ Returns dictionary with cache counters """
+        return {'size': self.size, 'cached': len(self._elements),
+                'hits': self.hits, 'misses': self.misses,
+                'stale': self.stale}
+
+
+def _write_atomically(path, data):
+    """ Writes data into temporary file next to path and renames it
+    over path, so reader never sees partly written file.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    handle, temporary = tempfile.mkstemp(
+        dir=directory, prefix='.%s.' % os.path.basename(path))
+    try:
+        with os.fdopen(handle, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            os.rename(temporary, path)
+        except OSError:
+            # rename does not replace existing file on windows
+            if not os.path.exists(path):
+                raise
+            os.remove(path)
+            os.rename(temporary, path)
+    except:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+
+
+class LocatorIndex(object):
+    """ Persisted index of locator -> path of resolved element with
+    observed resolution time in ms. Path is built by backend from
+    strongest attributes (control id, automation id) and is tried
+    before the original locator. Index file is used only when it has
+    same format, application and version. Least recently used locators
+    are dropped over size.
+    """
+    def __init__(self, path, application, version, size=LOCATOR_INDEX_SIZE):
+        if int(size) < 1:
+            raise AssertionError("Index size must be positive number")
+        self.path = path
+        self.application = application
+        self.version = version
+        self.size = int(size)
+        self.changed = False
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.load()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def load(self):
+        """ Reads index file, missing or foreign file starts empty index """
+        self._entries.clear()
+        try:
+            with open(self.path, 'rb') as f:
+                data = json.load(f, object_pairs_hook=OrderedDict)
+        except IOError:
+            return
+        except ValueError as error:
+            log.info("Locator index %s is damaged, starting new one: %s",
+                     self.path, error)
+            return
+        if data.get('format') != LOCATOR_INDEX_FORMAT or \
+                data.get('application') != self.application or \
+                data.get('version') != self.version:
+            log.info("Locator index %s belongs to other application, "
+                     "version or format, starting new one", self.path)
+            return
+        entries = data.get('entries', {}).items()
+        self._entries.update(entries[-self.size:])
+
+    def save(self):
+        """ Writes index if it changed. Returns True if it was written """
+        with self._lock:
+            if not self.changed:
+                return False
+            data = json.dumps({'format': LOCATOR_INDEX_FORMAT,
+                               'application': self.application,
+                               'version': self.version,
+                               'entries': self._entries},
+                              separators=(',', ':'))
+            self.changed = False
+        try:
+            _write_atomically(self.path, data)
+        except Exception:
+            self.changed = True
+            raise
+        return True
+
+    def path_of(self, locator):
+        """ Returns indexed path of locator or None """
+        with self._lock:
+            entry = self._entries.get(locator)
+            return entry and entry['path']
+
+    def record(self, locator, path, duration, indexed, fallback):
+        """ Stores path and resolution time of locator. indexed means
+        that element was found by indexed path, fallback that indexed
+        path did not find it.
+        """
+        with self._lock:
+            entry = self._entries.pop(locator, None)
+            if entry is None:
+                entry = {'path': None, 'calls': 0, 'indexed': 0,
+                         'fallbacks': 0, 'total': 0.0, 'max': 0.0}
+            entry['path'] = path
+            entry['calls'] += 1
+            entry['indexed'] += int(indexed)
+            entry['fallbacks'] += int(fallback)
+            entry['total'] = round(entry['total'] + duration, 3)
+            entry['max'] = round(max(entry['max'], duration), 3)
+            self._entries[locator] = entry
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+            self.changed = True
+
+    def slowest(self, count=10):
+        """ Returns locators with highest mean resolution time """
+        with self._lock:
+            entries = [(locator, dict(entry)) for locator, entry
+                       in self._entries.items() if entry['calls']]
+        report = []
+        for locator, entry in entries:
+            entry['locator'] = locator
+            entry['mean'] = round(entry['total'] / entry['calls'], 3)
+            report.append(entry)
+        report.sort(key=lambda entry: entry['mean'], reverse=True)
+        return report[:int(count)]
+
+
+class LocatorProfile(object):
+    """ Bounded aggregate of time in ms, attempts and outcome of lookups
+    per kind (resolve or wait) and locator. When profile is full, entry
+    with lowest total time is dropped, so slow locators are kept.
+    """
+    FIELDS = ('kind', 'locator', 'calls', 'cached', 'attempts', 'failures',
+              'total', 'mean', 'max')
+    ORDERS = ('mean', 'total', 'max', 'calls', 'attempts', 'failures')
+
+    def __init__(self, size=LOCATOR_PROFILE_SIZE):
+        if int(size) < 1:
+            raise AssertionError("Profile size must be positive number")
+        self.size = int(size)
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def record(self, kind, locator, duration, attempts, passed,
+               cached=False):
+        with self._lock:
+            entry = self._entries.get((kind, locator))
+            if entry is None:
+                if len(self._entries) >= self.size:
+                    cheapest = min(self._entries, key=lambda key:
+                                   self._entries[key]['total'])
+                    del self._entries[cheapest]
+                entry = self._entries[(kind, locator)] = {
+                    'calls': 0, 'cached': 0, 'attempts': 0, 'failures': 0,
+                    'total': 0.0, 'max': 0.0}
+            entry['calls'] += 1
+            entry['cached'] += int(cached)
+            entry['attempts'] += attempts
+            entry['failures'] += int(not passed)
+            entry['total'] += duration
+            entry['max'] = max(entry['max'], duration)
+
+    def reset(self):
+        with self._lock:
+            self._entries.clear()
+
+    def top(self, count=10, order='mean'):
+        """ Returns count entries with highest value of order """
+        if order not in self.ORDERS:
+            raise AssertionError("Order must be one of %s" %
+                                 ', '.join(self.ORDERS))
+        with self._lock:
+            entries = [(key, dict(entry)) for key, entry
+                       in self._entries.items()]
+        report = []
+        for (kind, locator), entry in entries:
+            entry['kind'] = kind
+            entry['locator'] = locator
+            entry['mean'] = round(entry['total'] / entry['calls'], 3)
+            entry['total'] = round(entry['total'], 3)
+            entry['max'] = round(entry['max'], 3)
+            report.append(entry)
+        report.sort(key=lambda entry: entry[order], reverse=True)
+        return report if count is None else report[:int(count)]
+
+    def write(self, path, output_format='csv'):
+        """ Writes profile as CSV or as folded stacks (kind;step;step
+        total time in microseconds) accepted by flamegraph.pl.
+        Returns number of written locators.
+        """
+        report = self.top(None, 'total')
+        output = StringIO()
+        if output_format == 'csv':
+            writer = csv.writer(output)
+            writer.writerow(self.FIELDS)
+            for entry in report:
+                writer.writerow([unicode(entry[field]).encode('utf-8')
+                                 for field in self.FIELDS])
+        elif output_format == 'folded':
+            for entry in report:
+                frames = [entry['kind']] + _locator_steps(entry['locator'])
+                # flamegraph.pl splits frames on ; and lines on newline
+                frames = [frame.replace(';', ',').replace('\n', ' ')
+                          for frame in frames]
+                output.write('%s %d\n' % (
+                    ';'.join(frames).encode('utf-8'),
+                    round(entry['total'] * 1000)))
+        else:
+            raise AssertionError("Format must be csv or folded")
+        _write_atomically(path, output.getvalue())
+        return len(report)
+
+
+IMAGE_FORMATS = {'png': 'Png', 'jpeg': 'Jpeg', 'jpg': 'Jpeg',
+                 'bmp': 'Bmp', 'gif': 'Gif'}
+
+
+class UIBackend(object):
+    """ Interface between RanorexLibrary and UI automation tool.
+    Library does not call ranorex directly, so other backend, i.e. fake
+    one for tests, can be passed to RanorexLibrary.
+    """
+    def load(self):
+        """ Loads everything needed. Called before first UI call, can be
+        called in advance to pay loading time early.
+        """
+        pass
+
+    def adapter(self, element_type, parent=None):
+        """ Returns callable creating adapter of type for locator.
+        Locator is searched from parent adapter if it is given.
+        """
+        raise NotImplementedError
+
+    def is_element_not_found(self, error):
+        """ Returns True if error means that element was not found """
+        raise NotImplementedError
+
+    def location(self, x, y):
+        """ Returns location relative to top left corner of element """
+        raise NotImplementedError
+
+    def right_button(self):
+        """ Returns value passed to adapter Click for right click """
+        raise NotImplementedError
+
+    def move_mouse(self, x, y):
+        raise NotImplementedError
+
+    def scroll(self, element, amount):
+        """ Moves mouse above element and turns wheel amount times """
+        raise NotImplementedError
+
+    def send_keys(self, target, key_seq):
+        """ Focuses element of locator or adapter and presses key sequence """
+        raise NotImplementedError
+
+    def exists(self, locator, timeout):
+        """ Returns True if element appears within timeout ms """
+        raise NotImplementedError
+
+    def items(self, element):
+        """ Returns list of item adapters of combobox or list,
+        None if element has no items
+        """
+        return None
+
+    def select_item(self, element, index):
+        """ Selects item by index without keyboard. Returns False if
+        element does not support it
+        """
+        return False
+
+    def set_key_delay(self, delay):
+        """ Sets duration of key press in ms, None restores default """
+        raise NotImplementedError
+
+    def element_path(self, element):
+        """ Returns absolute locator of adapter built from its strongest
+        attributes, None if backend cannot build it
+        """
+        return None
+
+    def run_application(self, app, params=None):
+        raise NotImplementedError
+
+    def scale_image(self, image, width, height):
+        """ Returns new image of given size, source is not disposed """
+        raise NotImplementedError
+
+    def crop_image(self, image, x, y, width, height):
+        """ Returns new image cut out of source, None if nothing is left """
+        raise NotImplementedError
+
+    def encode_image(self, image, image_format, quality=None):
+        """ Returns image encoded in format as byte string """
+        raise NotImplementedError
+
+
+class RanorexBackend(UIBackend):
+    """ Ranorex and .net assemblies are loaded on first use so connector
+    starts quickly and module can be imported without ranorex.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ranorex = None
+        self._default_key_delay = None
+
+    def load(self):
+        with self._lock:
+            if self._ranorex is not None:
+                return
+            started = _now()
+            import clr
+            clr.AddReference('Ranorex.Core')
+            clr.AddReference('System.Windows.Forms')
+            clr.AddReference('System.Drawing')
+            import System
+            import System.Windows.Forms
+            import System.Drawing
+            import System.Drawing.Imaging
+            import Ranorex
+            Ranorex.Validate.EnableReport = False
+            Ranorex.Adapter.DefaultUseEnsureVisible = True
+            self._system = System
+            self._ranorex = Ranorex
+            log.info("Ranorex loaded in %d ms", (_now() - started) * 1000)
+
+    @property
+    def ranorex(self):
+        if self._ranorex is None:
+            self.load()
+        return self._ranorex
+
+    @property
+    def system(self):
+        if self._ranorex is None:
+            self.load()
+        return self._system
+
+    def adapter(self, element_type, parent=None):
+        adapter = getattr(self.ranorex, element_type)
+        if parent is None:
+            return adapter
+        # no timeout, library retries by itself
+        timeout = self.ranorex.Duration(0)
+        return lambda locator: adapter(
+            parent.Element.FindSingle(locator, timeout))
+
+    def element_path(self, element):
+        try:
+            return str(element.GetPath())
+        except Exception as error:
+            log.debug("Path of %s not built: %s", element, error)
+            return None
+
+    def is_element_not_found(self, error):
+        error = getattr(error, 'clsException', error)
+        return isinstance(error, self.ranorex.ElementNotFoundException)
+
+    def location(self, x, y):
+        return self.ranorex.Location(x, y)
+
+    def right_button(self):
+        return self.system.Windows.Forms.MouseButtons.Right
+
+    def move_mouse(self, x, y):
+        self.ranorex.Mouse().MoveTo(x, y)
+
+    def scroll(self, element, amount):
+        mouse = self.ranorex.Mouse()
+        mouse.MoveTo(element.Element)
+        mouse.ScrollWheel(amount)
+
+    def send_keys(self, target, key_seq):
+        if not isinstance(target, basestring):
+            target = target.Element
+        self.ranorex.Keyboard.PrepareFocus(target)
+        self.ranorex.Keyboard.Press(key_seq)
+
+    def exists(self, locator, timeout):
+        return self.ranorex.Validate.Exists(locator, timeout) is None
+
+    def items(self, element):
+        try:
+            return list(element.Items)
+        except AttributeError:
+            return None
+
+    def select_item(self, element, index):
+        items = self.items(element)
+        if not items or not 0 <= index < len(items):
+            return False
+        try:
+            items[index].Select()
+        except Exception as error:
+            log.debug("Item %s could not be selected: %s", index, error)
+            return False
+        return True
+
+    def set_key_delay(self, delay):
+        keyboard = self.ranorex.Keyboard
+        if self._default_key_delay is None:
+            self._default_key_delay = keyboard.DefaultKeyPressTime
+        if delay is None:
+            delay = self._default_key_delay
+        keyboard.DefaultKeyPressTime = delay
+
+    def run_application(self, app, params=None):
+        if params is None:
+            self.ranorex.Host.Local.RunApplication(app)
+        else:
+            self.ranorex.Host.Local.RunApplication(app, params)
+
+    def scale_image(self, image, width, height):
+        drawing = self.system.Drawing
+        return drawing.Bitmap(image, drawing.Size(width, height))
+
+    def crop_image(self, image, x, y, width, height):
+        drawing = self.system.Drawing
+        rect = drawing.Rectangle(x, y, width, height)
+        rect.Intersect(drawing.Rectangle(0, 0, image.Width, image.Height))
+        if rect.Width <= 0 or rect.Height <= 0:
+            return None
+        return image.Clone(rect, image.PixelFormat)
+
+    def encode_image(self, image, image_format, quality=None):
+        system = self.system
+        imaging = system.Drawing.Imaging
+        name = IMAGE_FORMATS[image_format.lower()]
+        fmt = getattr(imaging.ImageFormat, name)
+        stream = system.IO.MemoryStream()
+        try:
+            if quality is not None and name == 'Jpeg':
+                codec = [c for c in imaging.ImageCodecInfo.GetImageEncoders()
+                         if c.FormatID == fmt.Guid][0]
+                params = imaging.EncoderParameters(1)
+                params.Param[0] = imaging.EncoderParameter(
+                    imaging.Encoder.Quality, system.Int64(int(quality)))
+                image.Save(stream, codec, params)
+            else:
+                image.Save(stream, fmt)
+            # latin-1 maps every byte to one character of the same value
+            return system.Text.Encoding.GetEncoding('iso-8859-1').GetString(
+                stream.ToArray())
+        finally:
+            stream.Dispose()
+
+
+def _to_bool(value):
+    """ Converts robot framework argument into boolean """
+    if isinstance(value, basestring):
+        return value.strip().upper() not in ('', 'FALSE', 'NO', '0', 'NONE')
+    return bool(value)
+
+
+def _parse_indexes(indexes):
+    """ Returns list of ints from list or comma separated string """
+    if indexes in (None, ''):
+        return None
+    if isinstance(indexes, basestring):
+        indexes = indexes.split(',')
+    return [int(index) for index in indexes]
+
+
+def _pick(cells, indexes, text=False):
+    """ Returns selected cells (their texts) in requested order """
+    if indexes is not None:
+        cells = [cells[index] for index in indexes]
+    if text:
+        return [cell.Text for cell in cells]
+    return list(cells)
+
+
+def _files_equal(file_a, file_b):
+    """ Compares files chunk by chunk, stops on first difference """
+    if os.path.getsize(file_a) != os.path.getsize(file_b):
+        return False
+    with open(file_a, 'rb') as fa:
+        with open(file_b, 'rb') as fb:
+            while True:
+                chunk = fa.read(COMPARE_CHUNK)
+                if chunk != fb.read(COMPARE_CHUNK):
+                    return False
+                if not chunk:
+                    return True
+
+
+def _filtered_lines(lines, ignore):
+    """ Yields lines that do not match ignore pattern """
+    for line in lines:
+        if ignore is None or not ignore.search(line):
+            yield line
+
+
+def _format_range(start, stop):
+    """ Returns line range of unified diff hunk header """
+    beginning = start + 1
+    length = stop - start
+    if length == 1:
+        return '%d' % beginning
+    if not length:
+        beginning -= 1
+    return '%d,%d' % (beginning, length)
+
+
+def _equal_opcode(i1, j1, lines, context):
+    """ Returns equal opcode, of its lines only first and last context
+    lines are kept, hunks never print more of them
+    """
+    count = len(lines)
+    return ('equal', i1, i1 + count, j1, j1 + count, lines[:context],
+            lines[max(0, count - context):])
+
+
+def _matcher_opcodes(matcher, lines_a, lines_b, offset_a=0, offset_b=0,
+                     context=DIFF_CONTEXT):
+    """ Yields opcodes of matcher as (tag, i1, i2, j1, j2, a, b), a and b
+    are changed lines or first and last context lines of equal range
+    """
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            yield _equal_opcode(i1 + offset_a, j1 + offset_b,
+                                lines_a[i1:i2], context)
+        else:
+            yield (tag, i1 + offset_a, i2 + offset_a, j1 + offset_b,
+                   j2 + offset_b, lines_a[i1:i2], lines_b[j1:j2])
+
+
+def _windowed_opcodes(lines_a, lines_b, window, context=DIFF_CONTEXT):
+    """ Yields opcodes of two line iterators, see _matcher_opcodes.
+    Common lines are streamed, differing parts are matched in windows
+    of about window bytes of each file. Window is consumed up to its last
+    common block and the rest is matched again with following lines,
+    so only hunks longer than window may be aligned differently than
+    difflib does.
+    """
+    buffer_a, buffer_b = [], []
+    size_a = size_b = 0
+    base_a = base_b = 0
+    end_a = end_b = False
+    while True:
+        if not buffer_a and not buffer_b:
+            head = []
+            tail = deque(maxlen=context)
+            common = 0
+            for line_a, line_b in izip_longest(lines_a, lines_b):
+                if line_a != line_b:
+                    break
+                if common < context:
+                    head.append(line_a)
+                tail.append(line_a)
+                common += 1
+            else:
+                line_a = line_b = None
+                end_a = end_b = True
+            if common:
+                yield ('equal', base_a, base_a + common, base_b,
+                       base_b + common, head, list(tail))
+                base_a += common
+                base_b += common
+            if line_a is None:
+                end_a = True
+            else:
+                buffer_a.append(line_a)
+                size_a += len(line_a)
+            if line_b is None:
+                end_b = True
+            else:
+                buffer_b.append(line_b)
+                size_b += len(line_b)
+            if end_a and end_b and not buffer_a and not buffer_b:
+                return
+        while not end_a and size_a < window:
+            line = next(lines_a, None)
+            if line is None:
+                end_a = True
+            else:
+                buffer_a.append(line)
+                size_a += len(line)
+        while not end_b and size_b < window:
+            line = next(lines_b, None)
+            if line is None:
+                end_b = True
+            else:
+                buffer_b.append(line)
+                size_b += len(line)
+        matcher = difflib.SequenceMatcher(None, buffer_a, buffer_b)
+        opcodes = list(_matcher_opcodes(matcher, buffer_a, buffer_b,
+                                        base_a, base_b, context))
+        cut = len(opcodes)
+        if not (end_a and end_b):
+            equal = [index for index, opcode in enumerate(opcodes)
+                     if opcode[0] == 'equal']
+            # window without common block in its second half is taken
+            # as changed, otherwise matching of it would not advance
+            if equal:
+                last = opcodes[equal[-1]]
+                if 2 * (last[2] - base_a + last[4] - base_b) >= \
+                        len(buffer_a) + len(buffer_b):
+                    cut = equal[-1] + 1
+        for opcode in opcodes[:cut]:
+            yield opcode
+        consumed_a = opcodes[cut - 1][2] - base_a
+        consumed_b = opcodes[cut - 1][4] - base_b
+        size_a -= sum(len(line) for line in buffer_a[:consumed_a])
+        size_b -= sum(len(line) for line in buffer_b[:consumed_b])
+        del buffer_a[:consumed_a]
+        del buffer_b[:consumed_b]
+        base_a += consumed_a
+        base_b += consumed_b
+        if end_a and end_b and not buffer_a and not buffer_b:
+            return
+
+
+def _merged_opcodes(opcodes, context=DIFF_CONTEXT):
+    """ Joins neighbouring equal opcodes of windows """
+    previous = None
+    for opcode in opcodes:
+        if previous is not None and previous[0] == opcode[0] == 'equal':
+            length = previous[2] - previous[1]
+            head = previous[5]
+            if length < context:
+                head = (head + opcode[5])[:context]
+            tail = opcode[6]
+            if opcode[2] - opcode[1] < context:
+                tail = (previous[6] + tail)[-context:] if context else []
+            previous = ('equal', previous[1], opcode[2], previous[3],
+                        opcode[4], head, tail)
+            continue
+        if previous is not None:
+            yield previous
+        previous = opcode
+    if previous is not None:
+        yield previous
+
+
+def _diff_opcodes(file_a, file_b, ignore=None, context=DIFF_CONTEXT,
+                  memory_limit=DIFF_MEMORY_LIMIT):
+    """ Yields opcodes of diff of two files, see _matcher_opcodes. Files
+    whose lines fit into memory_limit bytes together are compared whole,
+    so the diff is same as difflib.unified_diff makes. Bigger files are
+    compared by _windowed_opcodes with windows of the same memory.
+    """
+    # lines and the matcher take several times size of the lines
+    lines_limit = memory_limit // DIFF_MEMORY_FACTOR
+    if os.path.getsize(file_a) + os.path.getsize(file_b) <= lines_limit:
+        with open(file_a, 'r') as fa:
+            lines_a = fa.readlines()
+        with open(file_b, 'r') as fb:
+            lines_b = fb.readlines()
+        if ignore is not None:
+            lines_a = list(_filtered_lines(lines_a, ignore))
+            lines_b = list(_filtered_lines(lines_b, ignore))
+        matcher = difflib.SequenceMatcher(None, lines_a, lines_b)
+        for opcode in _matcher_opcodes(matcher, lines_a, lines_b,
+                                       context=context):
+            yield opcode
+        return
+    with open(file_a, 'r') as fa:
+        with open(file_b, 'r') as fb:
+            opcodes = _windowed_opcodes(_filtered_lines(fa, ignore),
+                                        _filtered_lines(fb, ignore),
+                                        max(1, lines_limit // 2), context)
+            for opcode in _merged_opcodes(opcodes, context):
+                yield opcode
+
+
+def _equal_lines(opcode, i1, i2, context):
+    """ Returns lines i1:i2 of equal opcode, range is within its first
+    or last context lines or the whole range is not longer than both
+    """
+    head, tail = opcode[5], opcode[6]
+    if i2 - opcode[1] <= len(head):
+        return head[i1 - opcode[1]:i2 - opcode[1]]
+    start = opcode[2] - len(tail)
+    if i1 >= start:
+        return tail[i1 - start:i2 - start]
+    lines = head + tail[len(tail) - (opcode[2] - opcode[1] - len(head)):]
+    return lines[i1 - opcode[1]:i2 - opcode[1]]
+
+
+def _grouped_opcodes(opcodes, context=DIFF_CONTEXT):
+    """ Yields hunks of opcodes same as SequenceMatcher.get_grouped_opcodes,
+    opcodes are read one ahead. Hunk items are (opcode, i1, i2, j1, j2).
+    """
+    opcodes = iter(opcodes)
+    current = next(opcodes, None)
+    if current is None:
+        return
+    double = context + context
+    group = []
+    first = True
+    while current is not None:
+        following = next(opcodes, None)
+        tag, i1, i2, j1, j2 = current[:5]
+        if tag == 'equal':
+            if first:
+                i1, j1 = max(i1, i2 - context), max(j1, j2 - context)
+            if following is None:
+                i2, j2 = min(i2, i1 + context), min(j2, j1 + context)
+            if i2 - i1 > double:
+                group.append((current, i1, min(i2, i1 + context), j1,
+                              min(j2, j1 + context)))
+                yield group
+                group = []
+                i1, j1 = max(i1, i2 - context), max(j1, j2 - context)
+        group.append((current, i1, i2, j1, j2))
+        first = False
+        current = following
+    if group and not (len(group) == 1 and group[0][0][0] == 'equal'):
+        yield group
+
+
+def _unified_diff(opcodes, context=DIFF_CONTEXT):
+    """ Yields lines of unified diff of opcodes """
+    started = False
+    for group in _grouped_opcodes(opcodes, context):
+        if not started:
+            yield '--- \n'
+            yield '+++ \n'
+            started = True
+        first, last = group[0], group[-1]
+        yield '@@ -%s +%s @@\n' % (_format_range(first[1], last[2]),
+                                    _format_range(first[3], last[4]))
+        for opcode, i1, i2, j1, j2 in group:
+            tag = opcode[0]
+            if tag == 'equal':
+                for line in _equal_lines(opcode, i1, i2, context):
+                    yield ' ' + line
+                continue
+            if tag in ('replace', 'delete'):
+                for line in opcode[5]:
+                    yield '-' + line
+            if tag in ('replace', 'insert'):
+                for line in opcode[6]:
+                    yield '+' + line
+
+
+class _NulStrippingReader(object):
+    """ File wrapper dropping NUL bytes, used for streamed xml parsing """
+    def __init__(self, f):
+        self._file = f
+
+    def read(self, size=-1):
+        return self._file.read(size).replace('\x00', '')
+
+
+def _read_xml(xml_path):
+    """ Parses whole xml file and returns its root element """
+    with open(xml_path, 'r') as f:
+        return ET.fromstring(f.read().replace('\x00', ''))
+
+
+def _iterfind_xml(xml_path, xpath):
+    """ Finds element by xpath relative to root while streaming the file.
+    Completed children of root are searched in batches and dropped
+    afterwards, so only a few subtrees are kept in memory at once. Position among
+    children of root is not known then, such xpath is refused.
+    """
+    for step in _locator_steps(xpath):
+        if step.strip('/') == '.':
+            continue
+        if _XPATH_POSITION.search(step):
+            raise AssertionError("Position among children of root (%s) "
+                                 "cannot be used with stream" % step)
+        break
+    with open(xml_path, 'r') as f:
+        root = None
+        depth = 0
+        pending = 0
+        for event, elem in ET.iterparse(_NulStrippingReader(f),
+                                        events=('start', 'end')):
+            if event == 'start':
+                if root is None:
+                    root = elem
+                depth += 1
+                continue
+            depth -= 1
+            if depth == 1:
+                pending += 1
+                if pending < XML_STREAM_BATCH:
+                    continue
+                # parser reads ahead, root may already hold a started
+                # child after the completed ones, it is kept for next batch
+                batch = ET.Element(root.tag, root.attrib)
+                batch.extend(root[:pending])
+                found = batch.find(xpath)
+                if found is not None:
+                    return found
+                del root[:pending]
+                pending = 0
+    if root is not None:
+        return root.find(xpath)
+    return None
+
+
+def _process_key(process_name):
+    """ Returns process name in form used for exact comparison """
+    name = process_name.strip().lower()
+    if name.endswith('.exe'):
+        name = name[:-4]
+    return name
+
+
+class ProcessTable(object):
+    """ Queries processes running on local machine. Names are compared
+    exactly, case insensitive and with optional .exe suffix.
+    """
+    def is_running(self, process_name):
+        """ Returns True if process with given name is running """
+        raise NotImplementedError
+
+    def kill(self, process_name):
+        """ Kills all processes with given name and returns their count """
+        raise NotImplementedError
+
+
+class DotNetProcessTable(ProcessTable):
+    """ Enumerates processes in connector process through .net """
+    def __init__(self):
+        from System.Diagnostics import Process
+        self._process = Process
+
+    def is_running(self, process_name):
+        processes = self._process.GetProcessesByName(_process_key(process_name))
+        for process in processes:
+            process.Dispose()
+        return len(processes) > 0
+
+    def kill(self, process_name):
+        processes = self._process.GetProcessesByName(_process_key(process_name))
+        for process in processes:
+            process.Kill()
+            process.Dispose()
+        return len(processes)
+
+
+class PsutilProcessTable(ProcessTable):
+    """ Enumerates processes in connector process through psutil """
+    def __init__(self):
+        import psutil
+        self._psutil = psutil
+
+    def _find(self, process_name):
+        key = _process_key(process_name)
+        found = []
+        for process in self._psutil.process_iter():
+            try:
+                if _process_key(process.name()) == key:
+                    found.append(process)
+            except self._psutil.Error:
+                pass
+        return found
+
+    def is_running(self, process_name):
+        return len(self._find(process_name)) > 0
+
+    def kill(self, process_name):
+        killed = 0
+        for process in self._find(process_name):
+            try:
+                process.kill()
+                killed += 1
+            except self._psutil.NoSuchProcess:
+                pass
+        return killed
+
+
+class TasklistProcessTable(ProcessTable):
+    """ Queries processes by running tasklist and taskkill, both match
+    full image name, so it is given with .exe
+    """
+    def _image_names(self, process_name):
+        proc = subprocess.Popen(['tasklist', '/fo', 'csv', '/nh', '/fi',
+                                 'IMAGENAME eq %s.exe'
+                                 % _process_key(process_name)],
+                                stdout=subprocess.PIPE)
+        out = proc.communicate()[0] or ''
+        return [line.split('","')[0].strip('"')
+                for line in out.splitlines() if line.startswith('"')]
+
+    def is_running(self, process_name):
+        key = _process_key(process_name)
+        return any(_process_key(name) == key
+                   for name in self._image_names(process_name))
+
+    def kill(self, process_name):
+        if not self.is_running(process_name):
+            return 0
+        proc = subprocess.Popen(['taskkill', '/im',
+                                 _process_key(process_name) + '.exe', '/f'],
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        out = proc.communicate()
+        if 'SUCCESS' not in out[0]:
+            raise AssertionError("Process %s not terminated because of: %s" %
+                                 (process_name, out))
+        return out[0].count('SUCCESS')
+
+
+def _default_process_table():
+    """ Returns first available in-process table, tasklist otherwise """
+    for table in (DotNetProcessTable, PsutilProcessTable):
+        try:
+            return table()
+        except ImportError:
+            pass
+    return TasklistProcessTable()
+
+
 class RanorexLibrary(object):
     """ Basic implementation of ranorex object calls for
     robot framework
     """
-    def __init__(self):
+    # keywords that do not touch UI, threaded server runs them in parallel
+    ROBOT_CONCURRENT_KEYWORDS = ('cancel_wait', 'check_event_viewer',
+                                 'check_if_process_is_running',
+                                 'flush_xml_cache', 'get_script_status',
+                                 'get_wait_status',
+                                 'get_xml_attribute', 'get_xml_attributes',
+                                 'kill_process', 'kill_script', 'make_diff',
+                                 'read_script_output', 'release_script',
+                                 'run_script', 'run_script_with_parameters',
+                                 'start_script', 'start_wait',
+                                 'wait_for_all', 'wait_for_any',
+                                 'wait_for_process_to_start',
+                                 'wait_for_script')
+
+    def __init__(self, backend=None):
         self.debug = False
         self.model_loaded = False
         self.model = None
+        self.element_cache = None
+        self.retry_policy = RetryPolicy()
+        self.retry_statistics = {}
+        self.wait_report = deque(maxlen=WAIT_REPORT_SIZE)
+        self.processes = _default_process_table()
+        self.xml_cache = XmlCache()
+        self.script_jobs = {}
+        self.script_ids = count(1)
+        self.script_lock = threading.Lock()
+        # per thread time spent in resolution and retries, see get_metrics
+        self.counters = threading.local()
+        self.backend = backend or RanorexBackend()
+        self.ui_lock = threading.RLock()
+        self.key_delay = None
+        # (locator, adapter) of element relative locators are searched in
+        self.search_context = None
+        # (locator, attribute) -> (item count, {value: index})
+        self.item_indexes = {}
+        self.waits = {}
+        self.wait_ids = count(1)
+        self.wait_lock = threading.Condition()
+        self.wait_poller = None
+        # persisted locator -> fastest path, see enable_locator_index
+        self.locator_index = None
+        # time, attempts and outcome of lookups, see get_locator_profile
+        self.locator_profile = LocatorProfile()
+
+    def _warm_up(self, locators=()):
+        """ Loads backend and resolves locators in advance, elements are
+        kept if element cache is enabled. Errors are only logged.
+        """
+        started = _now()
+        self.backend.load()
+        single_try = RetryPolicy(deadline=0)
+        for locator in locators:
+            try:
+                self.__create_element(locator, single_try)
+            except Exception as error:
+                log.debug("Warm-up of %s failed: %s", locator, error)
+        log.info("Warm-up finished in %d ms", (_now() - started) * 1000)
 
     @classmethod
     def __return_type(cls, locator):
@@ -37,56 +1449,186 @@ class RanorexLibrary(object):
         .net object that is recognized by ranorex.
         Returns supported object type.
         """
-        Ranorex.Validate.EnableReport = False
-        Ranorex.Adapter.DefaultUseEnsureVisible = True
-        supported_types = ['AbbrTag', 'AcronymTag', 'AddressTag', 'AreaTag',
-                           'ArticleTag', 'AsideTag', 'ATag', 'AudioTag',
-                           'BaseFontTag', 'BaseTag', 'BdoTag', 'BigTag',
-                           'BodyTag', 'BrTag', 'BTag', 'Button',
-                           'ButtonTag', 'CanvasTag', 'Cell', 'CenterTag',
-                           'CheckBox', 'CiteTag', 'CodeTag', 'ColGroupTag',
-                           'ColTag', 'Column', 'ComboBox', 'CommandTag',
-                           'Container', 'ContextMenu', 'DataListTag',
-                           'DdTag', 'DelTag', 'DetailsTag', 'DfnTag',
-                           'DirTag', 'DivTag', 'DlTag', 'EmbedTag', 'EmTag',
-                           'FieldSetTag', 'FigureTag', 'FontTag', 'Form', 'FormTag',
-                           'Link', 'List', 'ListItem', 'MenuBar',
-                           'MenuItem', 'Picture', 'ProgressBar',
-                           'RadioButton', 'Row', 'ScrollBar', 'Slider',
-                           'StatusBar', 'Table', 'Text', 'TitleBar', 'ToggleButton',
-                           'Tree', 'TreeItem', 'Unknown']
-        splitted_locator = locator.split('/')
-        if "[" in splitted_locator[-1]:
-            ele = splitted_locator[-1].split('[')[0]
-        else:
-            ele = splitted_locator[-1]
-        for item in supported_types:
-            if ele.lower() == item.lower():
-                return item
-            elif ele.lower() == '':
-                raise AssertionError("No element entered")
-        raise AssertionError("Element is not supported. Entered element: %s" %
-                             ele)
-
-    def __create_element(self, locator):
+        element_type = _LOCATOR_TYPES.get(locator)
+        if element_type is not None:
+            return element_type
+        ele = _last_step(locator)
+        if '[' in ele:
+            ele = ele.split('[', 1)[0]
+        ele = ele.strip()
+        if ele == '':
+            raise AssertionError("No element entered")
+        element_type = SUPPORTED_TYPES.get(ele.lower())
+        if element_type is None:
+            raise AssertionError("Element is not supported. Entered element: %s" %
+                                 ele)
+        if len(_LOCATOR_TYPES) >= LOCATOR_TYPES_SIZE:
+            _LOCATOR_TYPES.clear()
+        _LOCATOR_TYPES[locator] = element_type
+        return element_type
+
+    def __in_context(self, locator):
+        """ Returns True if locator is searched from search context """
+        return self.search_context is not None and \
+            not locator.startswith('/')
+
+    def __key(self, locator):
+        """ Returns locator prefixed by search context if it is relative,
+        used as key of cache, index and statistics
+        """
+        if self.__in_context(locator):
+            return '%s/%s' % (self.search_context[0], locator)
+        return locator
+
+    def __create_element(self, locator, retry_policy=None):
+        started = _now()
+        self.counters.attempts = 0
+        key = locator
+        element = None
+        cached = False
+        try:
+            with self.ui_lock:
+                key = self.__key(locator)
+                if self.element_cache is not None:
+                    element = self.element_cache.get(key)
+                    if element is not None:
+                        cached = True
+                        if self.debug:
+                            log.debug("Element at %s taken from cache",
+                                      key)
+                        return element
+                if self.locator_index is not None:
+                    element = self.__indexed_element(locator, retry_policy,
+                                                     key)
+                else:
+                    element = self.__resolve_element(locator, retry_policy,
+                                                     key)
+                if self.element_cache is not None:
+                    self.element_cache.put(key, element)
+                return element
+        finally:
+            duration = (_now() - started) * 1000
+            self.counters.resolution_time = \
+                getattr(self.counters, 'resolution_time', 0.0) + duration
+            self.locator_profile.record('resolve', key, duration,
+                                        self.counters.attempts,
+                                        element is not None, cached)
+
+    def _close(self):
+        """ Called by remote server when session of this instance is
+        closed. Stops script jobs and drops cached data.
+        """
+        for job_id in list(self.script_jobs):
+            self.__release_job(job_id)
+        for wait_id in list(self.waits):
+            self.cancel_wait(wait_id)
+        self.element_cache = None
+        self.search_context = None
+        self.xml_cache.flush()
+        if self.locator_index is not None:
+            self.locator_index.save()
+
+    def _metrics_counters(self):
+        """ Counters of current thread read by remote server metrics """
+        return {'resolution_time': getattr(self.counters,
+                                           'resolution_time', 0.0),
+                'retries': getattr(self.counters, 'retries', 0)}
+
+    def __resolve_element(self, locator, retry_policy=None, key=None):
+        policy = retry_policy or self.retry_policy
+        key = key or locator
+        element_type = self.__return_type(locator)
+        relative = self.__in_context(locator)
+        if not relative:
+            adapter = self.backend.adapter(element_type)
+        deadline = _now() + policy.deadline / 1000.0
+        delay = policy.initial_delay / 1000.0
         tries = 0
-        element_created = False
-        while not element_created and tries < 3:
+        while True:
+            tries += 1
             try:
-                tries += 1
-                element_type = self.__return_type(locator)
-                element = getattr(Ranorex, element_type)(locator)
-                element_created = True
-                if self.debug:
-                    log.debug("Element at %s", locator)
-                    log.debug("Application object is %s", element)
-            except:
-                log.debug("Element %s not found, trying %s. time", element_type, tries)
-        if not element_created:
-            raise AssertionError("Element {} not found after {} tries".format(element_type, tries))
+                if relative:
+                    adapter = self.backend.adapter(element_type,
+                                                   self.__context_element())
+                element = adapter(locator)
+            except Exception as error:
+                # AssertionError means that search context is not found
+                if not isinstance(error, AssertionError) and \
+                        not self.backend.is_element_not_found(error):
+                    self.__record_attempts(key, tries, False)
+                    raise AssertionError(error)
+                remaining = deadline - _now()
+                if remaining <= 0:
+                    self.__record_attempts(key, tries, False)
+                    raise AssertionError("Element %s not found after %s tries" %
+                                         (key, tries))
+                log.debug("Element %s not found, trying %s. time",
+                          element_type, tries + 1)
+                time.sleep(min(delay, remaining))
+                delay = min(delay * policy.backoff, policy.max_delay / 1000.0)
+            else:
+                break
+        self.__record_attempts(key, tries, True)
+        if self.debug:
+            log.debug("Element at %s", key)
+            log.debug("Application object is %s", element)
+        return element
 
+    def __indexed_element(self, locator, retry_policy=None, key=None):
+        """ Tries path stored in locator index once, original locator is
+        resolved when path does not find element. Index is updated with
+        path of found element and time of resolution.
+        """
+        key = key or locator
+        index = self.locator_index
+        started = _now()
+        path = index.path_of(key)
+        if path is not None:
+            try:
+                adapter = self.backend.adapter(self.__return_type(locator))
+                element = adapter(path)
+            except Exception as error:
+                log.debug("Indexed path %s of %s failed: %s", path, key,
+                          error)
+            else:
+                self.__record_attempts(key, 1, True)
+                index.record(key, path, (_now() - started) * 1000, True,
+                             False)
+                return element
+        element = self.__resolve_element(locator, retry_policy, key)
+        index.record(key, self.backend.element_path(element),
+                     (_now() - started) * 1000, False, path is not None)
+        return element
+
+    def __context_element(self):
+        """ Returns adapter of search context. It is searched again from
+        desktop once it disappears, i.e. when dialog was reopened.
+        """
+        context, element = self.search_context
+        if element is None or not _adapter_is_valid(element):
+            if self.debug:
+                log.debug("Search context %s is not valid, searching again",
+                          context)
+            self.search_context = (context, None)
+            element = self.__resolve_element(context, RetryPolicy(deadline=0))
+            self.search_context = (context, element)
         return element
 
+    def __record_attempts(self, locator, tries, found):
+        stats = self.retry_statistics.get(locator)
+        if stats is None:
+            stats = self.retry_statistics[locator] = {
+                'calls': 0, 'attempts': 0, 'max_attempts': 0, 'failures': 0}
+        stats['calls'] += 1
+        stats['attempts'] += tries
+        self.counters.attempts = getattr(self.counters, 'attempts', 0) + \
+            tries
+        self.counters.retries = getattr(self.counters, 'retries', 0) + \
+            tries - 1
+        stats['max_attempts'] = max(stats['max_attempts'], tries)
+        if not found:
+            stats['failures'] += 1
+
     def start_debug(self):
         """ Starts to show debug messages on remote connector """
         self.debug = True
@@ -95,6 +1637,204 @@ class RanorexLibrary(object):
         """ Stops to show debug messages """
         self.debug = False
 
+    def set_retry_policy(self, deadline=DEFAULT_RETRY_DEADLINE,
+                         initial_delay=100, backoff=2.0, max_delay=1000):
+        """ Sets how element creation is retried when element is not found.
+        Delay between tries starts at initial_delay and is multiplied
+        by backoff after every try up to max_delay.
+
+        :param deadline: time in milliseconds after which element is
+                         reported as not found, 0 means single try
+        :param initial_delay: delay in milliseconds before second try
+        :param backoff: factor the delay is multiplied by after each try
+        :param max_delay: maximal delay in milliseconds between tries
+        :returns: previous retry policy as dictionary
+        """
+        if self.debug:
+            log.debug("Set Retry Policy: deadline %s, initial delay %s, "
+                      "backoff %s, max delay %s", deadline, initial_delay,
+                      backoff, max_delay)
+        previous = self.retry_policy
+        self.retry_policy = RetryPolicy(deadline, initial_delay,
+                                        backoff, max_delay)
+        return previous.as_dict()
+
+    def get_retry_statistics(self):
+        """ Returns how many tries were needed to create elements.
+
+        :returns: dictionary with locator as key and dictionary with
+                  "calls", "attempts", "max_attempts" and "failures"
+                  as value
+        """
+        return dict((locator, dict(stats)) for locator, stats
+                    in self.retry_statistics.items())
+
+    def reset_retry_statistics(self):
+        """ Clears statistics of element creation tries.
+
+        :returns: True
+        """
+        self.retry_statistics.clear()
+        return True
+
+    def get_locator_profile(self, count=10, order='mean'):
+        """ Returns slowest locators with their time of resolution
+        (resolve) and of Wait For Element (wait).
+
+        :param count: number of returned locators
+        :param order: mean, total, max, calls, attempts or failures
+        :returns: list of dictionaries with kind, locator, calls, cached
+                  (taken from element cache), attempts, failures and
+                  total, mean and max time in ms
+        """
+
+        return self.locator_profile.top(count, order)
+
+    def reset_locator_profile(self):
+        """ Clears profile returned by Get Locator Profile.
+
+        :returns: True
+        """
+
+        self.locator_profile.reset()
+        return True
+
+    def enable_element_cache(self, size=DEFAULT_CACHE_SIZE):
+        """ Enables caching of created elements by locator.
+        Cached element is reused until it is no longer valid.
+
+        :param size: maximal number of cached elements
+        :returns: True
+        """
+        if self.debug:
+            log.debug("Enable Element Cache of size %s", size)
+        self.element_cache = ElementCache(size)
+        return True
+
+    def disable_element_cache(self):
+        """ Disables caching of created elements and drops cached ones.
+
+        :returns: True
+        """
+        if self.debug:
+            log.debug("Disable Element Cache")
+        self.element_cache = None
+        return True
+
+    def flush_element_cache(self):
+        """ Removes all cached elements and item indexes used by
+        Select By Text and Select By Value. Counters are kept.
+
+        :returns: True
+        """
+        if self.debug:
+            log.debug("Flush Element Cache")
+        if self.element_cache is not None:
+            self.element_cache.flush()
+        self.item_indexes.clear()
+        return True
+
+    def get_element_cache_statistics(self):
+        """ Returns counters of element cache.
+
+        :returns: dictionary with "size", "cached", "hits", "misses"
+                  and "stale" as keys. Empty if cache is disabled
+        """
+        if self.element_cache is None:
+            return {}
+        return self.element_cache.statistics()
+
+    def enable_locator_index(self, path, application, version,
+                             size=LOCATOR_INDEX_SIZE):
+        """ Enables index of locators persisted in file. Path of every
+        resolved element (built by ranorex from control or automation
+        id) is stored with time of resolution and tried first next
+        time, also in later runs. Original locator is used when path
+        does not find element. Index in file is used only if it was
+        saved for same application and version.
+
+        :param path: path of index file on remote machine
+        :param application: name of tested application
+        :param version: version of tested application
+        :param size: maximal number of locators kept in index
+        :returns: number of locators loaded from file
+        """
+
+        if self.locator_index is not None:
+            self.locator_index.save()
+        self.locator_index = LocatorIndex(path, application, version, size)
+        if self.debug:
+            log.debug("Locator index %s loaded with %s locators", path,
+                      len(self.locator_index))
+        return len(self.locator_index)
+
+    def save_locator_index(self):
+        """ Writes locator index into its file if it changed.
+
+        :returns: True if file was written
+        """
+
+        if self.locator_index is None:
+            raise AssertionError("Locator index is not enabled")
+        return self.locator_index.save()
+
+    def disable_locator_index(self):
+        """ Saves locator index and stops using it.
+
+        :returns: True
+        """
+
+        if self.locator_index is not None:
+            self.locator_index.save()
+        self.locator_index = None
+        return True
+
+    def get_slow_locators(self, count=10):
+        """ Returns locators of locator index with highest mean time of
+        resolution.
+
+        :param count: number of returned locators
+        :returns: list of dictionaries with locator, path, calls, indexed
+                  (found by path), fallbacks (path did not find element),
+                  total, mean and max time in ms
+        """
+
+        if self.locator_index is None:
+            raise AssertionError("Locator index is not enabled")
+        return self.locator_index.slowest(count)
+
+    def set_search_context(self, locator=None):
+        """ Sets element that locators not starting with "/" are searched
+        in, i.e. "button[@text='OK']" or ".//text". Element is found once
+        and searched again only when it disappears.
+
+        :param locator: absolute xpath selector of element, context is
+                        cleared if not set
+        :returns: locator of previous search context, empty if not set
+        """
+        if self.debug:
+            log.debug("Set Search Context %s", locator)
+        previous = self.search_context[0] if self.search_context else ''
+        if not locator:
+            self.search_context = None
+            return previous
+        if not locator.startswith('/'):
+            raise AssertionError("Search context must be absolute locator, "
+                                 "got %s" % locator)
+        # absolute locator does not use context, previous one is kept
+        # if element is not found
+        with self.ui_lock:
+            element = self.__create_element(locator)
+            self.search_context = (locator, element)
+        return previous
+
+    def clear_search_context(self):
+        """ Clears search context, all locators are searched from desktop.
+
+        :returns: locator of previous search context, empty if not set
+        """
+        return self.set_search_context(None)
+
     def click_element(self, locator, location=None):
         """ Clicks on element identified by locator and location
 
@@ -117,7 +1857,7 @@ class RanorexLibrary(object):
                 if not isinstance(location, basestring):
                     raise AssertionError("Location must be a string")
                 location = [int(x) for x in location.split(',')]
-                element.Click(Ranorex.Location(location[0], location[1]))
+                element.Click(self.backend.location(location[0], location[1]))
                 return True
         except Exception as error:
             if self.debug:
@@ -154,18 +1894,15 @@ class RanorexLibrary(object):
         out = p.communicate()[0]
         return out
 
-    @classmethod
-    def check_if_process_is_running(cls, process_name):
+    def check_if_process_is_running(self, process_name):
         """ Check if process with desired name is running.
-            Returns name of process if running
+            Name must match exactly, .exe suffix is optional.
 
-        :param process_name: xpath selector of element
+        :param process_name: name of process, i.e. notepad.exe
         :returns: True/False
         """
 
-        proc = subprocess.Popen(['tasklist'], stdout=subprocess.PIPE)
-        out = proc.communicate()[0]
-        return out.find(process_name) != -1 if out else False
+        return self.processes.is_running(process_name)
 
     def clear_text(self, locator):
         """ Clears text from text box. Only element Text is supported.
@@ -203,21 +1940,74 @@ class RanorexLibrary(object):
                 if not isinstance(location, basestring):
                     raise AssertionError("Location must be a string")
                 location = [int(x) for x in location.split(',')]
-                element.DoubleClick(Ranorex.Location(location[0], location[1]))
+                element.DoubleClick(self.backend.location(location[0], location[1]))
                 return True
         except Exception as error:
             raise AssertionError(error)
 
-    def get_table(self, locator):
-        """ Get content of table without headers
+    def get_table(self, locator, start=0, count=None, columns=None,
+                  header=False, filter_column=None, filter_value=None):
+        """ Get content of table. Only requested rows and columns
+        are read from the application.
 
         :param locator: xpath string selecting element on screen
+        :param start: index of first returned row
+        :param count: maximal number of returned rows, all if not set
+        :param columns: indexes of returned columns as list or
+                        comma separated string, i.e. "0,2"
+        :param header: if True, first returned row contains column headers
+        :param filter_column: index of column checked by filter_value
+        :param filter_value: regular expression, only rows which cell in
+                             filter_column matches it are returned
         :returns: two dimensional array with content of the table
         """
 
+        if self.debug:
+            log.debug("Get Table %s", locator)
+            log.debug("Start: %s, count: %s, columns: %s", start, count,
+                      columns)
+        start = int(start)
+        count = None if count in (None, '') else int(count)
+        columns = _parse_indexes(columns)
+        element = self.__create_element(locator)
+        table = []
+        if _to_bool(header):
+            headers = [column.Text for column in element.Columns]
+            table.append(_pick(headers, columns))
+        if filter_value is not None:
+            if filter_column in (None, ''):
+                raise AssertionError("filter_column must be set together "
+                                     "with filter_value")
+            filter_column = int(filter_column)
+            pattern = re.compile(filter_value)
+        rows = element.Rows
+        total = len(rows)
+        selected = []
+        if filter_value is None:
+            index, skip = start, 0
+        else:
+            index, skip = 0, start
+        while index < total and (count is None or len(selected) < count):
+            cells = rows[index].Cells
+            index += 1
+            if filter_value is not None and \
+                    not pattern.search(cells[filter_column].Text or ''):
+                continue
+            if skip:
+                skip -= 1
+                continue
+            selected.append(_pick(cells, columns, text=True))
+        return table + selected
+
+    def get_table_row_count(self, locator):
+        """ Get number of rows of table, usable for paging of Get Table
+
+        :param locator: xpath string selecting element on screen
+        :returns: number of rows
+        """
+
         element = self.__create_element(locator)
-        table = [[cell.Text for cell in row.Cells] for row in element.Rows]
-        return table
+        return len(element.Rows)
 
     def get_element_attribute(self, locator, attribute):
         """ Get specified element attribute.
@@ -232,18 +2022,128 @@ class RanorexLibrary(object):
         if self.debug:
             log.debug("Found attribute value is: %s", _attribute)
         return _attribute
+
+    def get_element_attributes(self, locator, *attributes):
+        """ Get several attributes of element, element is found only once.
+
+        :param locator: xpath selector of element
+        :param attributes: names of attributes, either as separate
+                           arguments or as one list
+        :returns: dictionary with attribute names as keys
+        """
+        attributes = self.__attribute_names(attributes)
+        if self.debug:
+            log.debug("Get Element Attributes %s", attributes)
+        element = self.__create_element(locator).Element
+        return dict((attribute, element.GetAttributeValue(attribute))
+                    for attribute in attributes)
+
+    def get_attributes_of_elements(self, locators, *attributes):
+        """ Get same attributes of several elements. Element that can
+        not be found or read does not stop the others, its error is
+        reported instead.
+
+        :param locators: list of xpath selectors of elements
+        :param attributes: names of attributes, either as separate
+                           arguments or as one list
+        :returns: dictionary with "values" and "errors" as keys. Values
+                  is list with list of attribute values for every
+                  locator, errors is list with error message for every
+                  locator, empty if element was read
+        """
+        if isinstance(locators, basestring):
+            locators = [locators]
+        attributes = self.__attribute_names(attributes)
+        if self.debug:
+            log.debug("Get Attributes %s Of Elements %s", attributes,
+                      locators)
+        values = []
+        errors = []
+        for locator in locators:
+            try:
+                element = self.__create_element(locator).Element
+                values.append([element.GetAttributeValue(attribute)
+                               for attribute in attributes])
+                errors.append('')
+            except Exception as error:
+                if self.debug:
+                    log.debug("Reading of %s failed: %s", locator, error)
+                values.append([None] * len(attributes))
+                errors.append(unicode(error) or error.__class__.__name__)
+        return {'values': values, 'errors': errors}
+
+    @staticmethod
+    def __attribute_names(attributes):
+        if len(attributes) == 1 and not isinstance(attributes[0], basestring):
+            attributes = attributes[0]
+        if not attributes:
+            raise AssertionError("No attribute entered")
+        return list(attributes)
         
-    def get_xml_attribute(self, xml_path, xpath, attrib):
-        """ retrieves xml attribute using xpath """
+    def get_xml_attribute(self, xml_path, xpath, attrib, stream=False):
+        """ retrieves xml attribute using xpath. Parsed file is cached
+        until it is changed.
+
+        :param xml_path: path to xml file
+        :param xpath: xpath of element relative to root
+        :param attrib: name of attribute
+        :param stream: if True, file is not parsed as a whole, only
+                       subtree that contains element is kept in memory.
+                       Used for huge files, parsed file is not cached.
+                       First step of xpath cannot use position then
+                       (item[2], item[last()]), positions in later steps
+                       (group/item[2]) work
+        :returns: value of attribute
+        """
         if self.debug:
             log.debug("Retrieving %s attribute %s" % (xml_path, attrib))
             log.debug("Xpath of element: %s" % xpath)
-        with open(xml_path, 'r') as f:
-            x = f.read().replace('\x00','')
-            tree = ET.fromstring(x)
-            x = tree.find(xpath)
-        f.close()
-        return x.attrib[attrib]
+        if _to_bool(stream):
+            element = _iterfind_xml(xml_path, xpath)
+        else:
+            element = self.xml_cache.get(xml_path).find(xpath)
+        return self.__xml_attribute(element, xml_path, xpath, attrib)
+
+    def get_xml_attributes(self, xml_path, *queries):
+        """ retrieves several xml attributes at once. File is parsed
+        only once.
+
+        :param xml_path: path to xml file
+        :param queries: pairs of xpath and attribute name, either as
+                        flat list "xpath1, attrib1, xpath2, attrib2" or
+                        as one list of [xpath, attrib] lists
+        :returns: list of attribute values in order of queries
+        """
+        if len(queries) == 1 and not isinstance(queries[0], basestring):
+            pairs = [tuple(query) for query in queries[0]]
+        else:
+            if len(queries) % 2:
+                raise AssertionError("Xpath and attribute must be given "
+                                     "in pairs")
+            pairs = zip(queries[::2], queries[1::2])
+        if self.debug:
+            log.debug("Retrieving %s attributes %s" % (xml_path, pairs))
+        root = self.xml_cache.get(xml_path)
+        return [self.__xml_attribute(root.find(xpath), xml_path, xpath, attrib)
+                for xpath, attrib in pairs]
+
+    @staticmethod
+    def __xml_attribute(element, xml_path, xpath, attrib):
+        if element is None:
+            raise AssertionError("Element %s not found in %s" %
+                                 (xpath, xml_path))
+        if attrib not in element.attrib:
+            raise AssertionError("Element %s in %s has no attribute %s" %
+                                 (xpath, xml_path, attrib))
+        return element.attrib[attrib]
+
+    def flush_xml_cache(self):
+        """ Removes all parsed xml files from cache.
+
+        :returns: True
+        """
+        self.xml_cache.flush()
+        return True
 
     def input_text(self, locator, text):
         """ input texts into specified locator.
@@ -259,20 +2159,57 @@ class RanorexLibrary(object):
         element.PressKeys(text)
         return True
 
-    def make_diff(self, file_a, file_b):
-        """ makes diff between two files
+    def make_diff(self, file_a, file_b, ignore=None, max_output=None,
+                  summary=False, memory_limit=DIFF_MEMORY_LIMIT):
+        """ makes diff between two files. Identical files are recognized
+        without diffing. Files are diffed same as difflib.unified_diff
+        does when their lines fit into memory_limit (DIFF_MEMORY_LIMIT
+        by default). Bigger files are streamed, common lines are skipped
+        and differing parts are diffed in windows of memory_limit, only
+        hunks longer than window may be aligned differently.
+
         :param file_a: first file to compare
         :param file_b: second file to compare
-        :returns: output of diff (empty if no diff)
+        :param ignore: regular expression, matching lines are left out
+                       of comparison, i.e. timestamps
+        :param max_output: maximal number of characters of returned diff
+        :param summary: if True, only counts of changed lines are returned
+        :param memory_limit: bytes of memory used for lines of files
+        :returns: output of diff (empty if no diff) or dictionary with
+                  "added" and "removed" as keys if summary is requested
         """
         if self.debug:
             log.debug("First file: %s, Second file: %s", file_a, file_b)
-        ff = open(file_a, "r").readlines()
-        sf = open(file_b, "r").readlines()
-        output = ""
-        for line in difflib.unified_diff(ff, sf):
-            output += line
-        return output
+        summary = _to_bool(summary)
+        memory_limit = int(memory_limit)
+        if memory_limit <= 0:
+            raise AssertionError("Memory limit must be positive number")
+        pattern = re.compile(ignore) if ignore else None
+        opcodes = ()
+        if pattern is not None or not _files_equal(file_a, file_b):
+            opcodes = _diff_opcodes(file_a, file_b, pattern,
+                                    memory_limit=memory_limit)
+        if summary:
+            result = {'added': 0, 'removed': 0}
+            for opcode in opcodes:
+                tag, i1, i2, j1, j2 = opcode[:5]
+                if tag in ('replace', 'delete'):
+                    result['removed'] += i2 - i1
+                if tag in ('replace', 'insert'):
+                    result['added'] += j2 - j1
+            return result
+        limit = int(max_output) if max_output not in (None, '') else None
+        output = []
+        size = 0
+        for line in _unified_diff(opcodes):
+            if limit is not None and size + len(line) > limit:
+                output.append(line[:limit - size])
+                output.append("\n... diff truncated to %s characters\n"
+                              % limit)
+                break
+            output.append(line)
+            size += len(line)
+        return ''.join(output)
 
     def move_mouse_to(self, x, y):
         """ Move mouse to global coordinates
@@ -283,8 +2220,7 @@ class RanorexLibrary(object):
         """
         if self.debug:
             log.debug("Moving mouse to: %s,%s", x, y)
-        mouse = Ranorex.Mouse()
-        mouse.MoveTo(int(x), int(y))
+        self.backend.move_mouse(int(x), int(y))
         return True
 
     def right_click_element(self, locator, location=None):
@@ -303,14 +2239,14 @@ class RanorexLibrary(object):
         element = self.__create_element(locator)
         try:
             if location == None:
-                element.Click(System.Windows.Forms.MouseButtons.Right)
+                element.Click(self.backend.right_button())
                 return True
             else:
                 if not isinstance(location, basestring):
                     raise AssertionError("Locator must be a string")
                 location = [int(x) for x in location.split(',')]
-                element.Click(System.Windows.Forms.MouseButtons.Right,
-                          Ranorex.Location(location[0], location[1]))
+                element.Click(self.backend.right_button(),
+                          self.backend.location(location[0], location[1]))
                 return True
         except Exception as error:
             raise AssertionError(error)
@@ -325,7 +2261,7 @@ class RanorexLibrary(object):
         if self.debug:
             log.debug("Run Application %s", app)
             log.debug("Working dir: %s", os.getcwd())
-        Ranorex.Host.Local.RunApplication(app)
+        self.backend.run_application(app)
         return True
 
     def run_application_with_parameters(self, app, params):
@@ -339,7 +2275,7 @@ class RanorexLibrary(object):
         if self.debug:
             log.debug("Run Application %s With Parameters %s", app, params)
             log.debug("Working dir: %s", os.getcwd())
-        Ranorex.Host.Local.RunApplication(app, params)
+        self.backend.run_application(app, params)
         return True
 
     def run_script(self, script_path):
@@ -352,13 +2288,7 @@ class RanorexLibrary(object):
         if self.debug:
             log.debug("Run Script %s", script_path)
             log.debug("Working dir: %s", os.getcwd())
-        wd = os.path.dirname(script_path)
-        process = subprocess.Popen([script_path],
-                                   stdout=subprocess.PIPE,
-                                   stderr=subprocess.PIPE,
-                                   cwd=wd)
-        output = process.communicate()
-        return {'stdout':output[0], 'stderr':output[1]}
+        return self.__run_job([script_path])
 
     def run_script_with_parameters(self, script_path, *params):
         """ Runs script on remote machine and returns stdout and stderr.
@@ -369,16 +2299,117 @@ class RanorexLibrary(object):
         """
 
         params = list(params)
-        wd = os.path.dirname(script_path)
         if self.debug:
             log.debug("Run Script %s with params %s", script_path, params)
             log.debug("Working dir: %s", os.getcwd())
-        process = subprocess.Popen([script_path] + params,
-                                   stdout=subprocess.PIPE,
-                                   stderr=subprocess.PIPE,
-                                   cwd=wd)
-        output = process.communicate()
-        return {'stdout':output[0], 'stderr':output[1]}
+        return self.__run_job([script_path] + params)
+
+    def __run_job(self, command):
+        job = self.__start_job(command)
+        try:
+            job.wait()
+            return {'stdout': job.stdout.read(), 'stderr': job.stderr.read()}
+        finally:
+            self.__release_job(job.id)
+
+    def __start_job(self, command):
+        wd = os.path.dirname(command[0]) or None
+        with self.script_lock:
+            job = ScriptJob(next(self.script_ids), command, wd)
+            self.script_jobs[job.id] = job
+        return job
+
+    def __get_job(self, job_id):
+        job = self.script_jobs.get(int(job_id))
+        if job is None:
+            raise AssertionError("Script job %s does not exist" % job_id)
+        return job
+
+    def __release_job(self, job_id):
+        with self.script_lock:
+            job = self.script_jobs.pop(int(job_id), None)
+        if job is not None:
+            job.kill()
+            job.close()
+
+    def start_script(self, script_path, *params):
+        """ Starts script on remote machine and returns immediately.
+        Output of script is collected in background, output over 1MB
+        is kept in temporary file.
+
+        :param script_path: path to script to execute
+        :param params: parameters for script
+        :returns: id of script job
+        """
+
+        if self.debug:
+            log.debug("Start Script %s with params %s", script_path, params)
+        return self.__start_job([script_path] + list(params)).id
+
+    def get_script_status(self, job_id):
+        """ Returns state of script job.
+
+        :param job_id: id returned by Start Script
+        :returns: dictionary with "id", "running", "returncode", "killed",
+                  "elapsed" (ms), "stdout_size" and "stderr_size" as keys
+        """
+
+        return self.__get_job(job_id).status()
+
+    def read_script_output(self, job_id, offset=0, stream='stdout',
+                           size=-1):
+        """ Returns part of script output, usable while script is running.
+
+        :param job_id: id returned by Start Script
+        :param offset: position in output to read from
+        :param stream: "stdout" or "stderr"
+        :param size: maximal number of returned characters, all if -1
+        :returns: dictionary with "data" and "offset" as keys, offset
+                  is position to continue reading from
+        """
+
+        if stream not in ('stdout', 'stderr'):
+            raise AssertionError("Stream must be stdout or stderr")
+        offset = int(offset)
+        data = getattr(self.__get_job(job_id), stream).read(offset, int(size))
+        return {'data': data, 'offset': offset + len(data)}
+
+    def wait_for_script(self, job_id, timeout=None):
+        """ Waits until script job ends.
+
+        :param job_id: id returned by Start Script
+        :param timeout: timeout in milliseconds, no timeout if not set
+        :returns: status of job same as Get Script Status
+        """
+
+        job = self.__get_job(job_id)
+        timeout = None if timeout in (None, '') else int(timeout)
+        if not job.wait(timeout):
+            raise AssertionError("Script job %s still running after %sms" %
+                                 (job_id, timeout))
+        return job.status()
+
+    def kill_script(self, job_id):
+        """ Kills script job if it is still running.
+
+        :param job_id: id returned by Start Script
+        :returns: status of job same as Get Script Status
+        """
+
+        job = self.__get_job(job_id)
+        job.kill()
+        return job.status()
+
+    def release_script(self, job_id):
+        """ Kills script job if it is running and drops its output.
+
+        :param job_id: id returned by Start Script
+        :returns: True
+        """
+
+        self.__get_job(job_id)
+        self.__release_job(job_id)
+        return True
 
     def scroll(self, locator, amount):
         """ Hover above selected element and scroll positive or negative
@@ -390,33 +2421,127 @@ class RanorexLibrary(object):
         """
 
         element = self.__create_element(locator)
-        mouse = Ranorex.Mouse()
-        mouse.MoveTo(element.Element)
-        mouse.ScrollWheel(int(amount))
+        self.backend.scroll(element, int(amount))
 
     def select_by_index(self, locator, index):
-        """ Selects item from combobox according to index.
+        """ Selects item from combobox according to index. Item is
+        selected directly if element supports it, otherwise by pressing
+        up / down keys.
 
         :param locator: xpath selector of element
+        :param index: index of item, starting at 0
         :returns: True/False
         """
 
         if self.debug:
             log.debug("Select By Index %s", index)
         element = self.__create_element(locator)
+        self.__select_index(locator, element, int(index))
+        return True
+
+    def select_by_text(self, locator, text):
+        """ Selects item from combobox or list according to its text.
+        Texts of items are read once and kept until count of items
+        changes or text is not found.
+
+        :param locator: xpath selector of element
+        :param text: text of item
+        :returns: True/False
+        """
+
+        if self.debug:
+            log.debug("Select By Text %s", text)
+        element = self.__create_element(locator)
+        index = self.__item_index(locator, element, 'Text', text)
+        self.__select_index(locator, element, index)
+        return True
+
+    def select_by_value(self, locator, value):
+        """ Selects item from combobox or list according to its Value
+        attribute, i.e. value of option in web select. Values of items
+        are cached same way as in Select By Text.
+
+        :param locator: xpath selector of element
+        :param value: value of item
+        :returns: True/False
+        """
+
+        if self.debug:
+            log.debug("Select By Value %s", value)
+        element = self.__create_element(locator)
+        index = self.__item_index(locator, element, 'Value', value)
+        self.__select_index(locator, element, index)
+        return True
+
+    def __item_index(self, locator, element, attribute, value):
+        items = self.backend.items(element)
+        if items is None:
+            raise AssertionError("Element %s has no items" % locator)
+        key = (self.__key(locator), attribute)
+        cached = self.item_indexes.get(key)
+        if cached is not None and cached[0] == len(items) and \
+                value in cached[1]:
+            return cached[1][value]
+        index = {}
+        for position, item in enumerate(items):
+            item_value = item.Element.GetAttributeValue(attribute)
+            index.setdefault(unicode(item_value), position)
+        if self.debug:
+            log.debug("Item index of %s rebuilt, %s items", locator,
+                      len(items))
+        if len(self.item_indexes) >= ITEM_INDEX_SIZE:
+            self.item_indexes.clear()
+        self.item_indexes[key] = (len(items), index)
+        if value not in index:
+            raise AssertionError("Element %s has no item with %s %s" %
+                                 (locator, attribute, value))
+        return index[value]
+
+    def __select_index(self, locator, element, index):
+        if index < 0:
+            raise AssertionError("Element %s has no item at index %s" %
+                                 (locator, index))
+        if self.backend.select_item(element, index):
+            return
+        items = self.backend.items(element)
+        if items is not None and index >= len(items):
+            raise AssertionError("Element %s has no item at index %s" %
+                                 (locator, index))
         selected = element.Element.GetAttributeValue("SelectedItemIndex")
         if self.debug:
             log.debug("Selected item: %s", selected)
-        diff = int(selected) - int(index)
+        diff = int(selected) - index
         if self.debug:
             log.debug("Diff for keypress: %s", diff)
-        if diff >= 0:
-            for _ in range(0, diff):
-                element.PressKeys("{up}")
+        # one call, key delay of ranorex is paid per key only
+        if diff > 0:
+            element.PressKeys("{up}" * diff)
         elif diff < 0:
-            for _ in range(0, abs(diff)):
-                element.PressKeys("{down}")
-        return True
+            element.PressKeys("{down}" * -diff)
+
+    def set_key_delay(self, delay='default'):
+        """ Sets how long every key press takes in Input Text,
+        Clear Text, Send Keys and selection by keys. Lower delay
+        speeds up entering of long texts.
+
+        :param delay: time in milliseconds, 0 for fastest typing,
+                      "default" restores delay of ranorex
+        :returns: previous delay, "default" if it was not changed
+        """
+
+        if self.debug:
+            log.debug("Set Key Delay %s", delay)
+        if delay in (None, '', 'default'):
+            delay = None
+        else:
+            delay = int(delay)
+            if delay < 0:
+                raise AssertionError("Key delay must not be negative")
+        with self.ui_lock:
+            self.backend.set_key_delay(delay)
+        previous = self.key_delay
+        self.key_delay = delay
+        return 'default' if previous is None else previous
 
     def send_keys(self, locator, key_seq):
         """ Send key combination to specified element.
@@ -431,8 +2556,10 @@ class RanorexLibrary(object):
 
         if self.debug:
             log.debug("Send Keys %s", key_seq)
-        Ranorex.Keyboard.PrepareFocus(locator)
-        Ranorex.Keyboard.Press(key_seq)
+        if self.__in_context(locator):
+            self.backend.send_keys(self.__create_element(locator), key_seq)
+        else:
+            self.backend.send_keys(locator, key_seq)
         return True
 
     def set_focus(self, locator):
@@ -448,17 +2575,74 @@ class RanorexLibrary(object):
         element.Focus()
         return element.HasFocus
 
-    def take_screenshot(self, locator):
-        """ Takes screenshot and return it as base64.
+    def take_screenshot(self, locator, output='base64', image_format=None,
+                        quality=None, scale=None, crop_to=None, path=None):
+        """ Takes screenshot of element. Without options it returns
+        image compressed by ranorex as base64 string.
 
         :param locator: xpath selector of element
-        :returns: True/False
+        :param output: "base64" for base64 string, "binary" for raw bytes
+        :param image_format: png, jpeg, bmp or gif, png by default
+                             when any other option is used
+        :param quality: jpeg quality 0 - 100
+        :param scale: float, i.e. 0.5 makes image half the size
+        :param crop_to: xpath of element inside of captured element,
+                        image is cropped to its rectangle
+        :param path: if set, image is written into this file on remote
+                     machine and only its path, size and sha256 are returned
+        :returns: base64 string, binary data or dictionary with
+                  "path", "size" and "sha256" as keys
         """
         if self.debug:
             log.debug("Take Screenshot")
+        if output not in ('base64', 'binary'):
+            raise AssertionError("Output must be base64 or binary")
+        if image_format is not None and \
+                image_format.lower() not in IMAGE_FORMATS:
+            raise AssertionError("Image format %s is not supported. Supported "
+                                 "formats: %s" % (image_format,
+                                                  ', '.join(sorted(IMAGE_FORMATS))))
         element = self.__create_element(locator)
-        img = element.CaptureCompressedImage()
-        return img.ToBase64String()
+        if (output == 'base64' and path is None and image_format is None
+                and quality is None and scale is None and crop_to is None):
+            img = element.CaptureCompressedImage()
+            return img.ToBase64String()
+        bitmap = element.CaptureImage()
+        try:
+            if crop_to is not None:
+                bitmap = self.__crop_image(bitmap, element, crop_to)
+            if scale is not None and float(scale) != 1:
+                width = max(1, int(bitmap.Width * float(scale)))
+                height = max(1, int(bitmap.Height * float(scale)))
+                scaled = self.backend.scale_image(bitmap, width, height)
+                bitmap.Dispose()
+                bitmap = scaled
+            data = self.backend.encode_image(bitmap, image_format or 'png',
+                                             quality)
+        finally:
+            bitmap.Dispose()
+        if self.debug:
+            log.debug("Screenshot has %s bytes", len(data))
+        if path is not None:
+            with open(path, 'wb') as f:
+                f.write(data)
+            return {'path': os.path.abspath(path), 'size': len(data),
+                    'sha256': hashlib.sha256(data).hexdigest()}
+        if output == 'binary':
+            return Binary(data)
+        return base64.b64encode(data)
+
+    def __crop_image(self, bitmap, element, crop_to):
+        outer = element.Element.ScreenRectangle
+        inner = self.__create_element(crop_to).Element.ScreenRectangle
+        cropped = self.backend.crop_image(bitmap, inner.X - outer.X,
+                                          inner.Y - outer.Y,
+                                          inner.Width, inner.Height)
+        if cropped is None:
+            raise AssertionError("Element %s is not inside of captured "
+                                 "element" % crop_to)
+        bitmap.Dispose()
+        return cropped
 
     def uncheck(self, locator):
         """ Check if element is checked. If yes it uncheck it
@@ -489,16 +2673,38 @@ class RanorexLibrary(object):
             log.debug("Wait For Element")
             log.debug("Locator: %s", locator)
             log.debug("Timeout: %s", timeout)
-        Ranorex.Validate.EnableReport = False
-        if Ranorex.Validate.Exists(locator, int(timeout)) is None:
+        started = _now()
+        if self.__in_context(locator):
+            try:
+                self.__create_element(locator, RetryPolicy(int(timeout)))
+                found = True
+            except AssertionError:
+                found = False
+            attempts = self.counters.attempts
+        else:
+            found = self.backend.exists(locator, int(timeout))
+            attempts = 1
+        self.locator_profile.record('wait', self.__key(locator),
+                                    (_now() - started) * 1000, attempts,
+                                    found)
+        if found:
+            self.__record_wait('wait_for_element', locator, started, True)
             return True
+        self.__record_wait('wait_for_element', locator, started, False)
         raise AssertionError("Element %s does not exists" % locator)
 
     def wait_for_element_attribute(self, locator, attribute,
-                                   expected, timeout):
+                                   expected, timeout,
+                                   poll_interval=DEFAULT_POLL_INTERVAL):
         """ Wait for element attribute becomes requested value.
+        Attribute is checked every poll_interval milliseconds, the
+        interval grows while the value does not change.
 
         :param locator: xpath selector of element
+        :param attribute: name of attribute to check
+        :param expected: expected value of attribute
+        :param timeout: timeout in milliseconds
+        :param poll_interval: initial delay in milliseconds between checks
         :returns: True/False
         """
 
@@ -508,19 +2714,254 @@ class RanorexLibrary(object):
             log.debug("Attribute: %s", attribute)
             log.debug("Expected: %s", expected)
             log.debug("Timeout: %s", timeout)
-        curr_time = 0
-        timeout = int(timeout)/1000
-        while curr_time != timeout:
-            value = self.get_element_attribute(locator, attribute)
-            if str(value) == str(expected):
-                return True
-            time.sleep(5)
-            curr_time += 5
-        raise AssertionError("Object at location %s could not be found"
-                             % locator)
+        self.__return_type(locator)
+        started = _now()
+        deadline = started + int(timeout) / 1000.0
+        delay = int(poll_interval) / 1000.0
+        with self.ui_lock:
+            key = self.__key(locator)
+        element = None
+        value = None
+        polls = 0
+        while True:
+            polls += 1
+            if element is None:
+                with self.ui_lock:
+                    try:
+                        element = self.__probe_element(locator)
+                    except AssertionError:
+                        element = None
+            if element is not None:
+                try:
+                    value = element.Element.GetAttributeValue(attribute)
+                except Exception:
+                    element = None
+                else:
+                    if str(value) == str(expected):
+                        self.__record_attribute_wait(locator, key, started,
+                                                     polls, True)
+                        return True
+            remaining = deadline - _now()
+            if remaining <= 0:
+                break
+            time.sleep(min(delay, remaining))
+            delay = min(delay * POLL_BACKOFF, MAX_POLL_INTERVAL / 1000.0)
+        self.__record_attribute_wait(locator, key, started, polls, False)
+        if element is None:
+            raise AssertionError("Object at location %s could not be found"
+                                 % locator)
+        raise AssertionError("Attribute %s of object at location %s is %s, "
+                             "expected %s" % (attribute, locator, value,
+                                              expected))
+
+    def __record_attribute_wait(self, locator, key, started, polls, passed):
+        self.__record_wait('wait_for_element_attribute', locator, started,
+                           passed)
+        self.locator_profile.record('wait', key, (_now() - started) * 1000,
+                                    polls, passed)
+
+    def __record_wait(self, keyword, target, started, passed):
+        duration = int((_now() - started) * 1000)
+        if self.debug:
+            log.debug("%s for %s took %s ms", keyword, target, duration)
+        self.wait_report.append({'keyword': keyword, 'target': target,
+                                 'duration': duration, 'passed': passed})
+
+    def get_wait_report(self):
+        """ Returns durations of last finished waits.
+
+        :returns: list of dictionaries with "keyword", "target",
+                  "duration" (in milliseconds) and "passed" as keys
+        """
+        return list(self.wait_report)
+
+    def clear_wait_report(self):
+        """ Clears durations of finished waits.
+
+        :returns: True
+        """
+        self.wait_report.clear()
+        return True
+
+    def start_wait(self, locator, timeout, condition='exists',
+                   attribute=None, expected=None):
+        """ Starts waiting for element in background and returns
+        immediately. Result is collected by Wait For Any, Wait For All
+        or Get Wait Status. Condition is checked every 100 ms.
+
+        :param locator: xpath selector of element
+        :param timeout: timeout in milliseconds
+        :param condition: exists, not_exists, attribute_equals or
+                          attribute_matches
+        :param attribute: name of attribute for attribute conditions
+        :param expected: expected value or regular expression
+        :returns: id of wait
+        """
+
+        if self.debug:
+            log.debug("Start Wait %s for %s, timeout %s", condition,
+                      locator, timeout)
+        self.__return_type(locator)
+        with self.wait_lock:
+            wait = AsyncWait(next(self.wait_ids), locator, timeout,
+                             condition, attribute, expected)
+            self.waits[wait.id] = wait
+            if self.wait_poller is None:
+                self.wait_poller = threading.Thread(target=self.__poll_waits)
+                self.wait_poller.daemon = True
+                self.wait_poller.start()
+        return wait.id
+
+    def __probe_element(self, locator):
+        """ Tries to find element once without element cache, retry
+        statistics and locator profile, so polling does not fill them
+        with failures. Returns None if element is not found.
+        """
+        element_type = self.__return_type(locator)
+        try:
+            if self.__in_context(locator):
+                adapter = self.backend.adapter(element_type,
+                                               self.__context_element())
+            else:
+                adapter = self.backend.adapter(element_type)
+            return adapter(locator)
+        except Exception as error:
+            # AssertionError means that search context is not found
+            if isinstance(error, AssertionError) or \
+                    self.backend.is_element_not_found(error):
+                return None
+            raise AssertionError(error)
+
+    def __poll_waits(self):
+        while True:
+            with self.wait_lock:
+                pending = [wait for wait in self.waits.values()
+                           if wait.state == 'pending']
+                if not pending:
+                    self.wait_poller = None
+                    return
+            for wait in pending:
+                with self.ui_lock:
+                    key = self.__key(wait.locator)
+                    wait.polls += 1
+                    try:
+                        element = self.__probe_element(wait.locator)
+                    except AssertionError:
+                        element = None
+                    try:
+                        met = wait.met(element)
+                    except Exception as error:
+                        log.debug("Wait %s check failed: %s", wait.id, error)
+                        met = False
+                with self.wait_lock:
+                    if wait.state != 'pending':
+                        continue
+                    if met:
+                        wait.finish('fired')
+                    elif _now() >= wait.deadline:
+                        wait.finish('timeout')
+                    else:
+                        continue
+                    self.wait_lock.notify_all()
+                self.__record_wait('start_wait', wait.locator, wait.started,
+                                   wait.state == 'fired')
+                self.locator_profile.record(
+                    'wait', key, (wait.finished - wait.started) * 1000,
+                    wait.polls, wait.state == 'fired')
+            time.sleep(DEFAULT_POLL_INTERVAL / 1000.0)
+
+    def __get_waits(self, wait_ids):
+        if len(wait_ids) == 1 and not isinstance(wait_ids[0],
+                                                 (basestring, int)):
+            wait_ids = wait_ids[0]
+        if not wait_ids:
+            raise AssertionError("No wait entered")
+        waits = []
+        for wait_id in wait_ids:
+            wait = self.waits.get(int(wait_id))
+            if wait is None:
+                raise AssertionError("Wait %s does not exist" % wait_id)
+            waits.append(wait)
+        return waits
+
+    def __release_waits(self, waits):
+        with self.wait_lock:
+            for wait in waits:
+                if wait.state == 'pending':
+                    wait.finish('cancelled')
+                self.waits.pop(wait.id, None)
+
+    def wait_for_any(self, *wait_ids):
+        """ Waits until first of waits started by Start Wait fires,
+        i.e. for success or error dialog. Other waits are cancelled.
+
+        :param wait_ids: ids of waits, as separate arguments or one list
+        :returns: status of fired wait, dictionary with "id", "locator",
+                  "condition", "state", "elapsed" (ms) and "value"
+        """
+
+        waits = self.__get_waits(wait_ids)
+        with self.wait_lock:
+            while True:
+                fired = [wait for wait in waits if wait.state == 'fired']
+                if fired or all(wait.done.is_set() for wait in waits):
+                    break
+                self.wait_lock.wait(0.5)
+        self.__release_waits(waits)
+        if not fired:
+            raise AssertionError("None of waits fired: %s" % ', '.join(
+                "%s %s" % (wait.condition, wait.locator) for wait in waits))
+        first = min(fired, key=lambda wait: wait.finished)
+        if self.debug:
+            log.debug("Wait %s fired first", first.id)
+        return first.status()
+
+    def wait_for_all(self, *wait_ids):
+        """ Waits until all waits started by Start Wait fire. Fails as
+        soon as one of them times out (or is cancelled), the rest is
+        cancelled then.
+
+        :param wait_ids: ids of waits, as separate arguments or one list
+        :returns: list of statuses of waits, same as Wait For Any returns
+        """
+
+        waits = self.__get_waits(wait_ids)
+        with self.wait_lock:
+            while True:
+                failed = [wait for wait in waits if wait.done.is_set() and
+                          wait.state != 'fired']
+                if failed or all(wait.done.is_set() for wait in waits):
+                    break
+                self.wait_lock.wait(0.5)
+        self.__release_waits(waits)
+        if failed:
+            raise AssertionError("Waits did not fire: %s" % ', '.join(
+                "%s %s (%s)" % (wait.condition, wait.locator, wait.state)
+                for wait in failed))
+        return [wait.status() for wait in waits]
+
+    def get_wait_status(self, wait_id):
+        """ Returns state of wait started by Start Wait without waiting.
+
+        :param wait_id: id of wait
+        :returns: dictionary same as Wait For Any returns, state is
+                  pending, fired, timeout or cancelled
+        """
+
+        return self.__get_waits([wait_id])[0].status()
+
+    def cancel_wait(self, wait_id):
+        """ Stops and drops wait started by Start Wait.
+
+        :param wait_id: id of wait
+        :returns: True
+        """
+
+        self.__release_waits(self.__get_waits([wait_id]))
+        return True
 
     def wait_for_process_to_start(self, process_name, timeout):
-        """ Waits for /timeout/ seconds for process to start.
+        """ Waits for /timeout/ milliseconds for process to start.
 
         :param process_name: name of process to wait for
         :param timeout: timeout in milliseconds
@@ -531,22 +2972,24 @@ class RanorexLibrary(object):
             log.debug("Wait For Process To Start")
             log.debug("Process name: %s", process_name)
             log.debug("Timeout: %s", timeout)
-        curr_time = 0
-        timeout = int(timeout)/1000
-        while curr_time <= timeout:
-            proc = subprocess.Popen(['tasklist'], stdout=subprocess.PIPE)
-            out = proc.communicate()[0]
-            res = out.find(process_name) != -1 if out else False
-            if res:
+        started = _now()
+        deadline = started + int(timeout) / 1000.0
+        while True:
+            if self.processes.is_running(process_name):
+                self.__record_wait('wait_for_process_to_start', process_name,
+                                   started, True)
                 return True
-            else:
-                curr_time += 5
-                time.sleep(5)
-        raise AssertionError("Process %s not found within %ss" % (process_name,
-                                                                  timeout))
+            remaining = deadline - _now()
+            if remaining <= 0:
+                break
+            time.sleep(min(PROCESS_POLL_INTERVAL / 1000.0, remaining))
+        self.__record_wait('wait_for_process_to_start', process_name,
+                           started, False)
+        raise AssertionError("Process %s not found within %sms" %
+                             (process_name, timeout))
 
     def kill_process(self, process_name):
-        """ Kills process identified by process_name
+        """ Kills all processes identified by process_name
 
         :param process_name: name of process to kill
         :returns: True/False
@@ -554,21 +2997,12 @@ class RanorexLibrary(object):
 
         if self.debug:
             log.debug("Kill Process %s", process_name)
-        res = self.check_if_process_is_running(process_name)
+        killed = self.processes.kill(process_name)
         if self.debug:
-            log.debug("Process is running: %s", res)
-        if not res:
+            log.debug("Killed processes: %s", killed)
+        if not killed:
             raise AssertionError("Process %s is not running" % process_name)
-        proc = subprocess.Popen(['taskkill', '/im', process_name, '/f'],
-                                stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        out = proc.communicate()
-        if 'SUCCESS' in out[0]:
-            if self.debug:
-                log.debug("Output of killing: %s", out)
-            return True
-        else:
-            raise AssertionError("Process %s not terminated because of: %s" %
-                                 (process_name, out))
+        return True
 
 def configure_logging():
     logging.basicConfig(
@@ -585,16 +3019,107 @@ def main():
     parser = ArgumentParser(prog="rxconnector", description="Remote ranorex library for robot framework")
     parser.add_argument("-i","--ip", required=False, dest="ip", default="0.0.0.0")
     parser.add_argument("-p", "--port", required=False, type=int, dest="port", default=11000)
+    parser.add_argument("-t", "--threaded", required=False, action="store_true", dest="threaded",
+                        help="serve keep-alive connections by worker threads, UI keywords stay serialized")
+    parser.add_argument("-w", "--workers", required=False, type=int, dest="workers", default=16,
+                        help="number of worker threads in threaded mode")
+    parser.add_argument("--warm-up", required=False, action="store_true", dest="warm_up",
+                        help="load ranorex in background right after start instead of on first UI keyword")
+    parser.add_argument("--warm-up-locators", required=False, dest="warm_up_locators",
+                        help="file with locators (one per line) resolved in background after start")
+    parser.add_argument("--element-cache", required=False, type=int, dest="element_cache",
+                        help="enable element cache of given size")
+    parser.add_argument("--binary-threshold", required=False, type=int, dest="binary_threshold",
+                        help="return byte strings longer than this as binary without scanning them "
+                             "(not supported on IronPython, where strings are text)")
+    parser.add_argument("--max-output", required=False, type=int, dest="max_output",
+                        help="maximal number of characters of stdout and stderr returned by one keyword")
+    parser.add_argument("--log-to-output", required=False, dest="log_to_output",
+                        choices=['DEBUG', 'INFO', 'WARNING'],
+                        help="add connector log records of this or higher level into keyword output")
+    parser.add_argument("--sessions", required=False, action="store_true", dest="sessions",
+                        help="serve separate library instance for every session at path /session/<id>")
+    parser.add_argument("--session-timeout", required=False, type=int, dest="session_timeout",
+                        help="close sessions idle for this number of seconds")
+    parser.add_argument("--locator-index", required=False, dest="locator_index",
+                        help="file with persisted index of resolved locators, saved at shutdown")
+    parser.add_argument("--application", required=False, dest="application", default="",
+                        help="name of tested application the locator index belongs to")
+    parser.add_argument("--application-version", required=False, dest="application_version",
+                        default="", help="version of tested application the locator index belongs to")
+    parser.add_argument("--locator-profile", required=False, dest="locator_profile",
+                        help="file the profile of locator lookups is written into at shutdown")
+    parser.add_argument("--locator-profile-format", required=False, dest="locator_profile_format",
+                        choices=['csv', 'folded'], default='csv',
+                        help="csv or folded stacks for flamegraph.pl")
+    parser.add_argument("--simulate", required=False, dest="simulate",
+                        help="xml file with UI tree served by simulator instead of ranorex")
+    parser.add_argument("--simulate-latency", required=False, type=int, dest="simulate_latency",
+                        default=0, help="latency of every simulated UI call in milliseconds")
 
     # parse arguments
     args = parser.parse_args()
 
+    backend = None
+    if args.simulate:
+        from rxsimulator import SimulatorBackend
+        backend = SimulatorBackend.from_file(args.simulate,
+                                             latency=args.simulate_latency)
+        logger.info("Simulating UI tree of %s", args.simulate)
+    # sessions share backend, ranorex is loaded only once
+    backend = backend or RanorexBackend()
+
+    # sessions share locator index and profile too
+    locator_profile = LocatorProfile()
+    locator_index = None
+    if args.locator_index:
+        locator_index = LocatorIndex(args.locator_index, args.application,
+                                     args.application_version)
+
+    def create_library():
+        library = RanorexLibrary(backend)
+        if args.element_cache:
+            library.enable_element_cache(args.element_cache)
+        library.locator_index = locator_index
+        library.locator_profile = locator_profile
+        return library
+
+    library = create_library()
+    if args.warm_up or args.warm_up_locators:
+        locators = []
+        if args.warm_up_locators:
+            with open(args.warm_up_locators) as f:
+                locators = [line.strip() for line in f if line.strip()]
+        warm_up = threading.Thread(target=library._warm_up, args=(locators,))
+        warm_up.daemon = True
+        warm_up.start()
+    logger.info("Connector ready to serve in %d ms",
+                (time.time() - _IMPORTED) * 1000)
+
     # run server
     try:
-        server = RobotRemoteServer(RanorexLibrary(), args.ip, args.port)
+        server = RobotRemoteServer(library, args.ip, args.port,
+                                   threaded=args.threaded, workers=args.workers,
+                                   binary_threshold=args.binary_threshold,
+                                   max_output=args.max_output,
+                                   output_loggers=args.log_to_output and ['RXCONNECTOR'] or (),
+                                   output_log_level=args.log_to_output or 'INFO',
+                                   sessions=args.sessions and create_library or None,
+                                   session_timeout=args.session_timeout)
     except KeyboardInterrupt, e:
         logger.info("INFO: Keyboard Iterrupt: stopping server")
         server.stop_remote_server()
+    if locator_index is not None:
+        locator_index.save()
+        for entry in locator_index.slowest():
+            logger.info("Slow locator %s: mean %s ms, max %s ms, %s calls",
+                        entry['locator'], entry['mean'], entry['max'],
+                        entry['calls'])
+    if args.locator_profile:
+        written = locator_profile.write(args.locator_profile,
+                                        args.locator_profile_format)
+        logger.info("Profile of %s locators written into %s", written,
+                    args.locator_profile)
 
 if __name__ == '__main__':
     configure_logging()
@@ -0,0 +1,675 @@
+"""
+    In-memory UI tree simulator for rxconnector
+    Used instead of ranorex to run and measure the connector on machine
+    without windows and ranorex license
+"""
+#python imports
+import base64
+import logging
+import re
+import sys
+import threading
+import time
+import xml.etree.ElementTree as ET
+from collections import deque
+
+
+log = logging.getLogger("RXSIMULATOR")
+
+RECORD_SIZE = 10000
+DEFAULT_WIDTH = 100
+DEFAULT_HEIGHT = 20
+# attributes of tree file that are not attributes of element
+CONTROL_ATTRIBUTES = ('appear', 'launch')
+# attributes used by path of element, strongest first
+PATH_ATTRIBUTES = ('automationid', 'controlid', 'name', 'title', 'text')
+
+# same clock as rxconnector uses
+if hasattr(time, 'monotonic'):
+    _now = time.monotonic
+elif sys.platform in ('win32', 'cli'):
+    _now = time.clock
+else:
+    _now = time.time
+
+_CONDITION = re.compile(r"""\s*(?:(and|or)\b|@(\w+)(?:\s*(!=|=|!~|~)\s*"""
+                        r"""(?:'([^']*)'|"([^"]*)"))?)""", re.I)
+_KEY = re.compile(r"\{(\w+)(?:\s+(down|up))?\}|(.)", re.S)
+
+
+class ElementNotFoundError(Exception):
+    """ Raised when no element matches locator """
+    pass
+
+
+class SimulatorError(Exception):
+    pass
+
+
+def _split_steps(locator):
+    """ Returns list of (descendant, step) pairs. Slashes inside of
+    predicates or quoted strings are not treated as step separators.
+    """
+    steps = []
+    depth = 0
+    quote = None
+    start = 0
+    for index, char in enumerate(locator + '/'):
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in '\'"':
+            quote = char
+        elif char == '[':
+            depth += 1
+        elif char == ']':
+            depth -= 1
+        elif char == '/' and depth == 0:
+            steps.append(locator[start:index].strip())
+            start = index + 1
+    result = []
+    descendant = False
+    for index, step in enumerate(steps):
+        if step == '':
+            # leading slash starts at desktop, any other empty step is //
+            descendant = descendant or index > 0
+            continue
+        if step == '.':
+            continue
+        result.append((descendant, step))
+        descendant = False
+    return result
+
+
+def _parse_step(step):
+    """ Returns role and list of predicates of step """
+    if '[' not in step:
+        return step.lower(), []
+    role, rest = step.split('[', 1)
+    predicates = []
+    depth = 1
+    quote = None
+    start = 0
+    for index, char in enumerate(rest):
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in '\'"':
+            quote = char
+        elif char == '[':
+            if depth == 0:
+                start = index + 1
+            depth += 1
+        elif char == ']':
+            depth -= 1
+            if depth == 0:
+                predicates.append(_parse_predicate(rest[start:index]))
+    return role.strip().lower(), predicates
+
+
+def _parse_predicate(predicate):
+    """ Returns position as int or conditions as list of lists,
+    conditions in inner list are joined by "and", lists by "or".
+    """
+    predicate = predicate.strip()
+    if predicate.isdigit():
+        return int(predicate)
+    groups = [[]]
+    position = 0
+    while position < len(predicate):
+        match = _CONDITION.match(predicate, position)
+        if match is None or match.end() == position:
+            raise SimulatorError("Unsupported predicate [%s]" % predicate)
+        position = match.end()
+        joiner, name, operator, single, double = match.groups()
+        if joiner and joiner.lower() == 'or':
+            groups.append([])
+        elif name:
+            value = single if single is not None else double
+            groups[-1].append((name.lower(), operator, value))
+    return groups
+
+
+def _matches(value, operator, expected):
+    if operator is None:
+        return value is not None
+    text = _text(value)
+    if operator == '=':
+        return text == expected
+    if operator == '!=':
+        return text != expected
+    found = re.search(expected, text) is not None
+    return found if operator == '~' else not found
+
+
+def _text(value):
+    return u'' if value is None else unicode(value)
+
+
+def _typed(value):
+    """ Attribute values are returned typed as ranorex does """
+    if value.lower() in ('true', 'false'):
+        return value.lower() == 'true'
+    if re.match(r'^-?\d+$', value):
+        return int(value)
+    return value
+
+
+class Node(object):
+    """ One element of simulated UI tree """
+    def __init__(self, role, attributes=None, appear=0, launch=None):
+        self.role = role.lower()
+        self.attributes = {}
+        for name, value in (attributes or {}).items():
+            self.set(name, value if name.lower() == 'text' else _typed(value))
+        self.appear = appear
+        self.launch = launch
+        self.children = []
+        self.parent = None
+        self.removed = False
+
+    @classmethod
+    def from_xml(cls, element):
+        attributes = dict((name, value) for name, value
+                          in element.attrib.items()
+                          if name.lower() not in CONTROL_ATTRIBUTES)
+        text = (element.text or '').strip()
+        if text and 'text' not in [name.lower() for name in attributes]:
+            attributes['text'] = text
+        node = cls(element.tag, attributes,
+                   int(element.get('appear', 0)), element.get('launch'))
+        for child in element:
+            node.append(cls.from_xml(child))
+        return node
+
+    def append(self, node):
+        node.parent = self
+        self.children.append(node)
+
+    def get(self, name, default=None):
+        return self.attributes.get(name.lower(), default)
+
+    def set(self, name, value):
+        self.attributes[name.lower()] = value
+
+    def rectangle(self):
+        x = self.get('x')
+        y = self.get('y')
+        if x is None or y is None:
+            px, py = (0, 0) if self.parent is None else \
+                self.parent.rectangle()[:2]
+            x = px if x is None else x
+            y = py if y is None else y
+        return (x, y, self.get('width', DEFAULT_WIDTH),
+                self.get('height', DEFAULT_HEIGHT))
+
+    def path(self):
+        """ Absolute locator of node built as GetPath of ranorex does,
+        every step uses strongest attribute of element
+        """
+        steps = []
+        node = self
+        while node.parent is not None:
+            steps.append(node.step())
+            node = node.parent
+        return '/' + '/'.join(reversed(steps))
+
+    def step(self):
+        siblings = [child for child in self.parent.children
+                    if child.role == self.role]
+        for name in PATH_ATTRIBUTES:
+            value = _text(self.get(name))
+            if value == '' or "'" in value:
+                continue
+            same = [sibling for sibling in siblings
+                    if _text(sibling.get(name)) == value]
+            step = "%s[@%s='%s']" % (self.role, name, value)
+            if len(same) > 1:
+                step += '[%d]' % (same.index(self) + 1)
+            return step
+        return '%s[%d]' % (self.role, siblings.index(self) + 1)
+
+    def __repr__(self):
+        return "<Node %s %s>" % (self.role, self.attributes)
+
+
+class Rectangle(object):
+    def __init__(self, x, y, width, height):
+        self.X = x
+        self.Y = y
+        self.Width = width
+        self.Height = height
+
+
+class Image(object):
+    """ Captured image, only size is simulated """
+    PixelFormat = 'Format32bppArgb'
+
+    def __init__(self, width, height):
+        self.Width = width
+        self.Height = height
+        self.disposed = False
+
+    def Dispose(self):
+        self.disposed = True
+
+
+class CompressedImage(object):
+    def __init__(self, data):
+        self.data = data
+
+    def ToBase64String(self):
+        return base64.b64encode(self.data)
+
+
+class Element(object):
+    """ Counterpart of Ranorex.Core.Element """
+    def __init__(self, backend, node):
+        self._backend = backend
+        self._node = node
+
+    @property
+    def Valid(self):
+        return not self._node.removed
+
+    @property
+    def ScreenRectangle(self):
+        return Rectangle(*self._node.rectangle())
+
+    def GetAttributeValue(self, name):
+        self._backend._call('attribute', self._node, name)
+        return self._node.get(name)
+
+
+class Adapter(object):
+    """ Counterpart of ranorex adapters, i.e. Ranorex.Button """
+    def __init__(self, backend, node):
+        self._backend = backend
+        self._node = node
+
+    def __repr__(self):
+        return "<Adapter %s>" % self._node.role
+
+    def __check(self):
+        if self._node.removed:
+            raise SimulatorError("Element %s does not exist anymore" %
+                                 self._node)
+
+    @property
+    def Element(self):
+        return Element(self._backend, self._node)
+
+    @property
+    def Text(self):
+        self._backend._call('attribute', self._node, 'text')
+        return self._node.get('text')
+
+    @property
+    def HasFocus(self):
+        return self._backend.focused is self._node
+
+    def Click(self, *args):
+        self.__check()
+        self._backend._call('click', self._node, *args)
+        if self._node.role in ('checkbox', 'togglebutton'):
+            self._node.set('checked', not self._node.get('checked', False))
+        elif self._node.role == 'radiobutton':
+            self._node.set('checked', True)
+        self._backend.focused = self._node
+
+    def DoubleClick(self, *args):
+        self.__check()
+        self._backend._call('doubleclick', self._node, *args)
+        self._backend.focused = self._node
+
+    def Focus(self):
+        self.__check()
+        self._backend._call('focus', self._node)
+        self._backend.focused = self._node
+
+    def PressKeys(self, keys):
+        self.__check()
+        self._backend._call('keys', self._node, keys)
+        self._backend.focused = self._node
+        self._backend._press(self._node, keys)
+
+    def __children(self, role):
+        self._backend._call('children', self._node, role)
+        return [Adapter(self._backend, child)
+                for child in self._node.children
+                if child.role == role and self._backend._visible(child)]
+
+    @property
+    def Rows(self):
+        return self.__children('row')
+
+    @property
+    def Columns(self):
+        return self.__children('column')
+
+    @property
+    def Cells(self):
+        return self.__children('cell')
+
+    @property
+    def Items(self):
+        return self.__children('listitem')
+
+    def GetPath(self):
+        self.__check()
+        self._backend._call('path', self._node)
+        return self._node.path()
+
+    def CaptureImage(self):
+        self.__check()
+        self._backend._call('capture', self._node)
+        width, height = self._node.rectangle()[2:]
+        return Image(width, height)
+
+    def CaptureCompressedImage(self):
+        image = self.CaptureImage()
+        return CompressedImage(self._backend.encode_image(image, 'png'))
+
+
+class SimulatorBackend(object):
+    """ Backend of RanorexLibrary (see rxconnector.UIBackend) working on
+    in-memory tree loaded from xml. Tag of xml element is role of element,
+    its attributes are attributes of element. Special attributes:
+    appear - milliseconds after start (or after launch) before element
+             is shown
+    launch - element is hidden until application of this name is run
+             by Run Application
+
+    Every call sleeps for latency milliseconds, every pressed key
+    sleeps for key_delay milliseconds. Latency is a number or
+    a dictionary with operation (find, attribute, click, doubleclick,
+    focus, keys, select, children, capture, encode, mouse, run, load, path)
+    as key, "*" key is used for other operations. Latency of "step"
+    key is added to find for every step of locator, latency of "visit"
+    key for every element examined by find. Calls are recorded in calls.
+    Supported locators are subset of RanoreXPath: / and // steps,
+    role or *, [n] positions and [@attr], [@attr='value'], !=, ~ (regex)
+    and !~ conditions joined by "and" / "or".
+    """
+    def __init__(self, tree, latency=0, load_delay=0, key_delay=0,
+                 record_size=RECORD_SIZE):
+        if isinstance(tree, basestring):
+            tree = ET.fromstring(tree)
+        self.root = Node('desktop')
+        for child in ([tree] if tree.tag.lower() != 'desktop' else tree):
+            self.root.append(Node.from_xml(child))
+        self.latency = latency
+        self.load_delay = load_delay
+        self.default_key_delay = key_delay
+        self.key_delay = key_delay
+        self.calls = deque(maxlen=record_size)
+        self.focused = None
+        self.loaded = False
+        self.launched = {}
+        self.started = _now()
+        self.visited = 0
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        return cls(ET.parse(path).getroot(), **kwargs)
+
+    def reset(self):
+        """ Restarts appearance clock and forgets calls and launches """
+        with self._lock:
+            self.started = _now()
+            self.launched.clear()
+            self.calls.clear()
+            self.focused = None
+
+    def _delay(self, operation):
+        latency = self.latency
+        if isinstance(latency, dict):
+            latency = latency.get(operation, latency.get('*', 0))
+        return latency
+
+    def _call(self, operation, target=None, *args):
+        self.calls.append((operation, target, args))
+        latency = self._delay(operation)
+        if latency:
+            time.sleep(latency / 1000.0)
+
+    def _appear_time(self, node):
+        """ Time when node is shown, None if it was not launched """
+        started = self.started
+        if node.launch is not None:
+            started = self.launched.get(node.launch.lower())
+            if started is None:
+                return None
+        return started + node.appear / 1000.0
+
+    def _visible(self, node, at=None):
+        shown = self._appear_time(node)
+        return shown is not None and shown <= (_now() if at is None else at)
+
+    def find_all(self, locator, at=None, start=None):
+        """ Returns list of (node, time when it is shown) matching locator.
+        Only nodes shown at given time (now by default) are returned.
+        Relative locator is searched from start node.
+        """
+        at = _now() if at is None else at
+        current = [(start or self.root, self.started)]
+        with self._lock:
+            for descendant, step in _split_steps(locator):
+                role, predicates = _parse_step(step)
+                found = []
+                for node, shown in current:
+                    candidates = []
+                    self.__candidates(node, shown, descendant, at, candidates)
+                    self.visited += len(candidates)
+                    candidates = [(child, child_shown) for child, child_shown
+                                  in candidates
+                                  if role in ('*', child.role)]
+                    for predicate in predicates:
+                        candidates = self.__filter(candidates, predicate)
+                    found.extend(candidates)
+                current = found
+                if not current:
+                    break
+        return current
+
+    def __candidates(self, node, shown, descendant, at, result):
+        for child in node.children:
+            child_shown = self._appear_time(child)
+            if child_shown is None or child_shown > at:
+                continue
+            child_shown = max(shown, child_shown)
+            result.append((child, child_shown))
+            if descendant:
+                self.__candidates(child, child_shown, True, at, result)
+
+    @staticmethod
+    def __filter(candidates, predicate):
+        if isinstance(predicate, int):
+            return candidates[predicate - 1:predicate] if predicate else []
+        return [(node, shown) for node, shown in candidates
+                if any(all(_matches(node.get(name), operator, value)
+                           for name, operator, value in group)
+                       for group in predicate)]
+
+    def find(self, locator, start=None):
+        self._call('find', locator)
+        if isinstance(self.latency, dict) and self.latency.get('step'):
+            time.sleep(len(_split_steps(locator)) *
+                       self.latency['step'] / 1000.0)
+        if start is not None and start.removed:
+            raise SimulatorError("Element %s does not exist anymore" % start)
+        visited = self.visited
+        found = self.find_all(locator, start=start)
+        if isinstance(self.latency, dict) and self.latency.get('visit'):
+            time.sleep((self.visited - visited) *
+                       self.latency['visit'] / 1000.0)
+        if not found:
+            raise ElementNotFoundError("No element found for path '%s'" %
+                                       locator)
+        return found[0][0]
+
+    def add(self, parent_locator, xml):
+        """ Adds element described by xml string under parent """
+        with self._lock:
+            parent = self.find(parent_locator) if parent_locator else self.root
+            node = Node.from_xml(ET.fromstring(xml))
+            node.appear += int((_now() - self.started) * 1000)
+            parent.append(node)
+        return node
+
+    def remove(self, locator):
+        """ Removes element, its adapters are no longer valid """
+        with self._lock:
+            node = self.find(locator)
+            node.parent.children.remove(node)
+            for removed in self.__walk(node):
+                removed.removed = True
+
+    def __walk(self, node):
+        yield node
+        for child in node.children:
+            for descendant in self.__walk(child):
+                yield descendant
+
+    def _press(self, node, keys):
+        """ Applies key sequence on text, combobox and list elements """
+        shift = False
+        selected = False
+        pressed = _KEY.findall(keys)
+        if self.key_delay:
+            time.sleep(len(pressed) * self.key_delay / 1000.0)
+        for name, state, char in pressed:
+            name = name.lower()
+            if name == 'shift' or name == 'lshiftkey':
+                shift = state != 'up'
+            elif name == 'home':
+                selected = shift
+            elif name == 'end':
+                selected = False
+            elif name in ('delete', 'back'):
+                text = _text(node.get('text'))
+                node.set('text', '' if selected else text[:-1])
+                selected = False
+            elif name in ('up', 'down') and node.role in ('combobox', 'list'):
+                items = [child for child in node.children
+                         if child.role == 'listitem']
+                index = node.get('selecteditemindex', 0)
+                index += -1 if name == 'up' else 1
+                index = max(0, min(index, len(items) - 1))
+                node.set('selecteditemindex', index)
+                if items:
+                    node.set('text', items[index].get('text'))
+            elif char:
+                text = '' if selected else _text(node.get('text'))
+                node.set('text', text + char)
+                selected = False
+
+    # UIBackend interface
+
+    def load(self):
+        if not self.loaded:
+            self._call('load')
+            if self.load_delay:
+                time.sleep(self.load_delay / 1000.0)
+            self.loaded = True
+
+    def adapter(self, element_type, parent=None):
+        role = element_type.lower()
+        start = None if parent is None else parent._node
+
+        def create(locator):
+            node = self.find(locator, start)
+            if role != 'unknown' and node.role != role:
+                raise SimulatorError("Element %s cannot be used as %s" %
+                                     (node.role, element_type))
+            return Adapter(self, node)
+        return create
+
+    def is_element_not_found(self, error):
+        return isinstance(error, ElementNotFoundError)
+
+    def element_path(self, element):
+        return element.GetPath()
+
+    def location(self, x, y):
+        return (x, y)
+
+    def right_button(self):
+        return 'Right'
+
+    def move_mouse(self, x, y):
+        self._call('mouse', None, x, y)
+
+    def scroll(self, element, amount):
+        self._call('mouse', element._node, amount)
+
+    def send_keys(self, target, key_seq):
+        if isinstance(target, basestring):
+            node = self.find(target)
+        else:
+            node = target._node
+        self._call('keys', node, key_seq)
+        self.focused = node
+        self._press(node, key_seq)
+
+    def exists(self, locator, timeout):
+        self._call('find', locator)
+        started = _now()
+        found = self.find_all(locator, at=started + timeout / 1000.0)
+        if not found:
+            time.sleep(timeout / 1000.0)
+            return False
+        shown = min(node_shown for node, node_shown in found)
+        if shown > started:
+            time.sleep(shown - started)
+        return True
+
+    def items(self, element):
+        try:
+            return element.Items
+        except AttributeError:
+            return None
+
+    def select_item(self, element, index):
+        node = element._node
+        items = [child for child in node.children if child.role == 'listitem']
+        if not 0 <= index < len(items):
+            return False
+        self._call('select', node, index)
+        node.set('selecteditemindex', index)
+        node.set('text', items[index].get('text'))
+        return True
+
+    def set_key_delay(self, delay):
+        self.key_delay = self.default_key_delay if delay is None else delay
+
+    def run_application(self, app, params=None):
+        self._call('run', app, params)
+        # connector runs on windows, path may use both separators
+        name = re.split(r'[\\/]', app)[-1].lower()
+        self.launched[name] = _now()
+        if name.endswith('.exe'):
+            self.launched[name[:-4]] = self.launched[name]
+
+    def scale_image(self, image, width, height):
+        return Image(width, height)
+
+    def crop_image(self, image, x, y, width, height):
+        left, top = max(x, 0), max(y, 0)
+        right = min(x + width, image.Width)
+        bottom = min(y + height, image.Height)
+        if right <= left or bottom <= top:
+            return None
+        return Image(right - left, bottom - top)
+
+    def encode_image(self, image, image_format, quality=None):
+        """ Returns deterministic data, size grows with image size """
+        self._call('encode', None, image_format, quality)
+        size = image.Width * image.Height
+        if quality is not None:
+            size = size * int(quality) // 100
+        header = '%s %dx%d\n' % (image_format.upper(), image.Width,
+                                 image.Height)
+        block = ''.join(chr(i) for i in range(256))
+        return header + (block * (size // 256 + 1))[:size]
@@ -0,0 +1,45 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in ('src', 'site-packages'):
+    path = os.path.join(ROOT, path)
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+import pytest
+
+from rxconnector import RanorexLibrary
+from rxsimulator import SimulatorBackend
+from remote import TREE, RemoteServer
+
+
+@pytest.fixture
+def backend():
+    return SimulatorBackend(TREE)
+
+
+@pytest.fixture
+def library(backend):
+    return RanorexLibrary(backend)
+
+
+@pytest.fixture
+def tree_path(tmpdir):
+    path = tmpdir.join('tree.xml')
+    path.write(TREE)
+    return str(path)
+
+
+@pytest.fixture
+def start_server(tree_path, tmpdir):
+    """ Starts connector process with given options, stopped after test """
+    servers = []
+
+    def start(*options):
+        log_path = str(tmpdir.join('connector%d.log' % len(servers)))
+        servers.append(RemoteServer(tree_path, options, log_path))
+        return servers[-1]
+    yield start
+    for server in servers:
+        server.stop()
@@ -0,0 +1,90 @@
+""" Connector served in separate process against the simulator,
+shared by tests and benchmarks
+"""
+import os
+import socket
+import subprocess
+import sys
+import time
+import xmlrpclib
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONNECTOR = os.path.join(ROOT, 'src', 'rxconnector.py')
+
+TREE = """
+<desktop>
+  <form title="Main" processname="app">
+    <button text="OK" automationid="ok"/>
+    <checkbox text="Remember" checked="False"/>
+    <text name="status">ready</text>
+    <combobox name="color">
+      <listitem text="red" value="r"/>
+      <listitem text="green" value="g"/>
+      <listitem text="blue" value="b"/>
+    </combobox>
+  </form>
+  <form title="Later" appear="300"/>
+</desktop>
+"""
+
+
+def free_port():
+    sock = socket.socket()
+    try:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+    finally:
+        sock.close()
+
+
+class RemoteServer(object):
+    """ rxconnector process started with options, stopped by stop """
+    def __init__(self, tree_path, options=(), log_path=os.devnull,
+                 timeout=15):
+        self.port = free_port()
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join(
+            [os.path.join(ROOT, 'site-packages'), os.path.join(ROOT, 'src'),
+             env.get('PYTHONPATH', '')])
+        self._log = open(log_path, 'w')
+        self.process = subprocess.Popen(
+            [sys.executable, CONNECTOR, '-i', '127.0.0.1',
+             '-p', str(self.port), '--simulate', tree_path] + list(options),
+            stdout=self._log, stderr=subprocess.STDOUT, env=env)
+        deadline = time.time() + timeout
+        while True:
+            try:
+                socket.create_connection(('127.0.0.1', self.port), 1).close()
+                break
+            except socket.error:
+                if self.process.poll() is not None or \
+                        time.time() > deadline:
+                    self.stop()
+                    raise RuntimeError("Connector did not start")
+                time.sleep(0.05)
+
+    def proxy(self, path=''):
+        return xmlrpclib.ServerProxy('http://127.0.0.1:%d%s' %
+                                     (self.port, path))
+
+    def run(self, name, *args, **kwargs):
+        """ Runs keyword, fails with keyword error as AssertionError """
+        result = self.proxy(kwargs.get('path', '')).run_keyword(
+            name, list(args))
+        if result['status'] != 'PASS':
+            raise AssertionError(result.get('error'))
+        return result.get('return')
+
+    def stop(self):
+        if self.process.poll() is None:
+            try:
+                self.proxy().stop_remote_server()
+            except Exception:
+                pass
+            deadline = time.time() + 5
+            while self.process.poll() is None and time.time() < deadline:
+                time.sleep(0.05)
+            if self.process.poll() is None:
+                self.process.kill()
+                self.process.wait()
+        self._log.close()
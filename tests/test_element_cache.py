@@ -0,0 +1,80 @@
+import pytest
+
+from rxconnector import ElementCache
+
+
+class Adapter(object):
+    def __init__(self, valid=True):
+        self.valid = valid
+
+
+def cache(size=3):
+    return ElementCache(size, is_valid=lambda adapter: adapter.valid)
+
+
+def test_least_recently_used_is_evicted():
+    elements = cache(2)
+    first, second, third = Adapter(), Adapter(), Adapter()
+    elements.put('first', first)
+    elements.put('second', second)
+    assert elements.get('first') is first
+    elements.put('third', third)
+    assert len(elements) == 2
+    assert elements.get('second') is None
+    assert elements.get('first') is first
+    assert elements.get('third') is third
+
+
+def test_stale_adapter_is_dropped():
+    elements = cache()
+    adapter = Adapter()
+    elements.put('button', adapter)
+    adapter.valid = False
+    assert elements.get('button') is None
+    assert len(elements) == 0
+    assert elements.statistics() == {'size': 3, 'cached': 0, 'hits': 0,
+                                     'misses': 1, 'stale': 1}
+
+
+def test_statistics_count_hits_and_misses():
+    elements = cache()
+    elements.put('button', Adapter())
+    elements.get('button')
+    elements.get('button')
+    elements.get('other')
+    elements.discard('button')
+    elements.get('button')
+    assert elements.statistics() == {'size': 3, 'cached': 0, 'hits': 2,
+                                     'misses': 2, 'stale': 0}
+
+
+def test_size_must_be_positive():
+    with pytest.raises(AssertionError):
+        ElementCache(0)
+
+
+def test_library_reuses_cached_element(library, backend):
+    library.enable_element_cache(10)
+    for _ in range(3):
+        assert library.get_element_attribute(
+            "/form/button[@text='OK']", 'text') == 'OK'
+    finds = [call for call in backend.calls if call[0] == 'find']
+    assert len(finds) == 1
+    statistics = library.get_element_cache_statistics()
+    assert (statistics['hits'], statistics['misses']) == (2, 1)
+
+
+def test_library_resolves_removed_element_again(library, backend):
+    library.enable_element_cache(10)
+    library.get_element_attribute("/form/checkbox", 'text')
+    backend.remove("/form/checkbox")
+    backend.add("/form", '<checkbox text="Again"/>')
+    assert library.get_element_attribute("/form/checkbox", 'text') == \
+        'Again'
+    assert library.get_element_cache_statistics()['stale'] == 1
+
+
+def test_disabled_cache_has_no_statistics(library):
+    library.enable_element_cache()
+    library.disable_element_cache()
+    assert library.get_element_cache_statistics() == {}
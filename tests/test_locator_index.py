@@ -0,0 +1,89 @@
+import json
+import os
+
+import pytest
+
+from rxconnector import LocatorIndex, LOCATOR_INDEX_FORMAT
+
+
+@pytest.fixture
+def index_path(tmpdir):
+    return str(tmpdir.join('index.json'))
+
+
+def test_saved_index_is_loaded(index_path):
+    index = LocatorIndex(index_path, 'app', '1.0')
+    index.record('/form/button', '/form/button[@automationid="ok"]', 12.5,
+                 False, False)
+    assert index.save()
+    assert not index.save()
+    loaded = LocatorIndex(index_path, 'app', '1.0')
+    assert len(loaded) == 1
+    assert loaded.path_of('/form/button') == \
+        '/form/button[@automationid="ok"]'
+    assert loaded.slowest()[0]['total'] == 12.5
+
+
+@pytest.mark.parametrize('application, version', [('other', '1.0'),
+                                                  ('app', '2.0')])
+def test_index_of_other_application_or_version_is_ignored(
+        index_path, application, version):
+    index = LocatorIndex(index_path, 'app', '1.0')
+    index.record('/form', '/form[@title="Main"]', 1, False, False)
+    index.save()
+    assert len(LocatorIndex(index_path, application, version)) == 0
+
+
+def test_index_of_other_format_is_ignored(index_path):
+    with open(index_path, 'w') as f:
+        json.dump({'format': LOCATOR_INDEX_FORMAT + 1, 'application': 'app',
+                   'version': '1.0', 'entries': {'/form': {'path': 'x'}}}, f)
+    assert len(LocatorIndex(index_path, 'app', '1.0')) == 0
+
+
+def test_damaged_index_starts_empty_and_is_replaced(index_path):
+    with open(index_path, 'w') as f:
+        f.write('{"format": 1, "entr')
+    index = LocatorIndex(index_path, 'app', '1.0')
+    assert len(index) == 0
+    index.record('/form', '/form[@title="Main"]', 1, False, False)
+    index.save()
+    assert len(LocatorIndex(index_path, 'app', '1.0')) == 1
+
+
+def test_save_leaves_no_temporary_files(index_path):
+    index = LocatorIndex(index_path, 'app', '1.0')
+    for run in range(3):
+        index.record('/form', '/form[@title="Main"]', run, False, False)
+        index.save()
+    assert os.listdir(os.path.dirname(index_path)) == ['index.json']
+
+
+def test_least_recently_used_locators_are_dropped_over_size(index_path):
+    index = LocatorIndex(index_path, 'app', '1.0', size=2)
+    for locator in ('/a', '/b', '/a', '/c'):
+        index.record(locator, locator, 1, False, False)
+    assert index.path_of('/b') is None
+    index.save()
+    smaller = LocatorIndex(index_path, 'app', '1.0', size=1)
+    assert smaller.path_of('/c') == '/c'
+    assert smaller.path_of('/a') is None
+
+
+def test_library_uses_indexed_path_and_falls_back(library, backend,
+                                                  index_path):
+    locator = "/form/button[@text='OK']"
+    library.enable_locator_index(index_path, 'app', '1.0')
+    library.get_element_attribute(locator, 'text')
+    library.disable_locator_index()
+    assert library.enable_locator_index(index_path, 'app', '1.0') == 1
+    backend.calls.clear()
+    library.get_element_attribute(locator, 'text')
+    finds = [call[1] for call in backend.calls if call[0] == 'find']
+    assert finds == ["/form[@title='Main']/button[@automationid='ok']"]
+    backend.remove("/form/button")
+    backend.add("/form", '<button text="OK" automationid="renamed"/>')
+    library.set_retry_policy(0)
+    library.get_element_attribute(locator, 'text')
+    slow = library.get_slow_locators()[0]
+    assert (slow['calls'], slow['indexed'], slow['fallbacks']) == (3, 1, 1)
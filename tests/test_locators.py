@@ -0,0 +1,19 @@
+import pytest
+
+from rxconnector import _last_step
+
+
+@pytest.mark.parametrize('locator, step', [
+    ('button', 'button'),
+    ('/form/button', 'button'),
+    ('/form//text[@name="status"]', 'text[@name="status"]'),
+    ("/form/button[@text='a/b']", "button[@text='a/b']"),
+    ("/form/button[@text='a/b' and @name='c/d']",
+     "button[@text='a/b' and @name='c/d']"),
+    ('/form/text[@name="x]/y"]', 'text[@name="x]/y"]'),
+    ('/form/cell[@index=1/2]', 'cell[@index=1/2]'),
+    ('/form[@title="a/b"]/button', 'button'),
+    ('/form/', ''),
+])
+def test_last_step(locator, step):
+    assert _last_step(locator) == step
@@ -0,0 +1,195 @@
+import difflib
+import random
+
+import pytest
+
+from rxconnector import RanorexLibrary
+
+
+def write(tmpdir, name, lines):
+    path = tmpdir.join(name)
+    path.write(''.join(lines))
+    return str(path)
+
+
+def expected_diff(lines_a, lines_b):
+    return ''.join(difflib.unified_diff(lines_a, lines_b))
+
+
+def random_pair(rand):
+    lines_a = ['line %d\n' % rand.randint(0, 20)
+               for _ in range(rand.randint(0, 60))]
+    lines_b = list(lines_a)
+    for _ in range(rand.randint(1, 5)):
+        position = rand.randint(0, len(lines_b))
+        action = rand.choice(('insert', 'delete', 'replace'))
+        if action == 'insert' or not lines_b or position == len(lines_b):
+            lines_b.insert(position, 'line %d\n' % rand.randint(0, 20))
+        elif action == 'delete':
+            del lines_b[position]
+        else:
+            lines_b[position] = 'new %d\n' % rand.randint(0, 20)
+    return lines_a, lines_b
+
+
+@pytest.mark.parametrize('seed', range(400))
+def test_diff_is_same_as_difflib(tmpdir, seed):
+    lines_a, lines_b = random_pair(random.Random(seed))
+    library = RanorexLibrary()
+    diff = library.make_diff(write(tmpdir, 'a', lines_a),
+                             write(tmpdir, 'b', lines_b))
+    assert diff == expected_diff(lines_a, lines_b)
+
+
+def test_changed_line_repeated_in_common_end(tmpdir):
+    lines_a = ['%d\n' % i for i in range(30)] + ['x\n', 'y\n', 'x\n', 'z\n']
+    lines_b = ['%d\n' % i for i in range(30)] + ['y\n', 'x\n', 'z\n']
+    diff = RanorexLibrary().make_diff(write(tmpdir, 'a', lines_a),
+                                      write(tmpdir, 'b', lines_b))
+    assert diff == expected_diff(lines_a, lines_b)
+
+
+def test_equal_files_have_empty_diff(tmpdir):
+    lines = ['same\n'] * 10
+    assert RanorexLibrary().make_diff(write(tmpdir, 'a', lines),
+                                      write(tmpdir, 'b', lines)) == ''
+
+
+def test_ignored_lines_are_left_out(tmpdir):
+    lines_a = ['12:00 start\n', 'value 1\n']
+    lines_b = ['12:05 start\n', 'value 1\n']
+    library = RanorexLibrary()
+    assert library.make_diff(write(tmpdir, 'a', lines_a),
+                             write(tmpdir, 'b', lines_b),
+                             ignore=r'^\d\d:\d\d') == ''
+
+
+def test_summary_counts_changed_lines(tmpdir):
+    lines_a = ['a\n', 'b\n', 'c\n']
+    lines_b = ['a\n', 'B\n', 'c\n', 'd\n']
+    assert RanorexLibrary().make_diff(write(tmpdir, 'a', lines_a),
+                                      write(tmpdir, 'b', lines_b),
+                                      summary=True) == \
+        {'added': 2, 'removed': 1}
+
+
+def test_output_is_truncated(tmpdir):
+    lines_a = ['a %d\n' % i for i in range(100)]
+    lines_b = ['b %d\n' % i for i in range(100)]
+    diff = RanorexLibrary().make_diff(write(tmpdir, 'a', lines_a),
+                                      write(tmpdir, 'b', lines_b),
+                                      max_output=50)
+    assert diff.startswith(expected_diff(lines_a, lines_b)[:50])
+    assert diff.endswith("... diff truncated to 50 characters\n")
+
+
+def test_big_files_skip_common_beginning(tmpdir):
+    lines_a = ['line %d\n' % i for i in range(500)]
+    lines_b = list(lines_a)
+    lines_b[490] = 'changed\n'
+    diff = RanorexLibrary().make_diff(write(tmpdir, 'a', lines_a),
+                                      write(tmpdir, 'b', lines_b),
+                                      memory_limit=1000)
+    assert diff == expected_diff(lines_a, lines_b)
+
+
+def apply_diff(lines, diff):
+    """ Applies unified diff to lines, checks removed and context lines """
+    result = []
+    position = 0
+    diff_lines = diff.splitlines(True)[2:]
+    for line in diff_lines:
+        if line.startswith('@@'):
+            start = int(line.split()[1][1:].split(',')[0])
+            length = line.split()[1].split(',')
+            # empty range of unified diff points before its line
+            if len(length) == 2 and length[1] == '0':
+                start += 1
+            result.extend(lines[position:start - 1])
+            position = start - 1
+        elif line[0] == '+':
+            result.append(line[1:])
+        else:
+            assert lines[position] == line[1:]
+            if line[0] == ' ':
+                result.append(line[1:])
+            position += 1
+    return result + lines[position:]
+
+
+def big_pair(rand, changes):
+    lines_a = ['line %d\n' % rand.randint(0, 50) for _ in range(2000)]
+    lines_b = list(lines_a)
+    for _ in range(changes):
+        position = rand.randint(0, len(lines_b) - 10)
+        size = rand.randint(1, 8)
+        action = rand.choice(('insert', 'delete', 'replace'))
+        if action == 'insert':
+            lines_b[position:position] = ['new %d\n' % i
+                                          for i in range(size)]
+        elif action == 'delete':
+            del lines_b[position:position + size]
+        else:
+            lines_b[position:position + size] = ['new %d\n' % i
+                                                 for i in range(size)]
+    return lines_a, lines_b
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_windowed_diff_transforms_first_file_to_second(tmpdir, seed):
+    rand = random.Random(seed)
+    lines_a, lines_b = big_pair(rand, rand.randint(1, 40))
+    diff = RanorexLibrary().make_diff(write(tmpdir, 'a', lines_a),
+                                      write(tmpdir, 'b', lines_b),
+                                      memory_limit=4000)
+    assert apply_diff(lines_a, diff) == lines_b
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_windowed_diff_of_sparse_changes_is_same_as_difflib(tmpdir, seed):
+    lines_a = ['line %d\n' % i for i in range(3000)]
+    lines_b = list(lines_a)
+    rand = random.Random(seed)
+    for position in sorted(rand.sample(range(3000), 5), reverse=True):
+        lines_b[position:position + 1] = ['new %d\n' % position] * \
+            rand.randint(0, 3)
+    diff = RanorexLibrary().make_diff(write(tmpdir, 'a', lines_a),
+                                      write(tmpdir, 'b', lines_b),
+                                      memory_limit=8000)
+    assert diff == expected_diff(lines_a, lines_b)
+
+
+def test_windowed_summary_counts_changed_lines(tmpdir):
+    lines_a = ['line %d\n' % i for i in range(5000)]
+    lines_b = ['changed\n'] + lines_a[1:4000] + ['added\n'] + lines_a[4000:]
+    assert RanorexLibrary().make_diff(write(tmpdir, 'a', lines_a),
+                                      write(tmpdir, 'b', lines_b),
+                                      summary=True, memory_limit=4000) == \
+        {'added': 2, 'removed': 1}
+
+
+def test_windowed_diff_of_different_files(tmpdir):
+    lines_a = ['a %d\n' % i for i in range(1000)]
+    lines_b = ['b %d\n' % i for i in range(700)]
+    library = RanorexLibrary()
+    file_a, file_b = write(tmpdir, 'a', lines_a), write(tmpdir, 'b', lines_b)
+    assert apply_diff(lines_a, library.make_diff(
+        file_a, file_b, memory_limit=4000)) == lines_b
+    assert library.make_diff(file_a, file_b, summary=True,
+                             memory_limit=4000) == {'added': 700,
+                                                    'removed': 1000}
+
+
+def test_windowed_diff_ignores_lines(tmpdir):
+    lines_a = ['%d:00 line %d\n' % (i, i) for i in range(2000)]
+    lines_b = ['%d:01 line %d\n' % (i, i) for i in range(2000)]
+    assert RanorexLibrary().make_diff(write(tmpdir, 'a', lines_a),
+                                      write(tmpdir, 'b', lines_b),
+                                      ignore=r'^\d+:\d\d', memory_limit=4000) \
+        == ''
+
+
+def test_memory_limit_must_be_positive(tmpdir):
+    path = write(tmpdir, 'a', ['a\n'])
+    with pytest.raises(AssertionError):
+        RanorexLibrary().make_diff(path, path, memory_limit=0)
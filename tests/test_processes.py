@@ -0,0 +1,55 @@
+import pytest
+
+import rxconnector
+from rxconnector import TasklistProcessTable
+
+
+class FakePopen(object):
+    """ Answers tasklist and taskkill like Windows for running processes """
+    running = ['notepad.exe', 'notepad.exe', 'calc.exe']
+    commands = []
+
+    def __init__(self, command, stdout=None, stderr=None):
+        self.command = command
+        FakePopen.commands.append(command)
+
+    def communicate(self):
+        if self.command[0] == 'tasklist':
+            image = self.command[-1].split(' eq ')[1].lower()
+            return ''.join('"%s","%d","Console","1","1,000 K"\r\n'
+                           % (name, pid) for pid, name
+                           in enumerate(self.running) if name == image), ''
+        image = self.command[2].lower()
+        return ''.join('SUCCESS: The process "%s" with PID %d has been '
+                       'terminated.\r\n' % (name, pid) for pid, name
+                       in enumerate(self.running) if name == image), ''
+
+
+@pytest.fixture
+def processes(monkeypatch):
+    monkeypatch.setattr(rxconnector.subprocess, 'Popen', FakePopen)
+    monkeypatch.setattr(FakePopen, 'commands', [])
+    return TasklistProcessTable()
+
+
+@pytest.mark.parametrize('name', ['notepad', 'notepad.exe', 'Notepad.EXE',
+                                  ' notepad '])
+def test_process_is_found_with_and_without_extension(processes, name):
+    assert processes.is_running(name)
+    assert FakePopen.commands == [['tasklist', '/fo', 'csv', '/nh', '/fi',
+                                   'IMAGENAME eq notepad.exe']]
+
+
+def test_process_with_other_name_is_not_running(processes):
+    assert not processes.is_running('note')
+
+
+@pytest.mark.parametrize('name', ['notepad', 'NOTEPAD.exe'])
+def test_kill_uses_full_image_name(processes, name):
+    assert processes.kill(name) == 2
+    assert FakePopen.commands[-1] == ['taskkill', '/im', 'notepad.exe', '/f']
+
+
+def test_kill_of_not_running_process_returns_zero(processes):
+    assert processes.kill('paint') == 0
+    assert len(FakePopen.commands) == 1
@@ -0,0 +1,63 @@
+import time
+
+import pytest
+
+from rxconnector import RetryPolicy
+
+
+@pytest.mark.parametrize('arguments', [(-1,), (100, -1), (100, 100, 0.5),
+                                       (100, 100, 2.0, -1)])
+def test_invalid_policy_is_refused(arguments):
+    with pytest.raises(AssertionError):
+        RetryPolicy(*arguments)
+
+
+def test_set_retry_policy_returns_previous(library):
+    library.set_retry_policy(500, 50, 1.5, 200)
+    assert library.set_retry_policy() == {'deadline': 500,
+                                          'initial_delay': 50,
+                                          'backoff': 1.5, 'max_delay': 200}
+
+
+def test_element_is_retried_until_it_appears(library):
+    library.set_retry_policy(2000, 50, 1.0, 50)
+    assert library.get_element_attribute("/form[@title='Later']",
+                                         'title') == 'Later'
+    statistics = library.get_retry_statistics()["/form[@title='Later']"]
+    assert statistics['calls'] == 1
+    assert statistics['failures'] == 0
+    assert statistics['max_attempts'] > 1
+
+
+def test_not_found_fails_after_deadline(library):
+    library.set_retry_policy(300, 50, 2.0, 100)
+    started = time.time()
+    with pytest.raises(AssertionError) as error:
+        library.get_element_attribute("/form[@title='Never']", 'title')
+    assert 0.25 < time.time() - started < 1.5
+    assert 'not found after' in str(error.value)
+    statistics = library.get_retry_statistics()["/form[@title='Never']"]
+    assert statistics['failures'] == 1
+    # delays 50, 100, 100 ... fit about four tries into 300 ms
+    assert 3 <= statistics['attempts'] <= 6
+
+
+def test_zero_deadline_tries_once(library):
+    library.set_retry_policy(0)
+    with pytest.raises(AssertionError):
+        library.get_element_attribute("/form[@title='Later']", 'title')
+    assert library.get_retry_statistics()[
+        "/form[@title='Later']"]['attempts'] == 1
+
+
+def test_unsupported_element_is_not_retried(library, backend):
+    with pytest.raises(AssertionError) as error:
+        library.get_element_attribute("/form/widget", 'text')
+    assert 'not supported' in str(error.value)
+    assert not backend.calls
+
+
+def test_reset_retry_statistics(library):
+    library.get_element_attribute("/form/button", 'text')
+    library.reset_retry_statistics()
+    assert library.get_retry_statistics() == {}
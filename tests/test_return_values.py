@@ -0,0 +1,84 @@
+import os
+import re
+import sys
+import types
+import xmlrpclib
+from xmlrpclib import Binary
+
+import pytest
+
+from robotremoteserver import RobotRemoteServer
+
+
+def server(binary_threshold=None):
+    # server serves in constructor, only conversion is needed here
+    instance = types.InstanceType(RobotRemoteServer)
+    instance._binary_threshold = instance._check_binary_threshold(
+        binary_threshold)
+    return instance
+
+
+def test_rows_without_conversion_are_returned_as_they_are():
+    rows = [['a', 'b'], [1, 2.5], [u'text', 'x']]
+    result = server()._handle_return_value(rows)
+    assert result is rows
+    assert result[0] is rows[0]
+
+
+def test_converted_rows_are_copied():
+    rows = [['a', 'b'], [1, 2.5], ['\x00', u'text']]
+    result = server()._handle_return_value(rows)
+    assert type(rows[2][0]) is str
+    assert result[0] is rows[0]
+    assert result[1] == [1, 2.5]
+    assert isinstance(result[2][0], Binary)
+    assert result[2][1] == u'text'
+
+
+@pytest.mark.filterwarnings('ignore::UnicodeWarning')
+def test_library_structures_are_not_changed(library):
+    locator = "/form[@title='Gr\xc3\xbc\xc3\x9fe']"
+    with pytest.raises(AssertionError):
+        library.wait_for_element_attribute(locator, 'title', 'x', 0)
+    report = library.get_wait_report()
+    result = server()._handle_return_value(report)
+    assert isinstance(result[0]['target'], Binary)
+    target = library.get_wait_report()[0]['target']
+    assert type(target) is str and target == locator
+
+
+def test_none_and_objects_are_converted():
+    result = server()._handle_return_value({'a': None, 'b': (1, 'x')})
+    assert result == {'a': '', 'b': [1, 'x']}
+
+
+def test_long_string_is_binary_without_scan():
+    result = server(binary_threshold=4)._handle_return_value('plain text')
+    assert isinstance(result, Binary)
+    assert result.data == 'plain text'
+
+
+def test_short_string_is_scanned():
+    assert server(binary_threshold=100)._handle_return_value('text') == \
+        'text'
+
+
+def test_binary_is_marshalled_without_line_breaks():
+    data = os.urandom(1000)
+    result = server()._handle_return_value({'image': Binary(data),
+                                            'rows': [['\x00' * 100]]})
+    response = xmlrpclib.dumps((result,), methodresponse=True)
+    encoded = re.findall('<base64>(.*?)</base64>', response, re.S)
+    assert len(encoded) == 2
+    assert not [value for value in encoded if '\n' in value]
+    loaded = xmlrpclib.loads(response)[0][0]
+    assert loaded['image'].data == data
+    assert loaded['rows'][0][0].data == '\x00' * 100
+
+
+def test_threshold_is_not_used_on_ironpython(monkeypatch, capsys):
+    monkeypatch.setattr(sys, 'platform', 'cli')
+    instance = server(binary_threshold=4)
+    assert instance._binary_threshold is None
+    assert instance._handle_return_value('plain text') == 'plain text'
+    assert 'Binary threshold is not supported' in capsys.readouterr()[0]
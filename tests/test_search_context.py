@@ -0,0 +1,52 @@
+import pytest
+
+from rxconnector import RanorexLibrary, RetryPolicy
+from rxsimulator import SimulatorBackend
+
+TREE = """
+<desktop>
+  <form title="First">
+    <combobox><listitem text="one"/><listitem text="two"/></combobox>
+  </form>
+  <form title="Second">
+    <combobox><listitem text="two"/><listitem text="one"/></combobox>
+  </form>
+</desktop>
+"""
+
+
+@pytest.fixture
+def library():
+    library = RanorexLibrary(SimulatorBackend(TREE))
+    library.retry_policy = RetryPolicy(deadline=0)
+    return library
+
+
+def test_relative_locator_is_searched_in_context(library):
+    library.set_search_context("/form[@title='Second']")
+    library.select_by_index('combobox', 1)
+    assert library.get_element_attribute("/form[@title='Second']/combobox",
+                                         'text') == 'one'
+
+
+def test_failed_context_keeps_previous_one(library):
+    library.set_search_context("/form[@title='First']")
+    with pytest.raises(AssertionError):
+        library.set_search_context('/nope/form')
+    assert library.clear_search_context() == "/form[@title='First']"
+
+
+def test_relative_context_is_refused(library):
+    with pytest.raises(AssertionError):
+        library.set_search_context('form')
+
+
+def test_item_index_is_kept_per_context(library):
+    library.set_search_context("/form[@title='First']")
+    library.select_by_text('combobox', 'two')
+    library.set_search_context("/form[@title='Second']")
+    library.select_by_text('combobox', 'two')
+    assert library.get_element_attribute(
+        "/form[@title='Second']/combobox", 'selecteditemindex') == 0
+    assert library.get_element_attribute(
+        "/form[@title='First']/combobox", 'selecteditemindex') == 1
@@ -0,0 +1,50 @@
+import pytest
+
+COLOR = "/form/combobox[@name='color']"
+
+
+def selected(library):
+    return library.get_element_attribute(COLOR, 'text')
+
+
+def test_item_is_selected_by_index(library):
+    assert library.select_by_index(COLOR, 2)
+    assert selected(library) == 'blue'
+
+
+@pytest.mark.parametrize('index', [-1, -3, 3])
+def test_index_out_of_range_is_refused(library, backend, index):
+    library.select_by_index(COLOR, 1)
+    backend.calls.clear()
+    with pytest.raises(AssertionError) as error:
+        library.select_by_index(COLOR, index)
+    assert 'has no item at index %s' % index in str(error.value)
+    assert not [call for call in backend.calls
+                if call[0] in ('select', 'keys')]
+    assert selected(library) == 'green'
+
+
+@pytest.mark.parametrize('index', [-1, 3])
+def test_index_out_of_range_is_refused_without_direct_selection(
+        library, backend, monkeypatch, index):
+    library.select_by_index(COLOR, 1)
+    monkeypatch.setattr(backend, 'select_item', lambda element, index: False)
+    backend.calls.clear()
+    with pytest.raises(AssertionError) as error:
+        library.select_by_index(COLOR, index)
+    assert 'has no item at index %s' % index in str(error.value)
+    assert not [call for call in backend.calls if call[0] == 'keys']
+    assert selected(library) == 'green'
+
+
+def test_item_is_selected_by_keys_without_direct_selection(library, backend,
+                                                          monkeypatch):
+    library.select_by_index(COLOR, 0)
+    monkeypatch.setattr(backend, 'select_item', lambda element, index: False)
+    library.select_by_index(COLOR, 2)
+    assert selected(library) == 'blue'
+
+
+def test_item_is_selected_by_text(library):
+    assert library.select_by_text(COLOR, 'green')
+    assert selected(library) == 'green'
@@ -0,0 +1,127 @@
+import threading
+import time
+import types
+import xmlrpclib
+
+import pytest
+
+from robotremoteserver import RobotRemoteServer, _Session
+
+
+@pytest.fixture(params=[(), ('--threaded',)], ids=['single', 'threaded'])
+def server_options(request):
+    return request.param
+
+
+@pytest.fixture
+def server(server_options, start_server):
+    return start_server('--sessions', *server_options)
+
+
+def test_integer_id_is_same_session_as_path(server):
+    proxy = server.proxy()
+    assert proxy.open_session(5) == '5'
+    server.run('set_retry_policy', 100, path='/session/5')
+    sessions = proxy.list_sessions()
+    assert [session['id'] for session in sessions] == ['5']
+    assert set(proxy.get_session_metrics()) == set(['5'])
+    assert proxy.close_session(5) is True
+    assert proxy.list_sessions() == []
+
+
+def test_existing_id_cannot_be_opened_again(server):
+    proxy = server.proxy()
+    proxy.open_session('suite')
+    with pytest.raises(xmlrpclib.Fault):
+        proxy.open_session('suite')
+
+
+def test_generated_ids_are_unique(server):
+    proxy = server.proxy()
+    first, second = proxy.open_session(), proxy.open_session()
+    assert first != second
+
+
+def test_sessions_have_separate_library_state(server):
+    server.run('set_search_context', "/form[@title='Main']",
+               path='/session/a')
+    assert server.run('get_element_attribute', 'text[@name="status"]',
+                      'text', path='/session/a') == 'ready'
+    with pytest.raises(AssertionError):
+        server.run('get_element_attribute', 'text[@name="status"]', 'text',
+                   path='/session/b')
+    with pytest.raises(AssertionError):
+        server.run('get_element_attribute', 'text[@name="status"]', 'text')
+
+
+def test_closed_session_starts_fresh(server):
+    proxy = server.proxy()
+    server.run('set_search_context', "/form[@title='Main']",
+               path='/session/a')
+    proxy.close_session('a')
+    assert not server.run('clear_search_context', path='/session/a')
+
+
+def test_close_waits_for_keyword_running_in_session(start_server):
+    server = start_server('--sessions', '--threaded')
+    server.run('set_retry_policy', 100, path='/session/a')
+    errors = []
+
+    def wait():
+        try:
+            server.run('wait_for_element_attribute', "/form[@title='Main']",
+                       'title', 'Other', 1000, path='/session/a')
+        except AssertionError as error:
+            errors.append(str(error))
+    thread = threading.Thread(target=wait)
+    thread.start()
+    time.sleep(0.3)
+    started = time.time()
+    assert server.proxy().close_session('a') is True
+    assert time.time() - started > 0.4
+    thread.join()
+    assert errors and 'expected Other' in errors[0]
+    assert server.proxy().list_sessions() == []
+
+
+def test_idle_session_is_closed(server_options, start_server):
+    server = start_server('--sessions', '--session-timeout', '1',
+                          *server_options)
+    server.run('set_retry_policy', 100, path='/session/a')
+    deadline = time.time() + 5
+    while server.proxy().list_sessions() and time.time() < deadline:
+        time.sleep(0.1)
+    assert server.proxy().list_sessions() == []
+    assert server.run('set_retry_policy', path='/session/a')['deadline'] \
+        != 100
+
+
+class FailingLibrary(object):
+    def __init__(self, error):
+        self.error = error
+
+    def _close(self):
+        raise self.error
+
+
+def bare_server():
+    # server serves in constructor, only closing is needed here
+    return types.InstanceType(RobotRemoteServer)
+
+
+def test_close_error_of_library_is_logged(capsys):
+    session = _Session('a', FailingLibrary(IOError('index not saved')), False)
+    bare_server()._close_session(session)
+    output = capsys.readouterr()[0]
+    assert "*WARN* Closing session 'a' failed: index not saved" in output
+    assert "Session 'a' closed." in output
+
+
+def test_unexpected_close_error_is_not_hidden(capsys):
+    session = _Session('a', FailingLibrary(ValueError('bug')), False)
+    with pytest.raises(ValueError):
+        bare_server()._close_session(session)
+    bare_server()._close_idle_session(session)
+    output = capsys.readouterr()[0]
+    assert "*ERROR* Closing session 'a' failed:" in output
+    assert 'ValueError: bug' in output
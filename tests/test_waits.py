@@ -0,0 +1,120 @@
+import threading
+import time
+
+import pytest
+
+
+def test_wait_for_any_returns_first_fired(library):
+    later = library.start_wait("/form[@title='Later']", 2000)
+    never = library.start_wait("/form[@title='Never']", 2000)
+    status = library.wait_for_any(later, never)
+    assert status['id'] == later
+    assert status['state'] == 'fired'
+    with pytest.raises(AssertionError):
+        library.get_wait_status(never)
+
+
+def test_wait_for_all_fails_on_first_timeout(library):
+    short = library.start_wait("/form[@title='Never']", 300)
+    long_wait = library.start_wait("/form[@title='Never']", 3000)
+    started = time.time()
+    with pytest.raises(AssertionError) as error:
+        library.wait_for_all(short, long_wait)
+    assert time.time() - started < 1.5
+    assert 'timeout' in str(error.value)
+    with pytest.raises(AssertionError):
+        library.get_wait_status(long_wait)
+
+
+def test_wait_for_all_returns_all_statuses(library):
+    main = library.start_wait("/form[@title='Main']", 1000)
+    status = library.start_wait("/form/text[@name='status']", 1000,
+                                'attribute_equals', 'text', 'ready')
+    statuses = library.wait_for_all([main, status])
+    assert [s['state'] for s in statuses] == ['fired', 'fired']
+    assert statuses[1]['value'] == 'ready'
+
+
+def test_polling_does_not_record_failed_lookups(library):
+    wait = library.start_wait("/form[@title='Never']", 500)
+    with pytest.raises(AssertionError):
+        library.wait_for_any(wait)
+    assert library.get_retry_statistics() == {}
+    profile = library.get_locator_profile()
+    assert len(profile) == 1
+    assert profile[0]['kind'] == 'wait'
+    assert profile[0]['failures'] == 1
+    assert profile[0]['attempts'] > 1
+
+
+def test_not_exists_fires_after_removal(library, backend):
+    wait = library.start_wait("/form/checkbox", 2000, 'not_exists')
+    backend.remove("/form/checkbox")
+    assert library.wait_for_any(wait)['state'] == 'fired'
+
+
+def test_attribute_changed_during_wait_is_noticed(library, backend):
+    status = backend.find("/form/text[@name='status']")
+    timer = threading.Timer(0.2, status.set, ('text', 'done'))
+    timer.start()
+    started = time.time()
+    try:
+        assert library.wait_for_element_attribute(
+            "/form/text[@name='status']", 'text', 'done', 3000, 50)
+    finally:
+        timer.cancel()
+    assert 0.15 < time.time() - started < 1.5
+    report = library.get_wait_report()[-1]
+    assert report['keyword'] == 'wait_for_element_attribute'
+    assert report['passed']
+
+
+def test_attribute_wait_fails_after_deadline(library):
+    started = time.time()
+    with pytest.raises(AssertionError) as error:
+        library.wait_for_element_attribute("/form/text[@name='status']",
+                                           'text', 'done', 400, 50)
+    assert 0.35 < time.time() - started < 1.5
+    assert 'is ready, expected done' in str(error.value)
+    assert not library.get_wait_report()[-1]['passed']
+
+
+def test_attribute_wait_of_missing_element_fails_after_deadline(library):
+    started = time.time()
+    with pytest.raises(AssertionError) as error:
+        library.wait_for_element_attribute("/form[@title='Never']", 'title',
+                                           'Never', 300, 50)
+    assert 0.25 < time.time() - started < 1.5
+    assert 'could not be found' in str(error.value)
+
+
+def test_attribute_wait_finds_element_once(library, backend):
+    backend.calls.clear()
+    with pytest.raises(AssertionError):
+        library.wait_for_element_attribute("/form/text[@name='status']",
+                                           'text', 'done', 400, 20)
+    finds = [call for call in backend.calls if call[0] == 'find']
+    reads = [call for call in backend.calls if call[0] == 'attribute']
+    assert len(finds) == 1
+    assert len(reads) > 2
+
+
+def test_attribute_wait_finds_element_appearing_later(library):
+    assert library.wait_for_element_attribute("/form[@title='Later']",
+                                              'title', 'Later', 2000, 50)
+
+
+def test_attribute_wait_does_not_record_failed_lookups(library):
+    with pytest.raises(AssertionError):
+        library.wait_for_element_attribute("/form[@title='Never']", 'title',
+                                           'Never', 300, 20)
+    assert library.wait_for_element_attribute("/form[@title='Later']",
+                                              'title', 'Later', 2000, 20)
+    assert library.get_retry_statistics() == {}
+    profile = dict((entry['locator'], entry)
+                   for entry in library.get_locator_profile())
+    assert set(entry['kind'] for entry in profile.values()) == set(['wait'])
+    assert profile["/form[@title='Never']"]['calls'] == 1
+    assert profile["/form[@title='Never']"]['failures'] == 1
+    assert profile["/form[@title='Later']"]['calls'] == 1
+    assert profile["/form[@title='Later']"]['failures'] == 0
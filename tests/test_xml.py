@@ -0,0 +1,63 @@
+import pytest
+
+import rxconnector
+from rxconnector import RanorexLibrary
+
+
+@pytest.fixture
+def items_xml(tmpdir):
+    path = tmpdir.join('items.xml')
+    path.write('<root>%s<group>%s</group></root>' % (
+        ''.join('<item id="%d"/>' % i for i in range(3000)),
+        ''.join('<entry id="e%d"/>' % i for i in range(5))))
+    return str(path)
+
+
+def test_stream_finds_element_in_later_batch(items_xml):
+    assert RanorexLibrary().get_xml_attribute(
+        items_xml, "item[@id='2500']", 'id', stream=True) == '2500'
+
+
+@pytest.mark.parametrize('xpath', ['item[1000]', 'item[last()]',
+                                   './item[last()-1]', '*[3]'])
+def test_stream_refuses_position_among_root_children(items_xml, xpath):
+    with pytest.raises(AssertionError) as error:
+        RanorexLibrary().get_xml_attribute(items_xml, xpath, 'id',
+                                           stream=True)
+    assert 'cannot be used with stream' in str(error.value)
+
+
+@pytest.mark.parametrize('stream', [False, True])
+def test_position_in_later_step(items_xml, stream):
+    library = RanorexLibrary()
+    assert library.get_xml_attribute(items_xml, 'group/entry[2]', 'id',
+                                     stream=stream) == 'e1'
+    assert library.get_xml_attribute(items_xml, 'group/entry[last()]',
+                                     'id', stream=stream) == 'e4'
+
+
+
+@pytest.fixture
+def groups_xml(tmpdir, monkeypatch):
+    # groups are bigger than read size of parser, so the group after
+    # each batch is already started when the batch is searched
+    monkeypatch.setattr(rxconnector, 'XML_STREAM_BATCH', 3)
+    path = tmpdir.join('groups.xml')
+    path.write('<root>%s</root>' % ''.join(
+        '<group id="%d">%s</group>' % (group, ''.join(
+            '<entry id="%d-%d" name="%s"/>' % (group, entry, 'x' * 40)
+            for entry in range(300)))
+        for group in range(10)))
+    return str(path)
+
+
+@pytest.mark.parametrize('group', [3, 4, 6, 7, 9])
+def test_stream_finds_entries_of_group_straddling_batch(groups_xml, group):
+    library = RanorexLibrary()
+    for entry in (0, 150, 299):
+        assert library.get_xml_attribute(
+            groups_xml, "group/entry[@id='%d-%d']" % (group, entry), 'id',
+            stream=True) == '%d-%d' % (group, entry)
+    assert library.get_xml_attribute(
+        groups_xml, "group[@id='%d']/entry[last()]" % group, 'id',
+        stream=True) == '%d-299' % group
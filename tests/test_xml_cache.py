@@ -0,0 +1,55 @@
+import os
+
+from rxconnector import XmlCache
+
+
+def write(path, content, mtime):
+    path.write(content)
+    os.utime(str(path), (mtime, mtime))
+    return str(path)
+
+
+def test_document_is_reused_while_file_is_unchanged(tmpdir):
+    path = write(tmpdir.join('a.xml'), '<root a="1"/>', 1000)
+    cache = XmlCache()
+    assert cache.get(path) is cache.get(path)
+
+
+def test_changed_file_is_parsed_again(tmpdir):
+    cache = XmlCache()
+    path = write(tmpdir.join('a.xml'), '<root a="1"/>', 1000)
+    assert cache.get(path).get('a') == '1'
+    # same size, different modification time
+    write(tmpdir.join('a.xml'), '<root a="2"/>', 2000)
+    assert cache.get(path).get('a') == '2'
+    # same modification time, different size
+    write(tmpdir.join('a.xml'), '<root a="33"/>', 2000)
+    assert cache.get(path).get('a') == '33'
+
+
+def test_least_recently_used_document_is_dropped_over_limit(tmpdir):
+    first = write(tmpdir.join('a.xml'), '<root a="1"/>', 1000)
+    second = write(tmpdir.join('b.xml'), '<root b="1"/>', 1000)
+    cache = XmlCache(max_bytes=os.path.getsize(first) * 2)
+    root = cache.get(first)
+    cache.get(second)
+    assert cache.get(first) is root
+    third = write(tmpdir.join('c.xml'), '<root c="1"/>', 1000)
+    cache.get(third)
+    assert cache.get(first) is root
+    assert cache._bytes <= cache.max_bytes
+
+
+def test_document_over_limit_is_not_cached(tmpdir):
+    path = write(tmpdir.join('a.xml'), '<root a="1"/>', 1000)
+    cache = XmlCache(max_bytes=5)
+    assert cache.get(path) is not cache.get(path)
+    assert cache._bytes == 0
+
+
+def test_flush_drops_documents(tmpdir):
+    path = write(tmpdir.join('a.xml'), '<root a="1"/>', 1000)
+    cache = XmlCache()
+    root = cache.get(path)
+    cache.flush()
+    assert cache.get(path) is not root